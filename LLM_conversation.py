@@ -1,36 +1,42 @@
-import openai
-from dotenv import load_dotenv
-import os
 import base64
+from api_clients import get_openai_client
+from rate_limit import limited
+from tracing import traced
+from robot_log import get_logger, setup_logging
 
+log = get_logger(__name__)
+
+AUDIO_CODEC = "wav_pcm_u8"  # audio_codec.CODECS 중 wav 계열
+
+@traced("llm.conversation")
 def process_voice_text(text, additional_prompt=""):
     """
     Process the voice text and generate a conversational response as Virus, the combat robot
     """
-    # Load API key from environment variables
-    load_dotenv()
-    client = openai.OpenAI()
+    # Shared client (API key and connection pool are set up once in api_clients)
+    client = get_openai_client()
 
     try:
         combine = additional_prompt+"\n"+text if additional_prompt else text
         # Call GPT with the system prompt and user message
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini-2025-04-14",  # or another suitable model
-            messages=[
-                {"role": "system", "content": senario_text +"\n\n" + SYSTEM_PROMPT},
-                {"role": "user", "content": combine}
-            ],
-            temperature=0.7  # Slightly higher temperature for more varied responses
-        )
+        with limited("openai", "conversation"):  # provider 별 RPM/동시 요청 제한 (요청끼리는 병렬)
+            response = client.chat.completions.create(
+                model="gpt-4.1-mini-2025-04-14",  # or another suitable model
+                messages=[
+                    {"role": "system", "content": senario_text +"\n\n" + SYSTEM_PROMPT},
+                    {"role": "user", "content": combine}
+                ],
+                temperature=0.7  # Slightly higher temperature for more varied responses
+            )
         
         # Extract and return response
         assistant_response = response.choices[0].message.content
-        print("\n🤖 VIRUS Response:")
-        print(assistant_response)
+        log.info("\n🤖 VIRUS Response:")
+        log.info(assistant_response)
         return assistant_response
         
     except Exception as e:
-        print("❌ GPT Processing Error:", e)
+        log.error(f"❌ GPT Processing Error: {e}")
         return "System malfunction. Communication module offline."
 
 def process_voice_audio(audio_data, sample_rate=16000, additional_prompt = ""):
@@ -48,25 +54,20 @@ def process_voice_audio(audio_data, sample_rate=16000, additional_prompt = ""):
           which now uses text-based input for LLM calls after STT.
           It is kept for potential future use or direct audio processing scenarios.
     """
-    # Load API key from environment variables
-    load_dotenv()
-    client = openai.OpenAI()
+    # Shared client (API key and connection pool are set up once in api_clients)
+    client = get_openai_client()
 
     try:
-        import soundfile as sf
-        import io
+        from audio_codec import encode_audio
         
         # Convert numpy array to WAV bytes - Optimized for Raspberry Pi
-        wav_buffer = io.BytesIO()
-        # 8비트 PCM 사용으로 파일 크기 50% 감소
-        sf.write(wav_buffer, audio_data, sample_rate, format="WAV", subtype="PCM_U8")
-        wav_buffer.seek(0)
-        wav_bytes = wav_buffer.read()
+        # 8비트 PCM 사용으로 파일 크기 50% 감소 (input_audio 는 wav/mp3 만 지원)
+        encoded = encode_audio(audio_data, sample_rate, codec=AUDIO_CODEC)
         
         # Convert to base64
-        base64_audio = base64.b64encode(wav_bytes).decode('utf-8')
+        base64_audio = base64.b64encode(encoded.data).decode('utf-8')
         
-        print(f"🔄 Processing audio directly with GPT-4o-mini-audio... (Optimized: {len(wav_bytes)/1024:.1f}KB)")
+        log.info(f"🔄 Processing audio directly with GPT-4o-mini-audio... (Optimized: {encoded.n_bytes/1024:.1f}KB, encoded in {encoded.encode_ms:.1f}ms)")
          # Build content block
         user_content = []
         if additional_prompt:
@@ -80,28 +81,29 @@ def process_voice_audio(audio_data, sample_rate=16000, additional_prompt = ""):
         })
 
         # Call GPT with audio input
-        response = client.chat.completions.create(
-            model="gpt-4.1-mini-2025-04-14", # Changed as per user request. Verify model name availability.
-            modalities=["text"], # Assuming this model can handle text modality if it's audio-focused, or adjust as needed.
-            messages=[
-                {"role": "system", "content": senario_text + "\n\n" + SYSTEM_PROMPT},
-                {
-                    "role": "user",
-                    "content": user_content,
-                }
-            ],
-            temperature=0.7
-        )
+        with limited("openai", "conversation-audio"):
+            response = client.chat.completions.create(
+                model="gpt-4.1-mini-2025-04-14", # Changed as per user request. Verify model name availability.
+                modalities=["text"], # Assuming this model can handle text modality if it's audio-focused, or adjust as needed.
+                messages=[
+                    {"role": "system", "content": senario_text + "\n\n" + SYSTEM_PROMPT},
+                    {
+                        "role": "user",
+                        "content": user_content,
+                    }
+                ],
+                temperature=0.7
+            )
 
         
         # Extract and return response
         assistant_response = response.choices[0].message.content
-        print("\n🤖 VIRUS Response (Audio Direct):")
-        print(assistant_response)
+        log.info("\n🤖 VIRUS Response (Audio Direct):")
+        log.info(assistant_response)
         return assistant_response
         
     except Exception as e:
-        print(f"❌ Audio Processing Error: {e}")
+        log.error(f"❌ Audio Processing Error: {e}")
         return "System malfunction. Audio processing module offline."
 
 # Comprehensive system prompt defining Virus's personality and response patterns
@@ -267,6 +269,7 @@ I'm here with you. Take a breath. We've secured eighty percent, and you're doing
 """ 
 # Example usage if run directly
 if __name__ == "__main__":
+    setup_logging()
     # Test the conversation function with a sample command
     sample_command = "Virus, road marker spotted. Execute T pattern room clear."
     response = process_voice_text(sample_command)
@@ -1,36 +1,42 @@
-import openai
-from dotenv import load_dotenv
-import os
 import base64
+from api_clients import get_openai_client
+from rate_limit import limited
+from tracing import traced
+from robot_log import get_logger
 
+log = get_logger(__name__)
+
+AUDIO_CODEC = "wav_pcm_u8"  # audio_codec.CODECS 중 wav 계열
+
+@traced("llm.commands")
 def process_voice_text(text, additional_prompt=""):
     """
     음성에서 변환된 텍스트를 GPT-4-mini에 전달하여 응답을 받는 함수
     """
-    # 환경 변수에서 API 키 로드
-    load_dotenv()
-    client = openai.OpenAI()
+    # 공유 클라이언트 (API 키 로드와 연결 풀은 api_clients 에서 한 번만)
+    client = get_openai_client()
 
     try:
         # GPT-4에 질문하기
         combine = senario_text+ "\n\n"+additional_prompt+"\n\n" + text
-        response = client.chat.completions.create(
-            model="ft:gpt-4.1-mini-2025-04-14:hyunjun1121:cs270-hyunjun-plus2set:BdvW9nay",  # 또는 사용 가능한 다른 모델
-            messages=[
-                {"role": "system", "content": system},
-                {"role": "user", "content":combine}
-            ],
-            temperature=0
-        )
+        with limited("openai", "commands"):  # 대화 응답 요청과 병렬 (provider 한도 안에서)
+            response = client.chat.completions.create(
+                model="ft:gpt-4.1-mini-2025-04-14:hyunjun1121:cs270-hyunjun-plus2set:BdvW9nay",  # 또는 사용 가능한 다른 모델
+                messages=[
+                    {"role": "system", "content": system},
+                    {"role": "user", "content":combine}
+                ],
+                temperature=0
+            )
         
         # 응답 출력
         assistant_response = response.choices[0].message.content
-        print("\n🤖 AI command 응답:")
-        print(assistant_response)
+        log.info("\n🤖 AI command 응답:")
+        log.info(assistant_response)
         return assistant_response
         
     except Exception as e:
-        print("❌ GPT 처리 오류:", e)
+        log.error(f"❌ GPT 처리 오류: {e}")
         return None
 
 def process_voice_audio(audio_data, sample_rate=16000, additional_prompt=""):
@@ -44,62 +50,58 @@ def process_voice_audio(audio_data, sample_rate=16000, additional_prompt=""):
     Returns:
         str: JSON formatted command sequence
     """
-    # 환경 변수에서 API 키 로드
-    load_dotenv()
-    client = openai.OpenAI()
+    # 공유 클라이언트 (API 키 로드와 연결 풀은 api_clients 에서 한 번만)
+    client = get_openai_client()
     try:
-        import soundfile as sf
-        import io
+        from audio_codec import encode_audio
         
         # Convert numpy array to WAV bytes - Optimized for Raspberry Pi
-        wav_buffer = io.BytesIO()
-        # 8비트 PCM 사용으로 파일 크기 50% 감소
-        sf.write(wav_buffer, audio_data, sample_rate, format="WAV", subtype="PCM_U8")
-        wav_buffer.seek(0)
-        wav_bytes = wav_buffer.read()
+        # 8비트 PCM 사용으로 파일 크기 50% 감소 (input_audio 는 wav/mp3 만 지원)
+        encoded = encode_audio(audio_data, sample_rate, codec=AUDIO_CODEC)
         
         # Convert to base64
-        base64_audio = base64.b64encode(wav_bytes).decode('utf-8')
+        base64_audio = base64.b64encode(encoded.data).decode('utf-8')
         
-        print(f"🔄 Processing audio for robot commands... (Optimized: {len(wav_bytes)/1024:.1f}KB)")
+        log.info(f"🔄 Processing audio for robot commands... (Optimized: {encoded.n_bytes/1024:.1f}KB, encoded in {encoded.encode_ms:.1f}ms)")
         
         # Call GPT with audio input
-        response = client.chat.completions.create(
-            model= "ft:gpt-4.1-mini-2025-04-14:hyunjun1121:cs270-hyunjun-plus2set:BdvW9nay",
-            modalities=["text"],
-            messages=[
-                {
-                    "role": "system", 
-                    "content": senario_text
-                },
-                {
-                    "role": "user",
-                    "content": [
-                        {
-                            "type": "text",
-                            "text": senario_text + "\n\n" + additional_prompt
-                        },
-                        {
-                            "type": "input_audio",
-                            "input_audio": {
-                                "data": base64_audio,
-                                "format": "wav"
+        with limited("openai", "commands-audio"):
+            response = client.chat.completions.create(
+                model= "ft:gpt-4.1-mini-2025-04-14:hyunjun1121:cs270-hyunjun-plus2set:BdvW9nay",
+                modalities=["text"],
+                messages=[
+                    {
+                        "role": "system", 
+                        "content": senario_text
+                    },
+                    {
+                        "role": "user",
+                        "content": [
+                            {
+                                "type": "text",
+                                "text": senario_text + "\n\n" + additional_prompt
+                            },
+                            {
+                                "type": "input_audio",
+                                "input_audio": {
+                                    "data": base64_audio,
+                                    "format": "wav"
+                                }
                             }
-                        }
-                    ]
-                }
-            ],
-            temperature=0
-        )
+                        ]
+                    }
+                ],
+                temperature=0
+            )
         
         # 응답 출력
         assistant_response = response.choices[0].message.content
-        print("\n🤖 AI command 응답 (Audio Direct):")
-        print(assistant_response)
+        log.info("\n🤖 AI command 응답 (Audio Direct):")
+        log.info(assistant_response)
         return assistant_response
         
     except Exception as e:
-        print(f"❌ Audio Command Processing Error: {e}")
+        log.error(f"❌ Audio Command Processing Error: {e}")
         return None
         
 system = """
@@ -0,0 +1,376 @@
+"""
+Shared API client registry
+==========================
+LLM_conversation / LLM_function / text_to_audio 는 호출할 때마다 load_dotenv() 와
+openai.OpenAI() / ElevenLabs() 를 새로 만들었고, colab_vlm.send_frame 은 세션 없는 requests.post 를
+썼기 때문에 매 호출마다 클라이언트 생성 + 새 TCP/TLS 연결 비용을 냈습니다.
+
+여기서는 provider 별 클라이언트를 프로세스당 한 번만 만들고, keep-alive 연결 풀을 모든 스레드가 공유합니다.
+    get_openai_client()      - openai.OpenAI (httpx 연결 풀)
+    get_elevenlabs_client()  - ElevenLabs (httpx 연결 풀)
+    get_http_session()       - requests.Session (VLM 서버 등, urllib3 연결 풀)
+    pool_stats()             - provider 별 연결 수 / 요청 수
+    warm_up() / KeepAlive    - 시작 시 모든 endpoint 에 병렬로 연결을 열어 두고, 유휴 중에 주기적으로 probe
+
+API_CASSETTE 가 설정되어 있으면 (cassette.py) 모든 클라이언트의 transport / adapter 아래에서 요청을 기록/재생합니다.
+
+클라이언트는 (provider, base_url) 별로 캐시되므로 OPENAI_BASE_URL / ELEVENLABS_BASE_URL 을 바꾸면
+(stub_servers.py stand-in 테스트) 그 주소용 클라이언트가 따로 만들어집니다.
+
+Usage:
+    python api_clients.py --benchmark      # 로컬 stand-in 으로 호출당 오버헤드 비교 (재사용 vs 매번 생성)
+"""
+
+import argparse
+import os
+import threading
+import time
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+MAX_CONNECTIONS = 10            # provider 별 최대 동시 연결 수
+MAX_KEEPALIVE_CONNECTIONS = 5   # 유휴 상태로 유지할 연결 수
+KEEPALIVE_EXPIRY = 60.0         # 유휴 연결 유지 시간(초)
+
+_clients = {}
+_lock = threading.Lock()
+_env_loaded = False
+
+
+def _load_env():
+    global _env_loaded
+    if not _env_loaded:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        _env_loaded = True
+
+
+def _httpx_client(timeout=60.0):
+    import httpx
+    from cassette import active_cassette
+
+    limits = httpx.Limits(max_connections=MAX_CONNECTIONS, max_keepalive_connections=MAX_KEEPALIVE_CONNECTIONS,
+                          keepalive_expiry=KEEPALIVE_EXPIRY)
+    cassette = active_cassette()
+    if cassette:
+        return httpx.Client(transport=cassette.httpx_transport(httpx.HTTPTransport(limits=limits)), timeout=timeout)
+    return httpx.Client(limits=limits, timeout=timeout)
+
+
+def _get(provider, base_url, factory):
+    key = (provider, base_url)
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = factory()
+        return client
+
+
+def get_openai_client():
+    """프로세스 전체에서 공유하는 openai.OpenAI (OPENAI_API_KEY / OPENAI_BASE_URL)"""
+    _load_env()
+    base_url = os.getenv("OPENAI_BASE_URL")
+
+    def factory():
+        import openai
+
+        return openai.OpenAI(http_client=_httpx_client())
+
+    return _get("openai", base_url, factory)
+
+
+def get_elevenlabs_client():
+    """프로세스 전체에서 공유하는 ElevenLabs 클라이언트 (ELEVENLABS_API_KEY / ELEVENLABS_BASE_URL)"""
+    _load_env()
+    base_url = os.getenv("ELEVENLABS_BASE_URL")
+
+    def factory():
+        from elevenlabs.client import ElevenLabs
+
+        if base_url:
+            # stand-in 서버는 키를 확인하지 않음
+            return ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY") or "stand-in", base_url=base_url,
+                              httpx_client=_httpx_client())
+        return ElevenLabs(api_key=os.getenv("ELEVENLABS_API_KEY"), httpx_client=_httpx_client())
+
+    return _get("elevenlabs", base_url, factory)
+
+
+def get_http_session():
+    """프로세스 전체에서 공유하는 requests.Session (VLM 서버, 스트리밍 STT 등)"""
+
+    def factory():
+        import requests
+        from requests.adapters import HTTPAdapter
+        from cassette import active_cassette
+
+        session = requests.Session()
+        cassette = active_cassette()
+        adapter = (cassette.requests_adapter if cassette else HTTPAdapter)(
+            pool_connections=MAX_CONNECTIONS, pool_maxsize=MAX_CONNECTIONS)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    return _get("http", None, factory)
+
+
+def _httpx_inner(client):
+    # openai / elevenlabs 클라이언트 안의 httpx.Client
+    inner = getattr(client, "_client", None)
+    if inner is None:
+        wrapper = getattr(client, "_client_wrapper", None)
+        inner = getattr(getattr(wrapper, "httpx_client", None), "httpx_client", None)
+    return inner
+
+
+def _httpx_pool(client):
+    return getattr(getattr(_httpx_inner(client), "_transport", None), "_pool", None)
+
+
+def pool_stats():
+    """provider 별 연결 풀 상태 {provider: {"connections", "idle", "requests"?}}"""
+    stats = {}
+    with _lock:
+        clients = dict(_clients)
+    for (provider, base_url), client in clients.items():
+        name = f"{provider}@{base_url}" if base_url else provider
+        if provider == "http":
+            pools = [pool for adapter in set(client.adapters.values())
+                     for pool in adapter.poolmanager.pools._container.values()]
+            stats[name] = {
+                "hosts": len(pools),
+                "connections": sum(pool.num_connections for pool in pools),
+                "requests": sum(pool.num_requests for pool in pools),
+                "idle": sum(1 for pool in pools if pool.pool is not None for conn in pool.pool.queue if conn),
+            }
+            continue
+        pool = _httpx_pool(client)
+        connections = list(pool.connections) if pool is not None else []
+        stats[name] = {
+            "connections": len(connections),
+            "idle": sum(1 for c in connections if c.is_idle()),
+        }
+    return stats
+
+
+def print_pool_stats():
+    for name, s in pool_stats().items():
+        details = ", ".join(f"{k} {v}" for k, v in s.items())
+        log.info(f"🔌 {name}: {details}")
+
+
+def close_all():
+    """모든 클라이언트의 연결을 닫고 registry 를 비움"""
+    with _lock:
+        clients = list(_clients.values())
+        _clients.clear()
+    for client in clients:
+        try:
+            client.close()
+        except Exception:
+            # elevenlabs 클라이언트는 close() 가 없음 - 내부 httpx 클라이언트를 닫음
+            inner = getattr(getattr(client, "_client_wrapper", None), "httpx_client", None)
+            inner = getattr(inner, "httpx_client", None)
+            if inner is not None:
+                inner.close()
+
+
+# =========================
+# Warm-up / keep-alive
+# =========================
+def _probe_openai():
+    # 공유 연결 풀로 가벼운 GET - 응답 코드(401 등)와 상관없이 연결(DNS/TCP/TLS)이 열리면 됨
+    client = get_openai_client()
+    return _httpx_inner(client).get(f"{str(client.base_url).rstrip('/')}/models",
+                                    headers={"Authorization": f"Bearer {client.api_key}"}, timeout=10)
+
+
+def _probe_elevenlabs():
+    wrapper = get_elevenlabs_client()._client_wrapper
+    return _httpx_inner(get_elevenlabs_client()).get(f"{wrapper.get_base_url()}/v1/models",
+                                                     headers=wrapper.get_headers(), timeout=10)
+
+
+def default_endpoints(vlm_url=None, stt_url=None):
+    """warm-up 할 endpoint {이름: probe 함수}"""
+    endpoints = {"openai": _probe_openai, "elevenlabs": _probe_elevenlabs}
+    for name, url in (("vlm", vlm_url), ("stt_stream", stt_url)):
+        if url:
+            endpoints[name] = lambda url=url: get_http_session().head(url, timeout=10)
+    return endpoints
+
+
+def _timed_probe(probe):
+    start = time.perf_counter()
+    response = probe()
+    elapsed = (time.perf_counter() - start) * 1000
+    status = getattr(response, "status_code", None)
+    if status is not None and status >= 500:
+        raise RuntimeError(f"HTTP {status}")
+    return elapsed, status
+
+
+def warm_up(endpoints=None, timeout=15.0):
+    """모든 endpoint 에 병렬로 두 번씩 probe - 첫 번째(cold: DNS/TCP/TLS 포함)와 두 번째(warm) 지연 측정
+
+    Returns:
+        dict: {이름: {"ok", "cold_ms", "warm_ms", "status", "error"}}
+    """
+    from concurrent.futures import ThreadPoolExecutor, wait
+
+    endpoints = endpoints or default_endpoints()
+
+    # SDK import 와 클라이언트 생성은 먼저 (병렬 probe 시간에 섞이지 않도록)
+    start = time.perf_counter()
+    get_openai_client()
+    get_elevenlabs_client()
+    get_http_session()
+    report = {"client init": {"ok": True, "cold_ms": (time.perf_counter() - start) * 1000, "warm_ms": None,
+                              "status": None, "error": None}}
+
+    def run(probe):
+        cold_ms, status = _timed_probe(probe)
+        warm_ms, status = _timed_probe(probe)
+        return {"ok": True, "cold_ms": cold_ms, "warm_ms": warm_ms, "status": status, "error": None}
+
+    pool = ThreadPoolExecutor(max_workers=len(endpoints), thread_name_prefix="warmup")
+    futures = {name: pool.submit(run, probe) for name, probe in endpoints.items()}
+    wait(futures.values(), timeout=timeout)
+    for name, future in futures.items():
+        if not future.done():
+            report[name] = {"ok": False, "cold_ms": None, "warm_ms": None, "status": None, "error": "timeout"}
+        elif future.exception():
+            report[name] = {"ok": False, "cold_ms": None, "warm_ms": None, "status": None,
+                            "error": str(future.exception())}
+        else:
+            report[name] = future.result()
+    pool.shutdown(wait=False)
+    return report
+
+
+def print_warm_up(report):
+    log.info("🔥 Connection warm-up")
+    log.info(f"   {'endpoint':<31} {'cold':>9} {'warm':>9}")
+    for name, r in report.items():
+        if r["ok"] and r["warm_ms"] is None:
+            log.info(f"   ⚙️ {name:<28} {r['cold_ms']:7.0f}ms")
+        elif r["ok"]:
+            log.info(f"   ✅ {name:<28} {r['cold_ms']:7.0f}ms {r['warm_ms']:7.0f}ms  (HTTP {r['status']})")
+        else:
+            log.error(f"   ❌ {name:<28} {r['error']}")
+
+
+class KeepAlive(threading.Thread):
+    """유휴 중에 주기적으로 probe 를 보내 풀의 연결이 끊기지 않게 유지
+
+    interval 은 KEEPALIVE_EXPIRY 와 서버 쪽 idle timeout 보다 짧아야 합니다.
+    is_idle() 이 False 면 (녹음/처리 중) 건너뜁니다.
+    """
+
+    def __init__(self, endpoints=None, interval=20.0, is_idle=None):
+        super().__init__(daemon=True, name="keepalive")
+        self.endpoints = endpoints or default_endpoints()
+        self.interval = interval
+        self.is_idle = is_idle or (lambda: True)
+        self.probes = 0
+        self.failures = 0
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            if not self.is_idle():
+                continue
+            for probe in self.endpoints.values():
+                try:
+                    _timed_probe(probe)
+                    self.probes += 1
+                except Exception:
+                    self.failures += 1
+
+    def stop(self):
+        self._stop_event.set()
+
+
+# =========================
+# Benchmark
+# =========================
+def benchmark(calls=30):
+    """로컬 stand-in 에 같은 요청을 반복 - 매번 클라이언트 생성 vs registry 재사용의 호출당 시간"""
+    import io
+    import numpy as np
+    import openai
+    import requests
+    import soundfile as sf
+    from stub_servers import StandInServer
+
+    wav = io.BytesIO()
+    sf.write(wav, np.zeros(8000, dtype=np.float32), 8000, format="WAV", subtype="PCM_16")
+    wav_bytes = wav.getvalue()
+
+    def timed(fn):
+        times = []
+        for _ in range(calls):
+            start = time.perf_counter()
+            fn()
+            times.append(time.perf_counter() - start)
+        return np.median(times) * 1000, np.percentile(times, 95) * 1000
+
+    def stt(client):
+        upload = io.BytesIO(wav_bytes)
+        upload.name = "audio.wav"
+        client.audio.transcriptions.create(model="gpt-4o-mini-transcribe", file=upload, response_format="text")
+
+    def tts(client):
+        b"".join(client.text_to_speech.convert(voice_id="ErXwobaYiN019PkySvjV", text="Ready.",
+                                               model_id="eleven_flash_v2_5", output_format="mp3_22050_32"))
+
+    results = {}
+    # 서버 처리 시간은 0 으로 - 클라이언트 생성과 연결 비용만 남김
+    with StandInServer(stt_seconds_per_audio_second=0.0, tts_first_chunk_delay=0.0, tts_chunk_delay=0.0) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        from elevenlabs.client import ElevenLabs
+
+        results["openai  new client"] = timed(lambda: stt(openai.OpenAI()))
+        results["openai  registry"] = timed(lambda: stt(get_openai_client()))
+        results["eleven  new client"] = timed(
+            lambda: tts(ElevenLabs(api_key="stand-in", base_url=server.url)))
+        results["eleven  registry"] = timed(lambda: tts(get_elevenlabs_client()))
+        results["http    requests.post"] = timed(
+            lambda: requests.post(f"{server.url}/stt/sessions", json={}, timeout=5))
+        results["http    registry"] = timed(
+            lambda: get_http_session().post(f"{server.url}/stt/sessions", json={}, timeout=5))
+        print_pool_stats()
+        close_all()
+        for name in ("OPENAI_BASE_URL", "ELEVENLABS_BASE_URL"):
+            os.environ.pop(name)
+
+    log.info(f"\n📊 Per-call time against local stand-in, {calls} calls")
+    log.info(f"{'client':<22} {'median':>9} {'p95':>9}")
+    for name, (median, p95) in results.items():
+        log.info(f"{name:<22} {median:7.2f}ms {p95:7.2f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared API client registry")
+    parser.add_argument("--benchmark", action="store_true", help="로컬 stand-in 으로 재사용 효과 측정")
+    parser.add_argument("--calls", type=int, default=30)
+    parser.add_argument("--warm-up", action="store_true", help="설정된 endpoint 에 연결해서 cold/warm 지연 출력")
+    parser.add_argument("--vlm-url", help="warm-up 할 VLM 서버 주소")
+    args = parser.parse_args()
+    setup_logging()
+    if args.benchmark:
+        benchmark(args.calls)
+    elif args.warm_up:
+        print_warm_up(warm_up(default_endpoints(vlm_url=args.vlm_url, stt_url=os.getenv("STT_STREAM_URL"))))
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Preallocated audio recorder for the sounddevice input callback
+==============================================================
+main_robot_controller.py 의 audio_callback 은 예전에 블록마다 indata.copy() 를
+리스트에 쌓고, 녹음이 끝나면 np.concatenate 로 한 번 더 복사했습니다.
+RingBufferRecorder 는 녹음용 버퍼를 미리 할당해 두고 콜백에서는 슬라이스 복사만
+수행하므로, 실시간 오디오 스레드에서 새 배열을 만들지 않습니다.
+
+- 대기 중에는 짧은 pre-roll 링 버퍼에 계속 기록해서, 임계값을 넘기 직전의
+  음절도 녹음에 포함됩니다.
+- start() 시점에 pre-roll 을 녹음 버퍼 앞쪽으로 옮기고 이후 블록은 선형으로 이어 씁니다.
+- utterance() 는 녹음 버퍼의 view 를 돌려주므로 복사가 없습니다.
+  (다음 start() 전까지만 유효합니다.)
+
+Usage:
+    python audio_buffer.py            # list+concatenate 방식과 비교하는 벤치마크
+"""
+
+import time
+import tracemalloc
+import numpy as np
+
+
+class RingBufferRecorder:
+    """Zero-allocation recorder with pre-roll, written to from the audio callback."""
+
+    def __init__(self, sample_rate, channels=1, max_seconds=30.0, preroll_seconds=0.3, dtype=np.float32):
+        """
+        Args:
+            sample_rate (int): 입력 스트림 샘플링 레이트
+            channels (int): 채널 수
+            max_seconds (float): 한 번의 발화로 저장할 최대 길이(초). 넘으면 잘립니다.
+            preroll_seconds (float): 녹음 시작 전에 보존할 오디오 길이(초)
+            dtype: 버퍼 자료형 (sounddevice 기본값 float32)
+        """
+        self.sample_rate = sample_rate
+        self.channels = channels
+        self.preroll_size = max(int(preroll_seconds * sample_rate), 0)
+        self.capacity = int(max_seconds * sample_rate) + self.preroll_size
+
+        self._buffer = np.zeros((self.capacity, channels), dtype=dtype)
+        self._preroll = np.zeros((max(self.preroll_size, 1), channels), dtype=dtype)
+        self._preroll_pos = 0      # 다음에 쓸 pre-roll 위치
+        self._preroll_filled = 0   # pre-roll 에 채워진 샘플 수
+        self._cursor = 0           # 녹음 버퍼에 채워진 샘플 수
+
+        self.recording = False
+        self.overflowed = False    # max_seconds 를 넘겨 잘린 경우 True
+
+    def write(self, block):
+        """콜백에서 받은 블록을 기록합니다. 새 배열을 할당하지 않습니다."""
+        if self.recording:
+            self._write_linear(block)
+        elif self.preroll_size:
+            self._write_preroll(block)
+
+    def _write_linear(self, block):
+        n = len(block)
+        free = self.capacity - self._cursor
+        if n > free:
+            n = free
+            self.overflowed = True
+        if n <= 0:
+            return
+        self._buffer[self._cursor:self._cursor + n] = block[:n]
+        self._cursor += n
+
+    def _write_preroll(self, block):
+        size = self.preroll_size
+        n = len(block)
+        if n >= size:
+            # 블록이 pre-roll 보다 길면 마지막 부분만 보존
+            self._preroll[:] = block[n - size:]
+            self._preroll_pos = 0
+            self._preroll_filled = size
+            return
+        pos = self._preroll_pos
+        first = min(n, size - pos)
+        self._preroll[pos:pos + first] = block[:first]
+        if first < n:
+            self._preroll[:n - first] = block[first:]
+        self._preroll_pos = (pos + n) % size
+        self._preroll_filled = min(self._preroll_filled + n, size)
+
+    def start(self):
+        """녹음을 시작합니다. 보존된 pre-roll 을 녹음 버퍼 앞쪽에 시간 순서대로 옮깁니다."""
+        filled = self._preroll_filled
+        if filled:
+            oldest = (self._preroll_pos - filled) % self.preroll_size
+            first = min(filled, self.preroll_size - oldest)
+            self._buffer[:first] = self._preroll[oldest:oldest + first]
+            if first < filled:
+                self._buffer[first:filled] = self._preroll[:filled - first]
+        self._cursor = filled
+        self._preroll_filled = 0
+        self._preroll_pos = 0
+        self.overflowed = False
+        self.recording = True
+
+    def stop(self):
+        """녹음을 종료하고 발화 구간의 view 를 반환합니다."""
+        self.recording = False
+        return self.utterance()
+
+    def utterance(self):
+        """현재까지 녹음된 발화의 zero-copy view (다음 start() 전까지 유효)."""
+        return self._buffer[:self._cursor]
+
+    @property
+    def duration(self):
+        """녹음된 발화 길이(초)"""
+        return self._cursor / self.sample_rate
+
+    def __len__(self):
+        return self._cursor
+
+    def reset(self):
+        """녹음 버퍼를 비웁니다. pre-roll 은 그대로 유지합니다."""
+        self.recording = False
+        self.overflowed = False
+        self._cursor = 0
+
+
+# =========================
+# 벤치마크: list.append(indata.copy()) + np.concatenate vs RingBufferRecorder
+# =========================
+def _run_list_path(blocks):
+    frames = []
+    for block in blocks:
+        frames.append(block.copy())
+    return np.concatenate(frames, axis=0)
+
+
+def _run_recorder_path(recorder, blocks):
+    recorder.reset()
+    recorder.start()
+    for block in blocks:
+        recorder.write(block)
+    return recorder.stop()
+
+
+def _measure(label, func, n_blocks):
+    # 시간은 tracemalloc 없이 측정하고, 할당량은 별도 실행에서 측정
+    start = time.perf_counter()
+    result = func()
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"  {label:<22} | {elapsed / n_blocks * 1e6:8.2f} us/callback | "
+          f"peak allocated {peak / 1024:9.1f}KB")
+    return result
+
+
+def benchmark(seconds=20.0, sample_rate=8000, blocksize=256, repeats=3):
+    """긴 발화 하나를 기록할 때 콜백당 시간과 할당량을 비교합니다."""
+    n_blocks = int(seconds * sample_rate / blocksize)
+    rng = np.random.default_rng(0)
+    blocks = [rng.standard_normal((blocksize, 1)).astype(np.float32) * 0.1 for _ in range(n_blocks)]
+    recorder = RingBufferRecorder(sample_rate, 1, max_seconds=seconds + 1, preroll_seconds=0.3)
+
+    print(f"📊 {seconds:.0f}s utterance, {n_blocks} callbacks of {blocksize} frames @ {sample_rate}Hz")
+    for i in range(repeats):
+        print(f"Run {i + 1}:")
+        expected = _measure("list + concatenate", lambda: _run_list_path(blocks), n_blocks)
+        actual = _measure("RingBufferRecorder", lambda: _run_recorder_path(recorder, blocks), n_blocks)
+        assert np.array_equal(expected, actual), "recorder output differs from list+concatenate"
+
+
+if __name__ == "__main__":
+    benchmark()
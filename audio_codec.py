@@ -0,0 +1,188 @@
+"""
+Audio upload encoder
+====================
+LLM_function.py / LLM_conversation.py / main_robot_controller.py 에서 업로드용 오디오를
+만들 때 공통으로 쓰는 인코더. 코덱마다 인코딩된 바이트 수와 인코딩 시간(ms)을 함께 돌려줍니다.
+
+지원 코덱 (soundfile/libsndfile):
+    wav_pcm16   - WAV 16bit PCM
+    wav_pcm_u8  - WAV 8bit PCM (기존 기본값, 용량 50% 감소)
+    flac        - FLAC (무손실 압축)
+    ogg_opus    - Ogg/Opus (손실 압축, 8/12/16/24/48kHz 만 지원, libsndfile >= 1.0.29)
+
+Usage:
+    # 녹음된 명령어 fixture 를 코덱 x 샘플링 레이트별로 로컬 STT stand-in 에 보내서 비교
+    python audio_codec.py --sweep fixtures/ [--rates 8000 16000] [--api]
+
+    fixtures/ 에는 command.wav 와 (있으면) 같은 이름의 command.txt 정답 transcript 를 둡니다.
+"""
+
+import argparse
+import io
+import re
+import time
+from collections import namedtuple
+from pathlib import Path
+import numpy as np
+import soundfile as sf
+
+# name: (soundfile format, subtype, 확장자, MIME)
+CODECS = {
+    "wav_pcm16": ("WAV", "PCM_16", "wav", "audio/wav"),
+    "wav_pcm_u8": ("WAV", "PCM_U8", "wav", "audio/wav"),
+    "flac": ("FLAC", "PCM_16", "flac", "audio/flac"),
+    "ogg_opus": ("OGG", "OPUS", "ogg", "audio/ogg"),
+}
+LOSSLESS_CODECS = ("wav_pcm16", "flac")  # sweep 의 기준 transcript 용
+
+OPUS_RATES = (8000, 12000, 16000, 24000, 48000)
+
+EncodedAudio = namedtuple("EncodedAudio", ["data", "codec", "sample_rate", "n_bytes", "encode_ms", "filename", "mime"])
+
+
+def encode_audio(audio_data, sample_rate, codec="wav_pcm_u8", name="audio_for_stt"):
+    """numpy 오디오를 업로드용 바이트로 인코딩합니다.
+
+    Args:
+        audio_data (numpy.ndarray): float32 오디오 (samples,) 또는 (samples, channels)
+        sample_rate (int): 샘플링 레이트
+        codec (str): CODECS 의 키
+        name (str): 업로드 파일명 (확장자 제외)
+
+    Returns:
+        EncodedAudio: data, n_bytes, encode_ms 등
+    """
+    if codec not in CODECS:
+        raise ValueError(f"Unknown codec '{codec}'. Choose from: {', '.join(CODECS)}")
+    fmt, subtype, ext, mime = CODECS[codec]
+    if subtype == "OPUS" and sample_rate not in OPUS_RATES:
+        raise ValueError(f"Opus does not support {sample_rate}Hz (supported: {OPUS_RATES})")
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    sf.write(buffer, audio_data, sample_rate, format=fmt, subtype=subtype)
+    data = buffer.getvalue()
+    encode_ms = (time.perf_counter() - start) * 1000
+    return EncodedAudio(data, codec, sample_rate, len(data), encode_ms, f"{name}.{ext}", mime)
+
+
+def as_upload_file(encoded):
+    """OpenAI SDK 에 넘길 수 있는 파일 객체 (이름으로 포맷을 판단하므로 name 설정)"""
+    buffer = io.BytesIO(encoded.data)
+    buffer.name = encoded.filename
+    return buffer
+
+
+def resample(audio_data, src_rate, dst_rate):
+    """선형 보간 리샘플링 (sweep 용 - 녹음 fixture 를 다른 샘플링 레이트로 변환)"""
+    if src_rate == dst_rate:
+        return audio_data
+    samples = audio_data[:, 0] if audio_data.ndim > 1 else audio_data
+    n_out = int(round(len(samples) * dst_rate / src_rate))
+    x_out = np.arange(n_out) * (src_rate / dst_rate)
+    return np.interp(x_out, np.arange(len(samples)), samples).astype(np.float32)
+
+
+# =========================
+# Sweep harness
+# =========================
+def _normalize(text):
+    return re.sub(r"[^a-z0-9 ]", "", (text or "").lower()).split()
+
+
+def _load_fixtures(directory):
+    fixtures = []
+    for wav in sorted(Path(directory).glob("*.wav")):
+        audio, rate = sf.read(str(wav), dtype="float32")
+        reference = wav.with_suffix(".txt")
+        text = reference.read_text(encoding="utf-8").strip() if reference.exists() else None
+        fixtures.append((wav.name, audio, rate, text))
+    return fixtures
+
+
+def sweep(fixtures_dir, rates=(8000, 16000), codecs=tuple(CODECS), use_api=False,
+          model="gpt-4o-mini-transcribe"):
+    """fixture x 코덱 x 샘플링 레이트별 (bytes, encode ms, STT ms, transcript 일치) 를 출력"""
+    import openai
+
+    fixtures = _load_fixtures(fixtures_dir)
+    if not fixtures:
+        print(f"❌ No .wav fixtures in {fixtures_dir}")
+        return []
+
+    server = None
+    if use_api:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+        client = openai.OpenAI()
+    else:
+        from stub_servers import StandInServer
+
+        # stand-in 은 업로드가 디코딩되고 길이가 맞으면 해당 fixture 의 정답을 돌려줍니다
+        server = StandInServer(latency=0.05).start()
+        for name, audio, rate, text in fixtures:
+            server.state.add_reference(len(audio) / rate, text or name)
+        client = openai.OpenAI(base_url=f"{server.url}/v1", api_key="stand-in")
+
+    # 정답이 없는 fixture 는 가장 높은 샘플링 레이트 + 무손실 코덱의 transcript 가 기준이 되도록 그 순서로 실행
+    reference_order = sorted(codecs, key=lambda c: c not in LOSSLESS_CODECS)
+    results = []
+    try:
+        for name, audio, rate, text in fixtures:
+            baseline = None
+            for target_rate in sorted(rates, reverse=True):
+                resampled = resample(audio, rate, target_rate)
+                for codec in reference_order:
+                    try:
+                        encoded = encode_audio(resampled, target_rate, codec)
+                    except Exception as e:
+                        print(f"  ⏭️ {name} {codec}@{target_rate}: {e}")
+                        continue
+                    start = time.perf_counter()
+                    transcript = client.audio.transcriptions.create(
+                        model=model,
+                        file=as_upload_file(encoded),
+                        response_format="text",
+                        language="en"
+                    )
+                    stt_ms = (time.perf_counter() - start) * 1000
+                    transcript = transcript.strip() if transcript else ""
+                    # 정답 파일이 없으면 첫 번째 결과 (가장 높은 레이트, 무손실 코덱이 있으면 그것) 를 기준으로 비교
+                    if baseline is None:
+                        baseline = text or transcript
+                    match = _normalize(transcript) == _normalize(baseline)
+                    results.append({
+                        "fixture": name, "codec": codec, "sample_rate": target_rate,
+                        "bytes": encoded.n_bytes, "encode_ms": encoded.encode_ms,
+                        "stt_ms": stt_ms, "match": match, "transcript": transcript,
+                    })
+    finally:
+        if server:
+            server.stop()
+
+    print(f"\n{'codec':<11} {'rate':>6} {'avg KB':>8} {'encode ms':>10} {'stt ms':>8} {'match':>7}")
+    print("-" * 56)
+    for target_rate in rates:
+        for codec in codecs:
+            rows = [r for r in results if r["codec"] == codec and r["sample_rate"] == target_rate]
+            if not rows:
+                continue
+            print(f"{codec:<11} {target_rate:>6} {np.mean([r['bytes'] for r in rows]) / 1024:8.1f} "
+                  f"{np.mean([r['encode_ms'] for r in rows]):10.2f} {np.mean([r['stt_ms'] for r in rows]):8.0f} "
+                  f"{sum(r['match'] for r in rows):>3}/{len(rows):<3}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Upload codec size/latency/accuracy sweep")
+    parser.add_argument("--sweep", metavar="DIR", required=True, help="녹음된 명령어 fixture 폴더 (*.wav, *.txt)")
+    parser.add_argument("--rates", type=int, nargs="+", default=[8000, 16000], help="비교할 샘플링 레이트")
+    parser.add_argument("--codecs", nargs="+", default=list(CODECS), choices=list(CODECS), help="비교할 코덱")
+    parser.add_argument("--api", action="store_true", help="로컬 stand-in 대신 실제 OpenAI STT 사용")
+    args = parser.parse_args()
+    sweep(args.sweep, rates=args.rates, codecs=args.codecs, use_api=args.api)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+"""
+Real-time audio capture stage
+=============================
+sounddevice 콜백은 실시간 오디오 스레드에서 실행되므로, 여기서 dB 계산, print,
+스레드 생성 같은 작업을 하면 Raspberry Pi 에서 input overflow 가 발생합니다.
+
+- CaptureStage.callback: 블록을 미리 할당된 슬롯 큐에 복사하는 것 외에는 아무것도 하지 않음
+- BlockQueue: 단일 생산자/단일 소비자 bounded 큐 (락 없음, 가득 차면 블록을 버리고 카운트)
+- CallbackStats: overflow 횟수와 콜백 실행 시간 히스토그램
+- AudioWorker: 큐를 소비하면서 VAD 상태 머신 등 나머지 작업을 수행하는 스레드
+
+Usage:
+    capture = CaptureStage(sample_rate=8000, channels=1, blocksize=256)
+    worker = AudioWorker(capture.queue, handle_block)
+    worker.start()
+    stream = sd.InputStream(..., blocksize=256, callback=capture.callback)
+"""
+
+import bisect
+import threading
+import time
+import numpy as np
+from robot_log import get_logger
+
+log = get_logger(__name__)
+
+
+class BlockQueue:
+    """Lock-free single-producer/single-consumer queue of preallocated audio blocks."""
+
+    def __init__(self, slots, blocksize, channels=1, dtype=np.float32):
+        self.slots = slots
+        self.blocksize = blocksize
+        self._blocks = np.zeros((slots, blocksize, channels), dtype=dtype)
+        self._lengths = np.zeros(slots, dtype=np.int64)
+        self._timestamps = np.zeros(slots, dtype=np.float64)
+        # 각 카운터는 한 스레드에서만 증가시킴 (생산자: _write, 소비자: _read)
+        self._write = 0
+        self._read = 0
+        self.dropped = 0       # 큐가 가득 차서 버린 블록 수
+        self.truncated = 0     # 슬롯보다 커서 잘린 블록 수
+
+    def put(self, block, timestamp):
+        """생산자(오디오 콜백) 전용. 큐가 가득 차면 False 를 반환하고 블록을 버립니다."""
+        if self._write - self._read >= self.slots:
+            self.dropped += 1
+            return False
+        slot = self._write % self.slots
+        n = len(block)
+        if n > self.blocksize:
+            n = self.blocksize
+            self.truncated += 1
+        self._blocks[slot, :n] = block[:n]
+        self._lengths[slot] = n
+        self._timestamps[slot] = timestamp
+        self._write += 1
+        return True
+
+    def __len__(self):
+        return self._write - self._read
+
+    def drain(self):
+        """소비자 전용. (block view, timestamp) 를 순서대로 돌려줍니다.
+
+        view 는 다음 항목으로 넘어가면 생산자가 덮어쓸 수 있으므로 필요하면 복사하세요.
+        """
+        while self._read < self._write:
+            slot = self._read % self.slots
+            yield self._blocks[slot, :self._lengths[slot]], self._timestamps[slot]
+            self._read += 1
+
+
+class CallbackStats:
+    """Callback duration histogram and overflow counters (updated without allocation)."""
+
+    # 콜백 실행 시간 히스토그램 구간 (마이크로초)
+    BUCKETS_US = (50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+    def __init__(self):
+        self.callbacks = 0
+        self.status_warnings = 0
+        self.input_overflows = 0
+        self.max_duration_us = 0.0
+        self.histogram = [0] * (len(self.BUCKETS_US) + 1)
+
+    def record(self, status, duration):
+        duration_us = duration * 1e6
+        self.callbacks += 1
+        if status:
+            self.status_warnings += 1
+            if getattr(status, "input_overflow", False):
+                self.input_overflows += 1
+        if duration_us > self.max_duration_us:
+            self.max_duration_us = duration_us
+        self.histogram[bisect.bisect_left(self.BUCKETS_US, duration_us)] += 1
+
+    def snapshot(self):
+        """현재 통계를 dict 로 반환합니다."""
+        labels = [f"<={b}us" for b in self.BUCKETS_US] + [f">{self.BUCKETS_US[-1]}us"]
+        return {
+            "callbacks": self.callbacks,
+            "status_warnings": self.status_warnings,
+            "input_overflows": self.input_overflows,
+            "max_duration_us": round(self.max_duration_us, 1),
+            "histogram": dict(zip(labels, self.histogram)),
+        }
+
+
+class CaptureStage:
+    """Owns the block queue and stats; its callback is the only code on the audio thread."""
+
+    def __init__(self, sample_rate, channels=1, blocksize=256, queue_seconds=2.0):
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        slots = max(int(queue_seconds * sample_rate / blocksize), 4)
+        self.queue = BlockQueue(slots, blocksize, channels)
+        self.stats = CallbackStats()
+
+    def callback(self, indata, frames_count, time_info, status):
+        """sounddevice InputStream 콜백 - 큐에 넣고 통계만 기록"""
+        start = time.perf_counter()
+        self.queue.put(indata, time.time())
+        self.stats.record(status, time.perf_counter() - start)
+
+    def report(self):
+        """overflow/드롭 카운트와 콜백 시간 히스토그램"""
+        report = self.stats.snapshot()
+        report["queue_dropped"] = self.queue.dropped
+        report["queue_truncated"] = self.queue.truncated
+        report["queue_depth"] = len(self.queue)
+        return report
+
+    def print_report(self):
+        report = self.report()
+        log.info(f"📈 Audio callbacks: {report['callbacks']} | input overflows: {report['input_overflows']} | "
+              f"warnings: {report['status_warnings']} | dropped blocks: {report['queue_dropped']} | "
+              f"max callback: {report['max_duration_us']:.0f}us")
+        log.info("   Callback duration histogram: " +
+              ", ".join(f"{k}: {v}" for k, v in report["histogram"].items()))
+
+
+class AudioWorker(threading.Thread):
+    """Consumes captured blocks off the audio thread and hands them to `handler(block, timestamp)`."""
+
+    def __init__(self, block_queue, handler, poll_interval=0.01):
+        super().__init__(daemon=True)
+        self.block_queue = block_queue
+        self.handler = handler
+        self.poll_interval = poll_interval
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.is_set():
+            handled = False
+            for block, timestamp in self.block_queue.drain():
+                handled = True
+                try:
+                    self.handler(block, timestamp)
+                except Exception as e:
+                    log.error(f"❌ Audio worker error: {e}")
+            if not handled:
+                self._stop_event.wait(self.poll_interval)
+
+    def stop(self, timeout=1.0):
+        self._stop_event.set()
+        self.join(timeout)
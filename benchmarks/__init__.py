@@ -0,0 +1,24 @@
+"""
+Micro-benchmarks
+================
+상호작용마다 CPU 를 쓰는 함수들의 마이크로 벤치마크 (라즈베리파이에서 느려진 곳 찾기용).
+
+    bench_audio    블록당 dB / VAD, 녹음 버퍼 누적, STT 업로드용 WAV 인코딩
+    bench_vision   JPEG 인코딩 + base64 (colab_vlm.send_frame, VideoCapture.capture_frames)
+    bench_dataset  dataset_training/json_maker.py 의 CSV 읽기 / JSONL 쓰기
+
+결과는 기계 정보(CPU, python/numpy/libsndfile/cv2 버전, git rev) 와 함께 JSON 으로 저장하고,
+compare 로 두 결과를 비교해서 느려진 벤치마크를 표시합니다 (regression 이 있으면 exit code 1).
+
+Usage:
+    python -m benchmarks run                              # 전체 실행
+    python -m benchmarks run --group audio --json bench/pi4-main.json
+    python -m benchmarks run --baseline bench/pi4-main.json   # 실행하고 바로 비교
+    python -m benchmarks compare bench/pi4-main.json bench/pi4-branch.json [--threshold 0.1]
+    python -m benchmarks list
+"""
+
+from benchmarks.harness import (
+    SkipBenchmark, bench, registered, run, run_benchmark, save, load, compare, print_comparison, machine_info,
+)
+from benchmarks import bench_audio, bench_vision, bench_dataset  # noqa: F401 - 벤치마크 등록
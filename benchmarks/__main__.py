@@ -0,0 +1,56 @@
+import argparse
+import sys
+
+from benchmarks import harness
+
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m benchmarks", description="Micro-benchmarks for hot functions")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p_run = sub.add_parser("run", help="벤치마크 실행")
+    p_run.add_argument("--group", action="append", help="audio / vision / dataset (여러 번 가능)")
+    p_run.add_argument("-k", "--filter", help="이름에 이 문자열이 들어간 것만")
+    p_run.add_argument("--min-time", type=float, default=0.2, help="측정 한 번의 최소 시간(초)")
+    p_run.add_argument("--repeats", type=int, default=7)
+    p_run.add_argument("--quick", action="store_true", help="--min-time 0.05 --repeats 3 (동작 확인용 - 비교에는 기본값 사용)")
+    p_run.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    p_run.add_argument("--baseline", metavar="PATH", help="이전 --json 결과와 비교")
+    p_run.add_argument("--threshold", type=float, default=harness.REGRESSION_THRESHOLD)
+
+    p_compare = sub.add_parser("compare", help="두 결과 비교 (regression 이 있으면 exit code 1)")
+    p_compare.add_argument("baseline")
+    p_compare.add_argument("current")
+    p_compare.add_argument("--threshold", type=float, default=harness.REGRESSION_THRESHOLD,
+                           help="이 비율 이상 느려지면 regression (기본값: 0.10)")
+
+    sub.add_parser("list", help="등록된 벤치마크")
+    args = parser.parse_args()
+
+    if args.command == "list":
+        for b in harness.registered():
+            print(f"{b.name:<30} {b.group:<8} {b.description}")
+        return 0
+
+    if args.command == "compare":
+        return 1 if harness.print_comparison(harness.load(args.baseline), harness.load(args.current),
+                                             args.threshold) else 0
+
+    benchmarks = harness.registered(args.group, args.filter)
+    if not benchmarks:
+        print("❌ No benchmarks selected")
+        return 2
+    min_time, repeats = (0.05, 3) if args.quick else (args.min_time, args.repeats)
+    info = harness.machine_info()
+    print(f"📊 {len(benchmarks)} benchmarks on {info['machine']} ({info['cpu_count']} CPUs), "
+          f"python {info['python']}, numpy {info['numpy']}")
+    report = harness.run(benchmarks, min_time=min_time, repeats=repeats)
+    if args.json:
+        harness.save(report, args.json)
+    if args.baseline:
+        return 1 if harness.print_comparison(harness.load(args.baseline), report, args.threshold) else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
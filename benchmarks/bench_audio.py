@@ -0,0 +1,95 @@
+"""
+오디오 경로 (블록마다 / 발화마다 실행되는 코드)
+    - audio worker: 블록당 dB 계산 (calculate_db) 과 VAD 특징 계산 (vad.process)
+    - 녹음 버퍼: 블록 누적 (RingBufferRecorder.write) 과 예전 list.append + np.concatenate
+    - STT 업로드: convert_audio_to_text_via_api 의 WAV 인코딩 (UPLOAD_CODEC=wav_pcm_u8)
+
+설정은 main_robot_controller.py 와 같음 (8kHz mono, 256 frame 블록).
+"""
+
+import numpy as np
+
+from benchmarks.harness import bench
+
+SAMPLE_RATE = 8000
+BLOCK_SIZE = 256
+UTTERANCE_SECONDS = 5.0  # 보통 명령 한 번 길이
+UTTERANCE_BLOCKS = int(UTTERANCE_SECONDS * SAMPLE_RATE / BLOCK_SIZE)
+
+
+def _blocks(n_blocks, seed=0):
+    """sounddevice 콜백과 같은 (BLOCK_SIZE, 1) float32 블록"""
+    rng = np.random.default_rng(seed)
+    return [(rng.standard_normal((BLOCK_SIZE, 1)) * 0.1).astype(np.float32) for _ in range(n_blocks)]
+
+
+def _utterance():
+    return np.concatenate(_blocks(UTTERANCE_BLOCKS))
+
+
+@bench("audio.calculate_db", group="audio", unit="block")
+def calculate_db_block():
+    """블록 하나의 RMS dB"""
+    from vad import calculate_db
+    block = _blocks(1)[0]
+    return lambda: calculate_db(block)
+
+
+@bench("audio.vad_process", group="audio", items=UTTERANCE_BLOCKS, unit="block")
+def vad_process_blocks():
+    """발화 하나 분량의 블록을 VAD 에 차례로 (dB + ZCR + spectral flux + 상태 전이)"""
+    from vad import VoiceActivityDetector
+    blocks = _blocks(UTTERANCE_BLOCKS)
+    vad = VoiceActivityDetector(SAMPLE_RATE, frame_size=BLOCK_SIZE)
+
+    def run():
+        vad.reset()
+        for block in blocks:
+            vad.process(block)
+    return run
+
+
+@bench("audio.recorder_write", group="audio", items=UTTERANCE_BLOCKS, unit="block")
+def recorder_write_blocks():
+    """RingBufferRecorder 에 발화 하나를 기록하고 utterance() 로 꺼냄 (controller 경로)"""
+    from audio_buffer import RingBufferRecorder
+    blocks = _blocks(UTTERANCE_BLOCKS)
+    recorder = RingBufferRecorder(SAMPLE_RATE, 1, max_seconds=UTTERANCE_SECONDS + 1, preroll_seconds=0.3)
+
+    def run():
+        recorder.reset()
+        recorder.start()
+        for block in blocks:
+            recorder.write(block)
+        recorder.stop()
+        return recorder.utterance()
+    return run
+
+
+@bench("audio.list_concatenate", group="audio", items=UTTERANCE_BLOCKS, unit="block")
+def list_concatenate_blocks():
+    """예전 방식: 블록마다 indata.copy() 를 list 에 쌓고 끝에 np.concatenate (비교 기준)"""
+    blocks = _blocks(UTTERANCE_BLOCKS)
+
+    def run():
+        frames = []
+        for block in blocks:
+            frames.append(block.copy())
+        return np.concatenate(frames, axis=0)
+    return run
+
+
+@bench("audio.encode_wav_pcm_u8", group="audio")
+def encode_wav_pcm_u8():
+    """5초 발화 → 업로드용 WAV 8bit (UPLOAD_CODEC) + 파일 객체"""
+    from audio_codec import encode_audio, as_upload_file
+    audio = _utterance()
+    return lambda: as_upload_file(encode_audio(audio, SAMPLE_RATE, codec="wav_pcm_u8"))
+
+
+@bench("audio.encode_wav_pcm16", group="audio")
+def encode_wav_pcm16():
+    """5초 발화 → WAV 16bit (스트리밍 STT 청크와 같은 형식, 비교용)"""
+    from audio_codec import encode_audio
+    audio = _utterance()
+    return lambda: encode_audio(audio, SAMPLE_RATE, codec="wav_pcm16")
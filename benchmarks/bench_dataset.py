@@ -0,0 +1,61 @@
+"""
+데이터셋 변환 (dataset_training/json_maker.py)
+    - read_csv_column: user_content.csv / prefer_output.csv 한 컬럼 읽기 (인코딩 확인 포함)
+    - create_sft_jsonl: 두 컬럼 → SFT 학습용 JSONL
+
+저장소의 실제 CSV (약 1400행) 를 그대로 사용합니다. json_maker 의 진행 print 는 측정에서 제외합니다.
+"""
+
+import atexit
+import contextlib
+import io
+import os
+import shutil
+import tempfile
+
+from benchmarks.harness import REPO_DIR, SkipBenchmark, bench
+
+DATASET_DIR = os.path.join(REPO_DIR, "dataset_training")
+USER_CONTENT_CSV = os.path.join(DATASET_DIR, "user_content.csv")
+PREFER_OUTPUT_CSV = os.path.join(DATASET_DIR, "prefer_output.csv")
+
+
+def _rows(path):
+    """헤더를 뺀 줄 수 (CSV 인코딩이 utf-8 이 아닐 수 있으므로 바이트로 셈)"""
+    with open(path, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+CSV_ROWS = _rows(USER_CONTENT_CSV) if os.path.exists(USER_CONTENT_CSV) else 1
+
+
+def _quiet(fn, *args):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args)
+
+
+def _require(*paths):
+    for path in paths:
+        if not os.path.exists(path):
+            raise SkipBenchmark(f"{path} not found")
+
+
+@bench("dataset.read_csv_column", group="dataset", items=CSV_ROWS, unit="row")
+def read_csv_column():
+    """user_content.csv 의 user_content 컬럼"""
+    _require(USER_CONTENT_CSV)
+    from dataset_training.json_maker import read_csv_column
+    return lambda: _quiet(read_csv_column, USER_CONTENT_CSV, "user_content")
+
+
+@bench("dataset.create_sft_jsonl", group="dataset", items=CSV_ROWS, unit="row")
+def create_sft_jsonl():
+    """두 컬럼 → SFT JSONL 파일 쓰기 (임시 디렉터리)"""
+    _require(USER_CONTENT_CSV, PREFER_OUTPUT_CSV)
+    from dataset_training.json_maker import read_csv_column, create_sft_jsonl
+    user_data = _quiet(read_csv_column, USER_CONTENT_CSV, "user_content")
+    preferred_data = _quiet(read_csv_column, PREFER_OUTPUT_CSV, "prefer_output")
+    directory = tempfile.mkdtemp(prefix="bench-sft-")
+    atexit.register(shutil.rmtree, directory, ignore_errors=True)
+    output = os.path.join(directory, "sft_dataset.jsonl")
+    return lambda: _quiet(create_sft_jsonl, user_data, preferred_data, output)
@@ -0,0 +1,61 @@
+"""
+카메라 프레임 업로드 경로
+    - colab_vlm.send_frame: 640x480 프레임 JPEG 인코딩 (품질 70) + base64
+    - colab_vlm_video.VideoCapture.capture_frames: 프레임마다 resize + JPEG + base64
+    - 요청 본문: base64 JPEG 을 {'image': ...} JSON 으로 (requests 가 json= 으로 하는 일)
+
+인코딩은 colab_vlm.encode_frame / colab_vlm_video.encode_video_frame 을 그대로 측정합니다
+(picamera 는 촬영할 때만 import 되므로 카메라 없이 실행 가능). cv2 가 없으면 skipped 로 기록됩니다.
+"""
+
+import base64
+import json
+import os
+
+from benchmarks.harness import REPO_DIR, SkipBenchmark, bench
+
+FRAME_WIDTH, FRAME_HEIGHT = 640, 480  # colab_vlm.main 의 camera.resolution
+CAMERA_WIDTH, CAMERA_HEIGHT = 1280, 720  # 웹캠이 설정을 무시하고 돌려주는 해상도 (resize 필요)
+SAMPLE_IMAGE = os.path.join(REPO_DIR, "KakaoTalk_Photo_2025-05-16-03-37-07.jpeg")  # simulator 카메라와 같은 사진
+
+
+def _cv2():
+    try:
+        import cv2
+    except ImportError:
+        raise SkipBenchmark("cv2 (opencv-python) not installed")
+    return cv2
+
+
+def _frame(cv2, width, height):
+    """실제 사진을 카메라 해상도로 (무작위 잡음은 JPEG 크기/시간이 실제와 다름)"""
+    image = cv2.imread(SAMPLE_IMAGE)
+    if image is None:
+        raise SkipBenchmark(f"cannot read {SAMPLE_IMAGE}")
+    return cv2.resize(image, (width, height))
+
+
+@bench("vision.send_frame_encode", group="vision", unit="frame")
+def send_frame_encode():
+    """colab_vlm.send_frame 의 vlm.encode 구간 (encode_frame: imencode + b64encode)"""
+    cv2 = _cv2()
+    from colab_vlm import encode_frame
+    frame = _frame(cv2, FRAME_WIDTH, FRAME_HEIGHT)
+    return lambda: encode_frame(frame)
+
+
+@bench("vision.video_capture_frame", group="vision", unit="frame")
+def video_capture_frame():
+    """VideoCapture.capture_frames 의 프레임 하나 (encode_video_frame: resize + imencode + b64encode)"""
+    cv2 = _cv2()
+    from colab_vlm_video import encode_video_frame
+    frame = _frame(cv2, CAMERA_WIDTH, CAMERA_HEIGHT)
+    return lambda: encode_video_frame(frame)
+
+
+@bench("vision.request_body", group="vision", unit="request")
+def request_body():
+    """JPEG 파일 → base64 → JSON 요청 본문 (simulator 카메라가 VLM_face 로 보내는 것)"""
+    with open(SAMPLE_IMAGE, "rb") as f:
+        jpeg = f.read()
+    return lambda: json.dumps({'image': base64.b64encode(jpeg).decode('utf-8')})
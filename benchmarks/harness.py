@@ -0,0 +1,259 @@
+"""
+Benchmark harness
+=================
+벤치마크 등록 (@bench), 측정 (timeit 처럼 gc 를 끄고 autorange + repeat), 기계 정보,
+결과 JSON 저장과 두 결과 비교 (regression 판정).
+
+벤치마크 함수는 준비(setup) 를 하고 측정할 callable 을 돌려줍니다. 필요한 모듈(cv2 등)이
+없으면 SkipBenchmark 를 raise 하고, 결과 JSON 에 skipped 로 기록됩니다.
+
+    @bench("audio.calculate_db", group="audio", items=1, unit="block")
+    def calculate_db_block():
+        from vad import calculate_db
+        block = ...
+        return lambda: calculate_db(block)
+"""
+
+import gc
+import json
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from collections import namedtuple
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_DIR not in sys.path:
+    sys.path.insert(0, REPO_DIR)  # 최상위 스크립트 (vad, audio_codec ...) import 용
+
+SCHEMA_VERSION = 1
+REGRESSION_THRESHOLD = 0.10  # median 과 min 이 모두 10% 이상 느려지면 regression
+
+Benchmark = namedtuple("Benchmark", ["name", "group", "setup", "items", "unit", "description"])
+
+_registry = {}
+
+
+class SkipBenchmark(Exception):
+    """이 환경에서 실행할 수 없는 벤치마크 (필요한 패키지/장치 없음)"""
+
+
+def bench(name, group, items=1, unit="call"):
+    """벤치마크 등록 decorator - 함수는 측정할 callable 을 돌려줌
+
+    Args:
+        name (str): 결과 JSON 의 키 (비교 기준)
+        group (str): --group 으로 고를 때 쓰는 묶음
+        items (int): callable 한 번에 처리하는 단위 수 (per_item_us 계산용)
+        unit (str): 단위 이름 (block, frame, row ...)
+    """
+    def decorator(setup):
+        _registry[name] = Benchmark(name, group, setup, items, unit, (setup.__doc__ or "").strip())
+        return setup
+    return decorator
+
+
+def registered(groups=None, pattern=None):
+    return [b for b in _registry.values()
+            if (not groups or b.group in groups) and (not pattern or pattern in b.name)]
+
+
+# =========================
+# 측정
+# =========================
+def _time_loops(fn, loops):
+    start = time.perf_counter()
+    for _ in range(loops):
+        fn()
+    return time.perf_counter() - start
+
+
+def measure(fn, min_time=0.2, repeats=7):
+    """한 번 측정이 min_time(초) 이상이 되도록 loops 를 정하고 repeats 번 측정. 호출당 초 목록 반환"""
+    fn()  # warm-up (lazy import, 캐시)
+    gc_was_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        loops = 1
+        while True:
+            elapsed = _time_loops(fn, loops)
+            if elapsed >= min_time:
+                break
+            loops = max(loops * 2, int(loops * min_time / max(elapsed, 1e-9) * 1.1))
+        timings = [elapsed / loops] + [_time_loops(fn, loops) / loops for _ in range(repeats - 1)]
+    finally:
+        if gc_was_enabled:
+            gc.enable()
+    return loops, timings
+
+
+def run_benchmark(benchmark, min_time=0.2, repeats=7):
+    """등록된 벤치마크 하나 실행 → 결과 dict (시간은 호출당 us)"""
+    try:
+        fn = benchmark.setup()
+    except SkipBenchmark as e:
+        return {"group": benchmark.group, "skipped": str(e)}
+    loops, timings = measure(fn, min_time=min_time, repeats=repeats)
+    timings_us = sorted(t * 1e6 for t in timings)
+    quartiles = statistics.quantiles(timings_us, n=4) if len(timings_us) > 1 else [timings_us[0]] * 3
+    median = statistics.median(timings_us)
+    return {
+        "group": benchmark.group,
+        "unit": benchmark.unit,
+        "items": benchmark.items,
+        "loops": loops,
+        "repeats": repeats,
+        "min_us": round(timings_us[0], 3),
+        "median_us": round(median, 3),
+        "iqr_us": round(quartiles[2] - quartiles[0], 3),
+        "per_item_us": round(median / benchmark.items, 3),
+    }
+
+
+# =========================
+# 기계 정보
+# =========================
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=REPO_DIR).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def _version(module_name, attr="__version__"):
+    try:
+        module = __import__(module_name)
+    except ImportError:
+        return None
+    return getattr(module, attr, None)
+
+
+def machine_info():
+    """결과를 비교할 때 같은 환경인지 확인하기 위한 정보"""
+    return {
+        "hostname": socket.gethostname(),
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor() or None,
+        "cpu_count": os.cpu_count(),
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "numpy": _version("numpy"),
+        "soundfile": _version("soundfile"),
+        "libsndfile": _version("soundfile", "__libsndfile_version__"),
+        "cv2": _version("cv2"),
+    }
+
+
+# 다르면 비교 결과에 경고 (hostname 은 같은 기종의 다른 로봇일 수 있으므로 제외)
+COMPARABLE_KEYS = ("machine", "processor", "cpu_count", "python", "implementation", "numpy", "libsndfile", "cv2")
+
+
+def run(benchmarks, min_time=0.2, repeats=7, progress=True):
+    report = {
+        "schema": SCHEMA_VERSION,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_rev": _git_rev(),
+        "machine_info": machine_info(),
+        "settings": {"min_time": min_time, "repeats": repeats},
+        "results": {},
+    }
+    for benchmark in benchmarks:
+        result = run_benchmark(benchmark, min_time=min_time, repeats=repeats)
+        report["results"][benchmark.name] = result
+        if progress:
+            print_result(benchmark.name, result)
+    return report
+
+
+def print_result(name, result):
+    if "skipped" in result:
+        print(f"⏭️  {name:<30} skipped: {result['skipped']}")
+        return
+    per_item = (f"  {result['per_item_us']:10.2f}us/{result['unit']}" if result["items"] > 1 else "")
+    print(f"⏱️  {name:<30} {result['median_us']:11.2f}us ±{result['iqr_us']:<8.2f}"
+          f" (min {result['min_us']:.2f}us, {result['loops']}x{result['repeats']}){per_item}")
+
+
+def save(report, path):
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f"💾 Saved {path}")
+
+
+def load(path):
+    with open(path, "r", encoding="utf-8") as f:
+        report = json.load(f)
+    if report.get("schema") != SCHEMA_VERSION:
+        raise ValueError(f"{path}: unsupported benchmark schema {report.get('schema')}")
+    return report
+
+
+# =========================
+# 비교
+# =========================
+def compare(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """벤치마크별 {status, ratio, ...}. status: regression | improved | same | new | missing | skipped
+
+    median 과 min 이 모두 threshold 이상 느려져야 regression (한 번 튄 측정은 min 이 걸러냄)
+    """
+    rows = {}
+    for name in sorted(set(baseline["results"]) | set(current["results"])):
+        old, new = baseline["results"].get(name), current["results"].get(name)
+        if new is None:
+            rows[name] = {"status": "missing"}
+        elif old is None:
+            rows[name] = {"status": "new"}
+        elif "skipped" in old or "skipped" in new:
+            rows[name] = {"status": "skipped", "reason": new.get("skipped") or old.get("skipped")}
+        else:
+            ratio = new["median_us"] / old["median_us"]
+            min_ratio = new["min_us"] / old["min_us"]
+            if ratio > 1 + threshold and min_ratio > 1 + threshold:
+                status = "regression"
+            elif ratio < 1 - threshold and min_ratio < 1 - threshold:
+                status = "improved"
+            else:
+                status = "same"
+            rows[name] = {"status": status, "ratio": round(ratio, 3), "min_ratio": round(min_ratio, 3),
+                          "old_us": old["median_us"], "new_us": new["median_us"]}
+    return rows
+
+
+def machine_differences(baseline, current):
+    old, new = baseline["machine_info"], current["machine_info"]
+    return {key: (old.get(key), new.get(key)) for key in COMPARABLE_KEYS if old.get(key) != new.get(key)}
+
+
+def print_comparison(baseline, current, threshold=REGRESSION_THRESHOLD):
+    """비교 결과 출력. regression 개수를 반환"""
+    rows = compare(baseline, current, threshold)
+    print(f"\n📊 {baseline.get('git_rev') or baseline['timestamp']} → {current.get('git_rev') or current['timestamp']}"
+          f" (regression: median and min > +{threshold * 100:.0f}%)")
+    for key, (old, new) in machine_differences(baseline, current).items():
+        print(f"⚠️ {key} differs: {old} → {new} (timings may not be comparable)")
+    if baseline.get("settings") != current.get("settings"):
+        print(f"⚠️ settings differ: {baseline.get('settings')} → {current.get('settings')}")
+
+    icons = {"regression": "🔴", "improved": "🟢", "same": "  "}
+    for name, row in rows.items():
+        if row["status"] in icons:
+            print(f"{icons[row['status']]} {name:<30} {row['old_us']:11.2f}us → {row['new_us']:11.2f}us "
+                  f"{(row['ratio'] - 1) * 100:+7.1f}%")
+        else:
+            reason = f" ({row['reason']})" if row.get("reason") else ""
+            print(f"   {name:<30} {row['status']}{reason}")
+
+    regressions = [name for name, row in rows.items() if row["status"] == "regression"]
+    if regressions:
+        print(f"\n❌ {len(regressions)} regression(s): {', '.join(regressions)}")
+    else:
+        print("\n✅ No regressions")
+    return len(regressions)
@@ -0,0 +1,502 @@
+"""
+Record / replay cassettes for outbound API calls
+================================================
+api_clients 의 공유 HTTP 클라이언트 아래 (httpx transport / requests adapter) 에서 요청/응답을 기록하고
+재생합니다. OpenAI, ElevenLabs, VLM 서버 호출을 한 번 기록해 두면, 이후에는 네트워크 없이 같은 응답을
+(원래 지연 그대로 또는 지연 없이) 돌려줘서 파이프라인 변경을 오프라인에서 재현 가능하게 벤치마크할 수 있습니다.
+
+    API_CASSETTE=record|replay|auto     record: 실제 요청을 보내고 cassette 에 추가 기록 (새로 만들려면 빈 디렉토리)
+                                        replay: cassette 에서만 응답 (없으면 CassetteMiss)
+                                        auto:   있으면 재생, 없으면 실제 요청 후 추가 기록
+    API_CASSETTE_DIR=cassettes/default  저장 위치
+    API_CASSETTE_TIMING=original|zero|<배율>  재생 지연 (original = 기록된 첫 바이트/청크 도착 시각 그대로)
+
+Key 는 정규화한 요청의 content hash 입니다.
+    - method + path + 정렬한 query (host 는 제외 - stand-in 포트나 base URL 이 바뀌어도 같은 key)
+    - JSON body 는 key 를 정렬해서 다시 직렬화, multipart body 는 boundary 를 고정 문자열로 치환
+    - header 는 제외 (Authorization, SDK 버전, retry/idempotency header 등은 요청마다 다름)
+같은 key 가 여러 번 기록되면 (예: 같은 질문에 다른 대화 응답) 재생 시에도 기록된 순서대로 돌려주고,
+다 쓰면 마지막 응답을 반복합니다.
+
+Store:
+    <dir>/index.jsonl       - 요청 하나에 한 줄 (status, header, 청크 도착 시각, body 참조)
+    <dir>/blobs/ab/<sha256> - INLINE_MAX 보다 큰 body (오디오, JPEG, base64 이미지가 든 JSON 등).
+                              sha256 이름이라 같은 오디오/이미지는 한 번만 저장 (압축되면 .z)
+
+클라이언트는 처음 만들 때 layer 가 붙으므로 환경 변수는 프로세스 시작 전에, 코드에서는 use_cassette() 로 설정합니다.
+
+Usage:
+    API_CASSETTE=record API_CASSETTE_DIR=cassettes/run1 python main_robot_controller.py
+    API_CASSETTE=replay API_CASSETTE_DIR=cassettes/run1 python simulator.py --interactions 5
+    python cassette.py stats cassettes/run1
+    python cassette.py --demo          # stand-in 으로 기록 → 서버 종료 → original / zero timing 재생 비교
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+DEFAULT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cassettes", "default")
+MODES = ("record", "replay", "auto")
+INLINE_MAX = 2048  # 이보다 큰 body 는 blob 으로 (작은 JSON 응답은 index 에 그대로)
+# 재생할 때 의미가 없거나 다시 계산되는 response header
+DROP_HEADERS = {"date", "connection", "keep-alive", "transfer-encoding", "set-cookie"}
+
+
+class CassetteMiss(LookupError):
+    """replay 모드에서 기록되지 않은 요청"""
+
+
+def _sha256(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def normalize_body(content_type, body):
+    """content hash 용 body - JSON 은 key 정렬, multipart 는 boundary 고정"""
+    content_type = (content_type or "").lower()
+    if body and "json" in content_type:
+        try:
+            return json.dumps(json.loads(body), sort_keys=True, separators=(",", ":")).encode("utf-8")
+        except ValueError:
+            return body
+    if body and content_type.startswith("multipart/") and "boundary=" in content_type:
+        boundary = content_type.split("boundary=", 1)[1].split(";")[0].strip().strip('"')
+        return body.replace(boundary.encode("latin-1"), b"BOUNDARY")
+    return body or b""
+
+
+def request_key(method, url, content_type, body):
+    """(key, path) - key 는 method + path + 정렬한 query + 정규화한 body 의 sha256"""
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    path = parts.path + (f"?{query}" if query else "")
+    digest = hashlib.sha256(f"{method.upper()} {path}\n".encode("utf-8"))
+    digest.update(hashlib.sha256(normalize_body(content_type, body)).digest())
+    return digest.hexdigest(), path
+
+
+class Cassette:
+    """index.jsonl + content-addressed blob 디렉토리 (여러 스레드 / 프로세스가 같은 디렉토리에 기록 가능)"""
+
+    def __init__(self, directory=DEFAULT_DIR, mode="replay", timing="original"):
+        if mode not in MODES:
+            raise ValueError(f"Unknown cassette mode {mode!r} ({', '.join(MODES)})")
+        self.directory = directory
+        self.mode = mode
+        self.scale = {"original": 1.0, "zero": 0.0}.get(timing)
+        if self.scale is None:
+            self.scale = float(timing)
+        self.index_path = os.path.join(directory, "index.jsonl")
+        self.blob_dir = os.path.join(directory, "blobs")
+        self.entries = {}   # key → 기록된 응답 목록 (순서대로)
+        self.cursor = {}    # key → 다음에 재생할 위치
+        self.hits = 0
+        self.misses = 0
+        self.recorded = 0
+        self.lock = threading.Lock()
+        os.makedirs(self.blob_dir, exist_ok=True)
+        # record 도 기존 기록 뒤에 추가 (simulator 의 operator 프로세스들이 같은 디렉토리에 함께 기록)
+        if os.path.exists(self.index_path):
+            for entry in _read_index(self.index_path):
+                self.entries.setdefault(entry["key"], []).append(entry)
+
+    # -------------------------
+    # Blobs
+    # -------------------------
+    def _blob_path(self, digest):
+        return os.path.join(self.blob_dir, digest[:2], digest)
+
+    def put_body(self, data):
+        """작은 UTF-8 body 는 {"text"}, 나머지는 blob 에 저장하고 {"blob", "size"}"""
+        if len(data) <= INLINE_MAX:
+            try:
+                return {"text": data.decode("utf-8")}
+            except UnicodeDecodeError:
+                pass
+        digest, size = _sha256(data), len(data)
+        path = self._blob_path(digest)
+        if not (os.path.exists(path) or os.path.exists(path + ".z")):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            compressed = zlib.compress(data, 6)
+            if len(compressed) < len(data) * 0.9:
+                path, data = path + ".z", compressed
+            tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, path)  # 다른 프로세스가 같은 blob 을 동시에 써도 깨지지 않음
+        return {"blob": digest, "size": size}
+
+    def get_body(self, ref):
+        if "text" in ref:
+            return ref["text"].encode("utf-8")
+        path = self._blob_path(ref["blob"])
+        if os.path.exists(path + ".z"):
+            with open(path + ".z", "rb") as f:
+                return zlib.decompress(f.read())
+        with open(path, "rb") as f:
+            return f.read()
+
+    # -------------------------
+    # Record / lookup
+    # -------------------------
+    def record(self, key, method, url, request_body, status, headers, body, ttfb, chunks, total):
+        """응답 하나 기록 (ttfb/total/청크 도착 시각은 요청 시작 기준 초)"""
+        entry = {
+            "key": key,
+            "method": method,
+            "url": url,
+            "request": self.put_body(request_body),
+            "status": status,
+            "headers": {k.lower(): v for k, v in headers.items() if k.lower() not in DROP_HEADERS},
+            "response": self.put_body(body),
+            "ttfb_ms": round(ttfb * 1000, 2),
+            "total_ms": round(total * 1000, 2),
+            "chunks": [[round(t * 1000, 2), n] for t, n in chunks],
+            "recorded_at": time.time(),
+        }
+        line = json.dumps(entry, ensure_ascii=False) + "\n"
+        with self.lock:
+            # 한 번의 append write - 여러 프로세스가 같은 index 에 기록해도 줄이 섞이지 않음
+            with open(self.index_path, "a", encoding="utf-8") as f:
+                f.write(line)
+            self.entries.setdefault(key, []).append(entry)
+            self.recorded += 1
+
+    def lookup(self, key):
+        """기록된 순서대로 다음 응답 (다 쓰면 마지막 응답 반복). 없으면 None"""
+        with self.lock:
+            entries = self.entries.get(key)
+            if not entries:
+                self.misses += 1
+                return None
+            i = self.cursor.get(key, 0)
+            self.cursor[key] = i + 1
+            self.hits += 1
+            return entries[min(i, len(entries) - 1)]
+
+    def wait_until(self, start, offset_ms):
+        """재생 지연 - 요청 시작(start)부터 기록된 offset 의 scale 배까지"""
+        if self.scale:
+            delay = start + offset_ms / 1000 * self.scale - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+
+    def replay_chunks(self, entry):
+        """(body, [(offset_ms, 청크 bytes)]) - 기록된 청크 경계 그대로"""
+        body = self.get_body(entry["response"])
+        chunks, position = [], 0
+        for offset_ms, size in entry["chunks"]:
+            chunks.append((offset_ms, body[position:position + size]))
+            position += size
+        if position < len(body):
+            chunks.append((entry["total_ms"], body[position:]))
+        return body, chunks
+
+    # -------------------------
+    # Transport layers
+    # -------------------------
+    def httpx_transport(self, inner):
+        """httpx.Client(transport=...) 용 - inner 는 실제 httpx.HTTPTransport"""
+        return _make_httpx_transport(self, inner)
+
+    def requests_adapter(self, **kwargs):
+        """requests.Session.mount(...) 용 HTTPAdapter"""
+        return _make_requests_adapter(self, **kwargs)
+
+    def stats(self):
+        with self.lock:
+            return {"mode": self.mode, "directory": self.directory, "hits": self.hits, "misses": self.misses,
+                    "recorded": self.recorded, "keys": len(self.entries)}
+
+
+# =========================
+# httpx (openai / elevenlabs)
+# =========================
+def _make_httpx_transport(cassette, inner):
+    import httpx
+
+    class RecordingStream(httpx.SyncByteStream):
+        """응답을 그대로 흘려보내면서 청크 도착 시각을 기록 - 끝까지 읽힌 응답만 cassette 에 저장"""
+
+        def __init__(self, stream, start, on_complete):
+            self.stream = stream
+            self.start = start
+            self.on_complete = on_complete
+            self.parts, self.chunks = [], []
+            self.complete = False
+
+        def __iter__(self):
+            for chunk in self.stream:
+                self.chunks.append((time.perf_counter() - self.start, len(chunk)))
+                self.parts.append(chunk)
+                yield chunk
+            self.complete = True
+
+        def close(self):
+            self.stream.close()
+            if self.complete:
+                self.complete = False
+                self.on_complete(b"".join(self.parts), self.chunks, time.perf_counter() - self.start)
+
+    class ReplayStream(httpx.SyncByteStream):
+        def __init__(self, chunks, start):
+            self.chunks = chunks
+            self.start = start
+
+        def __iter__(self):
+            for offset_ms, data in self.chunks:
+                cassette.wait_until(self.start, offset_ms)
+                yield data
+
+    class CassetteTransport(httpx.BaseTransport):
+        def __init__(self):
+            self.inner = inner
+
+        @property
+        def _pool(self):
+            # api_clients.pool_stats() 가 연결 풀을 볼 수 있도록
+            return getattr(self.inner, "_pool", None)
+
+        def handle_request(self, request):
+            start = time.perf_counter()
+            body = request.read()
+            key, path = request_key(request.method, str(request.url), request.headers.get("content-type"), body)
+            if cassette.mode != "record":
+                entry = cassette.lookup(key)
+                if entry is not None:
+                    cassette.wait_until(start, entry["ttfb_ms"])
+                    _, chunks = cassette.replay_chunks(entry)
+                    return httpx.Response(entry["status"], headers=entry["headers"],
+                                          stream=ReplayStream(chunks, start), request=request)
+                if cassette.mode == "replay":
+                    raise CassetteMiss(f"No recorded response for {request.method} {path} in {cassette.directory}")
+
+            response = self.inner.handle_request(request)
+            ttfb = time.perf_counter() - start
+
+            def on_complete(data, chunks, total):
+                cassette.record(key, request.method, str(request.url), body, response.status_code,
+                                dict(response.headers), data, ttfb, chunks, total)
+
+            return httpx.Response(response.status_code, headers=response.headers,
+                                  stream=RecordingStream(response.stream, start, on_complete),
+                                  extensions=response.extensions, request=request)
+
+        def close(self):
+            self.inner.close()
+
+    return CassetteTransport()
+
+
+# =========================
+# requests (VLM 서버, 스트리밍 STT 세션)
+# =========================
+def _make_requests_adapter(cassette, **kwargs):
+    import datetime
+    import requests
+    from requests.adapters import HTTPAdapter
+    from requests.structures import CaseInsensitiveDict
+    from requests.utils import get_encoding_from_headers
+
+    class CassetteAdapter(HTTPAdapter):
+        """body 를 다 읽은 뒤 기록 (이 저장소의 requests 호출은 모두 stream=False)"""
+
+        def send(self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None):
+            start = time.perf_counter()
+            body = request.body or b""
+            if isinstance(body, str):
+                body = body.encode("utf-8")
+            key, path = request_key(request.method, request.url, request.headers.get("Content-Type"), body)
+            if cassette.mode != "record":
+                entry = cassette.lookup(key)
+                if entry is not None:
+                    return self._replay(entry, request, start)
+                if cassette.mode == "replay":
+                    raise CassetteMiss(f"No recorded response for {request.method} {path} in {cassette.directory}")
+
+            response = super().send(request, stream=stream, timeout=timeout, verify=verify, cert=cert,
+                                    proxies=proxies)
+            ttfb = time.perf_counter() - start
+            data = response.content  # 압축 해제된 body
+            total = time.perf_counter() - start
+            headers = {k: v for k, v in response.headers.items()
+                       if k.lower() not in ("content-encoding", "content-length")}
+            cassette.record(key, request.method, request.url, body, response.status_code, headers, data,
+                            ttfb, [(total, len(data))] if data else [], total)
+            return response
+
+        def _replay(self, entry, request, start):
+            body, _ = cassette.replay_chunks(entry)
+            cassette.wait_until(start, entry["total_ms"])
+            response = requests.Response()
+            response.status_code = entry["status"]
+            response.headers = CaseInsensitiveDict(entry["headers"])
+            response._content = body
+            response.encoding = get_encoding_from_headers(response.headers)
+            response.url = request.url
+            response.request = request
+            response.reason = "Replayed"
+            response.connection = self
+            response.elapsed = datetime.timedelta(milliseconds=entry["ttfb_ms"])
+            return response
+
+    return CassetteAdapter(**kwargs)
+
+
+# =========================
+# Active cassette
+# =========================
+_active = None
+_configured = False
+_active_lock = threading.Lock()
+
+
+def active_cassette():
+    """API_CASSETTE 환경 변수 (또는 use_cassette()) 로 설정된 cassette. 꺼져 있으면 None"""
+    global _active, _configured
+    with _active_lock:
+        if not _configured:
+            _configured = True
+            mode = os.getenv("API_CASSETTE", "").lower()
+            if mode and mode != "off":
+                _active = Cassette(os.getenv("API_CASSETTE_DIR", DEFAULT_DIR), mode,
+                                   os.getenv("API_CASSETTE_TIMING", "original"))
+                log.info(f"📼 API cassette: {mode} {_active.directory} (timing {os.getenv('API_CASSETTE_TIMING', 'original')})")
+        return _active
+
+
+def use_cassette(directory=DEFAULT_DIR, mode="replay", timing="original"):
+    """코드에서 cassette 설정 (mode=None 이면 끔). 이미 만들어진 공유 클라이언트는 닫고 다시 만들게 함"""
+    global _active, _configured
+    from api_clients import close_all
+
+    with _active_lock:
+        _active = Cassette(directory, mode, timing) if mode else None
+        _configured = True
+    close_all()
+    return _active
+
+
+# =========================
+# Stats / demo
+# =========================
+def _read_index(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def store_stats(directory):
+    """기록 수, key 수, path 별 요청 수, body 크기 (참조 합계 vs 실제 blob 디스크 사용량)"""
+    entries = _read_index(os.path.join(directory, "index.jsonl"))
+    referenced, inline = 0, 0
+    blobs = set()
+    paths = {}
+    for entry in entries:
+        path = urlsplit(entry["url"]).path
+        paths[path] = paths.get(path, 0) + 1
+        for ref in (entry["request"], entry["response"]):
+            if "text" in ref:
+                inline += len(ref["text"].encode("utf-8"))
+            else:
+                blobs.add(ref["blob"])
+                referenced += ref["size"]
+    on_disk = 0
+    for root, _, files in os.walk(os.path.join(directory, "blobs")):
+        on_disk += sum(os.path.getsize(os.path.join(root, name)) for name in files)
+    return {"entries": len(entries), "keys": len({e["key"] for e in entries}), "blobs": len(blobs),
+            "inline_bytes": inline, "blob_bytes_on_disk": on_disk,
+            "index_bytes": os.path.getsize(os.path.join(directory, "index.jsonl")), "paths": paths}
+
+
+def print_store_stats(directory):
+    s = store_stats(directory)
+    log.info(f"📼 {directory}: {s['entries']} responses, {s['keys']} distinct requests, {s['blobs']} blobs")
+    log.info(f"   index {s['index_bytes'] / 1024:.1f}KB (inline bodies {s['inline_bytes'] / 1024:.1f}KB), "
+          f"blobs {s['blob_bytes_on_disk'] / 1024:.1f}KB on disk")
+    for path, count in sorted(s["paths"].items(), key=lambda item: -item[1]):
+        log.info(f"   {count:5d}  {path}")
+
+
+def demo(directory=None):
+    """stand-in 서버로 기록 → 서버를 끈 뒤 original / zero timing 으로 재생해서 호출 시간 비교"""
+    import tempfile
+    from api_clients import get_openai_client, get_elevenlabs_client, get_http_session, close_all
+    from stub_servers import StandInServer
+
+    directory = directory or tempfile.mkdtemp(prefix="cassette-")
+
+    def calls(url):
+        openai_client = get_openai_client()
+        times = {}
+        start = time.perf_counter()
+        reply = openai_client.chat.completions.create(
+            model="gpt-4.1-mini", messages=[{"role": "user", "content": "VIRUS, what do you see?"}])
+        times["chat"] = time.perf_counter() - start
+        start = time.perf_counter()
+        first = None
+        for chunk in get_elevenlabs_client().text_to_speech.stream(
+                voice_id="ErXwobaYiN019PkySvjV", text=reply.choices[0].message.content,
+                model_id="eleven_flash_v2_5", output_format="mp3_22050_32"):
+            first = first or time.perf_counter() - start
+        times["tts first chunk"] = first
+        times["tts stream"] = time.perf_counter() - start
+        start = time.perf_counter()
+        get_http_session().post(f"{url}/VLM_face", json={"image": "x" * 50000}, timeout=10)
+        times["vlm"] = time.perf_counter() - start
+        return times, reply.choices[0].message.content
+
+    results = {}
+    with StandInServer(latency=0.2, tts_first_chunk_delay=0.3, tts_chunk_delay=0.05) as server:
+        os.environ["OPENAI_BASE_URL"] = f"{server.url}/v1"
+        os.environ.setdefault("OPENAI_API_KEY", "stand-in")
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        use_cassette(directory, "record")
+        url = server.url
+        results["record"], recorded_reply = calls(url)
+        calls(url)  # 같은 요청 두 번 - 응답 blob 은 dedup
+    # 서버 종료 후 재생 (네트워크 없음)
+    for timing in ("original", "zero"):
+        use_cassette(directory, "replay", timing)
+        results[f"replay {timing}"], reply = calls(url)
+        assert reply == recorded_reply, "replayed reply differs from the recording"
+    use_cassette(mode=None)
+    close_all()
+    for name in ("OPENAI_BASE_URL", "ELEVENLABS_BASE_URL"):
+        os.environ.pop(name)
+
+    names = list(results["record"])
+    log.info(f"\n📊 {'':<16}" + "".join(f"{name:>17}" for name in names))
+    for label, times in results.items():
+        log.info(f"   {label:<16}" + "".join(f"{times[name] * 1000:15.0f}ms" for name in names))
+    print_store_stats(directory)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Record/replay cassettes for outbound API calls")
+    sub = parser.add_subparsers(dest="command")
+    p_stats = sub.add_parser("stats", help="cassette 내용 요약")
+    p_stats.add_argument("directory")
+    parser.add_argument("--demo", action="store_true", help="stand-in 으로 기록/재생 비교")
+    args = parser.parse_args()
+    setup_logging()
+    if args.command == "stats":
+        print_store_stats(args.directory)
+    elif args.demo:
+        demo()
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    # api_clients 는 "cassette" 모듈의 active cassette 를 보므로 __main__ 이 아니라 그 모듈로 실행
+    import cassette
+    cassette.main()
@@ -5,6 +5,9 @@ from colab_vlm_video import send_video_to_server
 import picamera
 import time
 import picamera.array
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
 
 # =========================
 # 단일 이미지 캡처 및 업로드
@@ -48,9 +51,10 @@ def main(mode="image"):
     elif mode == "video":
         return capture_and_send_video()
     else:
-        print("지원되지 않는 모드입니다.")
+        log.warning("지원되지 않는 모드입니다.")
         return None
 
 # =========================
 if __name__ == "__main__":
+    setup_logging()
     main("image")
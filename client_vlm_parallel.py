@@ -1,6 +1,6 @@
 import threading
 import asyncio
-import requests
+from api_clients import get_http_session
 from picamera import PiCamera
 from datetime import datetime
 import base64
@@ -94,7 +94,7 @@ async def upload_file_async(filename_or_frames, server_url, filetype="image"):
         raise ValueError("지원하지 않는 filetype")
 
     headers = {"Content-Type": "application/json"}
-    response = await loop.run_in_executor(None, lambda: requests.post(server_url, json=payload, headers=headers))
+    response = await loop.run_in_executor(None, lambda: get_http_session().post(server_url, json=payload, headers=headers))
 
     print(f"✅ 서버 응답: {response.status_code}")
     if response.ok:
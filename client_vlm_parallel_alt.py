@@ -5,14 +5,18 @@ import time
 import threading
 from datetime import datetime
 from colab_vlm import send_frame  # Import from colab_vlm.py
+from tracing import span
 import picamera
 import picamera.array
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
 
 # =========================
 # 단일 이미지 캡처 및 업로드
 # =========================
 def capture_and_send_image():
-    with picamera.PiCamera() as camera:
+    with span("vlm.capture"), picamera.PiCamera() as camera:
         camera.resolution = (640, 480)
         time.sleep(2)
         
@@ -21,8 +25,8 @@ def capture_and_send_image():
             output.truncate(0)
             
             camera.capture(output, format="bgr")  # BGR은 OpenCV용
-            frame = output.array
-            result = send_frame(frame.copy(), "VLM_face")
+            frame = output.array.copy()
+    result = send_frame(frame, "VLM_face")
     return result
 
 # =========================
@@ -37,7 +41,7 @@ def capture_and_send_video():
     capture_thread.join()
 
     if not vcap.frames:
-        print("❌ 비디오 프레임 없음")
+        log.error("❌ 비디오 프레임 없음")
         return
 
     send_video_to_server(vcap.frames)
@@ -51,9 +55,10 @@ def main(mode="image"):
     elif mode == "video":
         return capture_and_send_video()
     else:
-        print("지원되지 않는 모드입니다.")
+        log.warning("지원되지 않는 모드입니다.")
         return None
 
 # =========================
 if __name__ == "__main__":
+    setup_logging()
     main("image")
@@ -1,10 +1,13 @@
 import cv2
-import requests
 import base64
 import time
-import picamera
-import picamera.array
 from threading import Thread
+from api_clients import get_http_session
+from rate_limit import limited
+from tracing import span
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
 
 # Colab 서버 주소 (코랩에서 실행 후 변경 필요)
 COLAB_URL = "https://fa2d-35-231-113-228.ngrok-free.app/"
@@ -12,34 +15,41 @@ COLAB_URL = "https://fa2d-35-231-113-228.ngrok-free.app/"
 MAX_FPS = 10  # 초당 전송 프레임 수 제한
 COMPRESS_QUALITY = 70  # JPEG 압축 품질 (1-100)
 
-def send_frame(frame, url):
-    # 프레임 압축
+def encode_frame(frame):
+    """프레임 JPEG 압축 + Base64 (카메라 없이 호출 가능 - benchmarks/bench_vision 에서 측정)"""
     _, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, COMPRESS_QUALITY])
+    return base64.b64encode(buffer).decode('utf-8')
+
+def send_frame(frame, url):
+    with span("vlm.encode"):
+        img_b64 = encode_frame(frame)
     
-    # Base64 인코딩
-    img_b64 = base64.b64encode(buffer).decode('utf-8')
-    
-    # 비동기 전송
+    # 비동기 전송 (공유 세션 - keep-alive 로 매 프레임 새 연결/TLS handshake 를 하지 않음)
     try:
-        response = requests.post(
-            COLAB_URL+url,
-            json={'image': img_b64},
-            headers={'Content-Type': 'application/json'},
-            timeout=20  # 3초 타임아웃
-        )
+        with limited("vlm", url), span("vlm.upload", endpoint=url, kb=round(len(img_b64) / 1024, 1)):  # 동시 요청 제한 (rate_limit)
+            response = get_http_session().post(
+                COLAB_URL+url,
+                json={'image': img_b64},
+                headers={'Content-Type': 'application/json'},
+                timeout=20  # 3초 타임아웃
+            )
         if response.status_code == 200:
             #print("응답:", response.json()['response'])
             result = response.json()['response']
-            print(result)
+            log.info(result)
             return result
         else:
-            print("서버 오류:", response.text)
+            log.error(f"❌ 서버 오류: {response.text}")
             return None
     except Exception as e:
-        print("전송 실패:", str(e))
+        log.error(f"❌ 전송 실패: {str(e)}")
         return None
 
 def main():
+    # picamera 는 촬영할 때만 (send_frame / encode_frame 은 카메라 없는 환경에서도 import 가능)
+    import picamera
+    import picamera.array
+
     with picamera.PiCamera() as camera:
         camera.resolution = (640, 480)
         time.sleep(2)
@@ -61,7 +71,7 @@ def main():
                 result = send_frame(frame.copy(), "VLM_face_area")
                 rt = time.time()-t
                 
-                print("전송 시간:", rt)
+                log.info(f"전송 시간: {rt}")
                 # make_img(result)
                 if result is not None:
                     visualize_results(frame.copy(), result)
@@ -84,7 +94,7 @@ def face_detect():
     # Thread(target=send_frame, args=(frame.copy(),)).start()
     result = send_frame(frame.copy(), "VLM_face_area")
     rt = time.time()-t
-    print("전송 시간:", rt)
+    log.info(f"전송 시간: {rt}")
     make_img(result)
     return 0
     
@@ -164,6 +174,7 @@ def visualize_results( frame, results, save_path='result.jpg'):
         return img_rgb
 
 if __name__ == "__main__":
+    setup_logging()
     main()
     # face_detect()
 
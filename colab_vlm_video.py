@@ -5,6 +5,9 @@ import time
 import json
 from queue import Queue
 import threading
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
 
 # Colab 서버 주소 (코랩에서 실행 후 변경 필요)
 COLAB_URL = "https://fb7a-34-126-104-160.ngrok-free.app/VLM_vid"
@@ -16,6 +19,13 @@ COMPRESS_QUALITY = 70  # JPEG 압축 품질
 RESIZE_WIDTH = 640
 RESIZE_HEIGHT = 480
 
+def encode_video_frame(frame):
+    """카메라 프레임 → RESIZE 크기 JPEG → base64 (카메라 없이 호출 가능 - benchmarks/bench_vision 에서 측정)"""
+    frame_resized = cv2.resize(frame, (RESIZE_WIDTH, RESIZE_HEIGHT))
+    _, buffer = cv2.imencode('.jpg', frame_resized, [cv2.IMWRITE_JPEG_QUALITY, COMPRESS_QUALITY])
+    return base64.b64encode(buffer).decode('utf-8')
+
+
 class VideoCapture:
     def __init__(self):
         self.frames = []
@@ -30,8 +40,8 @@ class VideoCapture:
         cap.set(cv2.CAP_PROP_FRAME_WIDTH, RESIZE_WIDTH)
         cap.set(cv2.CAP_PROP_FRAME_HEIGHT, RESIZE_HEIGHT)
         
-        print(f"📷 {CAPTURE_DURATION}초 동안 비디오 캡처 시작...")
-        print("(ESC 키를 누르면 조기 종료)")
+        log.info(f"📷 {CAPTURE_DURATION}초 동안 비디오 캡처 시작...")
+        log.info("(ESC 키를 누르면 조기 종료)")
         time.sleep(1)  # 잠시 대기
         start_time = time.time()
         frame_interval = 1.0 / FPS
@@ -41,7 +51,7 @@ class VideoCapture:
         while (time.time() - start_time) < CAPTURE_DURATION:
             ret, frame = cap.read()
             if not ret:
-                print("프레임 읽기 실패")
+                log.error("프레임 읽기 실패")
                 break
             
             current_time = time.time()
@@ -49,12 +59,8 @@ class VideoCapture:
             
             # FPS에 맞춰 프레임 캡처
             if current_time - last_capture_time >= frame_interval:
-                # 프레임 리사이즈
-                frame_resized = cv2.resize(frame, (RESIZE_WIDTH, RESIZE_HEIGHT))
-                
-                # JPEG 압축
-                _, buffer = cv2.imencode('.jpg', frame_resized, [cv2.IMWRITE_JPEG_QUALITY, COMPRESS_QUALITY])
-                img_b64 = base64.b64encode(buffer).decode('utf-8')
+                # 리사이즈 + JPEG 압축 + Base64
+                img_b64 = encode_video_frame(frame)
                 
                 # 스레드 안전하게 리스트에 추가
                 with self.lock:
@@ -77,18 +83,18 @@ class VideoCapture:
                 # cv2.imshow('Capture', frm_cp)
             
             if cv2.waitKey(1) == 27:  # ESC key
-                print("사용자가 캡처를 중단했습니다.")
+                log.info("사용자가 캡처를 중단했습니다.")
                 break
         
         cap.release()
         cv2.destroyAllWindows()
         
-        print(f"캡처 완료: 총 {frame_count}개 프레임 ({elapsed:.1f}초)")
+        log.info(f"캡처 완료: 총 {frame_count}개 프레임 ({elapsed:.1f}초)")
         self.capture_complete = True
 
 def send_video_to_server(frames):
     """서버로 비디오 전송 및 결과 받기"""
-    print(f"\n서버로 비디오 전송 중 ({len(frames)}개 프레임)...")
+    log.info(f"\n서버로 비디오 전송 중 ({len(frames)}개 프레임)...")
     
     try:
         # 요청 데이터 준비
@@ -109,28 +115,28 @@ def send_video_to_server(frames):
         
         if response.status_code == 200:
             result = response.json()
-            print(f"\n응답 수신 완료 (소요 시간: {elapsed_time:.2f}초)")
-            print(f"분석된 비디오 길이: {result['duration']:.1f}초")
-            print(f"총 프레임 수: {result['total_frames']}")
+            log.info(f"\n응답 수신 완료 (소요 시간: {elapsed_time:.2f}초)")
+            log.info(f"분석된 비디오 길이: {result['duration']:.1f}초")
+            log.info(f"총 프레임 수: {result['total_frames']}")
             
             # 비디오 전체 설명 출력
-            print("\n" + "="*80)
-            print("🎬 비디오 분석 결과")
-            print("="*80)
-            print(result['response'])
-            print("="*80)
+            log.info("\n" + "="*80)
+            log.info("🎬 비디오 분석 결과")
+            log.info("="*80)
+            log.info(result['response'])
+            log.info("="*80)
             
             return result
         else:
-            print(f"서버 오류: {response.status_code}")
-            print(response.text)
+            log.error(f"서버 오류: {response.status_code}")
+            log.info(response.text)
             return None
             
     except requests.exceptions.Timeout:
-        print("요청 시간 초과 (비디오가 너무 길거나 서버가 바쁠 수 있습니다)")
+        log.error("요청 시간 초과 (비디오가 너무 길거나 서버가 바쁠 수 있습니다)")
         return None
     except Exception as e:
-        print(f"전송 실패: {str(e)}")
+        log.error(f"전송 실패: {str(e)}")
         return None
 
 def main():
@@ -186,4 +192,5 @@ def main():
     print("\n프로그램을 종료합니다.")
 
 if __name__ == "__main__":
+    setup_logging()
     main()
\ No newline at end of file
@@ -2,12 +2,17 @@ from openai import OpenAI
 import csv
 import time
 import os
+import sys
+import logging
 from typing import List
 from dotenv import load_dotenv
 
 # .env 파일 로드
 load_dotenv()
 
+# 문장마다 나오는 진행 상황은 logger 로 (LOG_LEVEL=DEBUG 면 생성된 문장까지 출력)
+log = logging.getLogger(__name__)
+
 # =================================================================================
 # 사전 설정 구역 - 여기서 미리 값들을 설정할 수 있습니다
 # =================================================================================
@@ -120,12 +125,12 @@ class DatasetMaker:
                 generated_sentence = response.choices[0].message.content.strip()
                 similar_sentences.append(generated_sentence)
                 
-                print(f"비슷한 문장 생성 진행: {i+1}/{count}")
-                print(f"  생성된 문장: {generated_sentence}")
+                log.info(f"비슷한 문장 생성 진행: {i+1}/{count}")
+                log.debug(f"  생성된 문장: {generated_sentence}")
                 time.sleep(0.1)  # API 제한 방지
                 
             except Exception as e:
-                print(f"문장 생성 중 오류 발생 (시도 {i+1}): {e}")
+                log.warning(f"문장 생성 중 오류 발생 (시도 {i+1}): {e}")
                 # 오류 발생시 원본 문장을 약간 변형해서 추가
                 similar_sentences.append(f"{original_sentence} (변형 {i+1})")
         
@@ -165,12 +170,12 @@ class DatasetMaker:
                 paragraph_sentence = response.choices[0].message.content.strip()
                 paragraph_sentences.append(paragraph_sentence)
                 
-                print(f"줄글 변환 진행: {i+1}/{count}")
-                print(f"  변환된 문장: {paragraph_sentence}")
+                log.info(f"줄글 변환 진행: {i+1}/{count}")
+                log.debug(f"  변환된 문장: {paragraph_sentence}")
                 time.sleep(0.1)  # API 제한 방지
                 
             except Exception as e:
-                print(f"줄글 변환 중 오류 발생 (시도 {i+1}): {e}")
+                log.warning(f"줄글 변환 중 오류 발생 (시도 {i+1}): {e}")
                 # 오류 발생시 원본 문장을 약간 변형해서 추가
                 paragraph_sentences.append(f"{original_sentence} (줄글 변형 {i+1})")
         
@@ -218,7 +223,7 @@ class DatasetMaker:
         all_similar_sentences = []
         
         for idx, sentence in enumerate(sentences, 1):
-            print(f"\n[{idx}/{len(sentences)}] 처리 중인 문장: '{sentence}'")
+            log.info(f"\n[{idx}/{len(sentences)}] 처리 중인 문장: '{sentence}'")
             similar_sentences = self.generate_similar_sentences(sentence, 100)
             all_similar_sentences.extend(similar_sentences)
         
@@ -244,7 +249,7 @@ class DatasetMaker:
         all_paragraph_sentences = []
         
         for idx, sentence in enumerate(sentences, 1):
-            print(f"\n[{idx}/{len(sentences)}] 처리 중인 문장: '{sentence}'")
+            log.info(f"\n[{idx}/{len(sentences)}] 처리 중인 문장: '{sentence}'")
             paragraph_sentences = self.generate_paragraph_style_sentences(sentence, 100)
             all_paragraph_sentences.extend(paragraph_sentences)
         
@@ -353,4 +358,8 @@ def main():
 
 
 if __name__ == "__main__":
+    # 저장소 루트의 robot_log - 출력은 queue 를 거쳐 별도 스레드에서
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from robot_log import setup_logging
+    setup_logging()
     main()
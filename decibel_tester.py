@@ -3,6 +3,7 @@ import sounddevice as sd
 import matplotlib.pyplot as plt
 from matplotlib.animation import FuncAnimation
 import time
+from vad import VoiceActivityDetector
 
 # Audio settings
 SAMPLE_RATE = 16000  # Sampling rate
@@ -19,19 +20,14 @@ times = np.linspace(0, WINDOW_SIZE / SAMPLE_RATE, WINDOW_SIZE)
 db_levels = np.zeros(WINDOW_SIZE)
 current_db = -100  # Initial dB value
 
-# Decibel calculation function
-def calculate_db(audio_data):
-    """Calculate decibel level of audio data"""
-    if len(audio_data) == 0:
-        return -np.inf
-    # Calculate RMS value
-    rms = np.sqrt(np.mean(np.square(audio_data)))
-    # Convert RMS to dB (0 dB reference is maximum possible amplitude 1.0)
-    if rms > 0:
-        db = 20 * np.log10(rms)
-    else:
-        db = -np.inf
-    return db
+# Same detector engine as main_robot_controller.py (hysteresis + hangover)
+vad = VoiceActivityDetector(
+    SAMPLE_RATE,
+    frame_size=512,
+    start_db=THRESHOLD_DB,
+    stop_db=SILENCE_THRESHOLD_DB,
+    hangover=1.0
+)
 
 # Audio callback function
 def audio_callback(indata, frames, time_info, status):
@@ -39,9 +35,12 @@ def audio_callback(indata, frames, time_info, status):
     if status:
         print(f"⚠️ Audio status: {status}")
     
-    # Calculate dB of current frame
+    # Run the detector on the current block
     current_frame = indata[:, 0] if CHANNELS > 1 else indata.flatten()
-    current_db = calculate_db(current_frame)
+    for event in vad.process(current_frame):
+        if event.kind in ("start", "end"):
+            print(f"🎙️ VAD {event.kind} at {event.time:.2f}s ({event.db:.1f} dB)")
+    current_db = vad.last_db
     
     # Update buffer (FIFO method)
     audio_data = np.roll(audio_data, -len(current_frame))
@@ -65,7 +64,7 @@ def update_plot(frame):
     db_text.set_text(f'Current dB: {current_db:.1f}')
     
     # Update recording status display
-    if current_db > THRESHOLD_DB:
+    if vad.in_speech:
         status_text.set_text('Status: Recording')
         status_text.set_color('red')
     elif current_db < SILENCE_THRESHOLD_DB:
@@ -0,0 +1,211 @@
+"""
+Half-duplex input gating
+========================
+스피커에서 wait.mp3 / 응답 음성이 나오는 동안 마이크가 그 소리를 듣고 THRESHOLD_DB 를 넘으면
+새 녹음이 시작되고, 로봇 자신의 목소리로 VLM 업로드 + STT + LLM + TTS 호출이 한 번 더 나갑니다.
+(상호작용 처리 중에는 controller 가 입력을 받지 않으므로, 문제는 상호작용이 끝난 뒤에도 남는 소리:
+ 출력 장치 버퍼/방 잔향으로 재생 직후에 이어지는 tail, 상호작용이 일찍 끝났을 때 아직 재생 중인 wait.mp3)
+
+HalfDuplexGate 는 PlaybackEngine 이 재생 중이거나 재생이 끝난 지 tail_seconds 가 안 됐으면 녹음 시작을 막습니다.
+barge_in_margin_db 를 주면 에너지 기반 에코 판별을 합니다.
+    - 재생 중 마이크 레벨의 peak (천천히 감소) 를 에코 레벨로 추정하고
+    - 에코보다 margin 이상 큰 블록이 barge_in_blocks 번 연속되면 operator 가 말하는 것으로 보고 통과
+
+막은 트리거 (suppressed), 통과시킨 barge-in, 게이트를 끈 상태에서 재생 중에 시작된 상호작용 (echo - 낭비),
+응답 없이 끝난 상호작용 (wasted) 을 세어서 출력합니다.
+
+Usage:
+    gate = HalfDuplexGate(start_db=THRESHOLD_DB, barge_in_margin_db=10)
+    trigger = gate.observe(db, block_seconds)   # 녹음 중이 아닐 때 블록마다 - "idle" / "barge_in" / "echo"
+    if event.kind == "start" and not gate.allow(trigger): vad.reset()
+
+    python duplex.py --demo      # 합성 에코 + operator 발화로 게이트 on/off 비교
+"""
+
+import argparse
+import threading
+from playback import get_playback_engine
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+TAIL_SECONDS = 0.5          # 재생이 끝난 뒤에도 막는 시간(초) - 출력 버퍼 + 방 잔향
+BARGE_IN_BLOCKS = 3         # 에코보다 margin 이상 큰 블록이 이만큼 연속되면 barge-in (8kHz/256 기준 ~100ms)
+ECHO_DECAY_DB_PER_SECOND = 6.0  # 에코 peak 추정치가 내려가는 속도
+
+
+class HalfDuplexGate:
+    """재생 엔진 활동에 따라 녹음 시작을 막는 게이트 (audio worker 스레드에서 사용)"""
+
+    def __init__(self, engine=None, start_db=-35.0, tail_seconds=TAIL_SECONDS, barge_in_margin_db=None,
+                 barge_in_blocks=BARGE_IN_BLOCKS, echo_decay=ECHO_DECAY_DB_PER_SECOND, enabled=True):
+        """
+        Args:
+            engine: idle_for() 가 있는 재생 엔진 (None 이면 공유 PlaybackEngine - 처음 확인할 때 가져옴)
+            start_db (float): VAD 녹음 시작 임계값 (THRESHOLD_DB)
+            tail_seconds (float): 재생이 끝난 뒤에도 막는 시간(초)
+            barge_in_margin_db (float): 지정하면 에코 추정치보다 이만큼 큰 소리는 통과 (None 이면 재생 중엔 항상 막음)
+            barge_in_blocks (int): barge-in 으로 보기 위해 연속으로 넘어야 하는 블록 수
+            echo_decay (float): 에코 peak 추정치가 초당 내려가는 dB
+            enabled (bool): False 면 막지 않고 세기만 함 (재생 중 시작된 상호작용은 echo 로 기록)
+        """
+        self.engine = engine
+        self.start_db = start_db
+        self.tail_seconds = tail_seconds
+        self.barge_in_margin_db = barge_in_margin_db
+        self.barge_in_blocks = barge_in_blocks
+        self.echo_decay = echo_decay
+        self.enabled = enabled
+        self.lock = threading.Lock()
+        self.suppressed = 0       # 막은 트리거 (연속된 블록은 한 번으로)
+        self.barge_ins = 0        # 재생 중 통과시킨 트리거
+        self.interactions = {"idle": 0, "barge_in": 0, "echo": 0}  # 시작된 상호작용 (trigger 별)
+        self.wasted = 0           # 응답 없이 끝난 상호작용
+        self._reset_playback_state()
+
+    def _reset_playback_state(self):
+        self.echo_db = None
+        self._loud_run = 0
+        self._suppressing = False
+
+    def playback_active(self):
+        """재생 중이거나 재생이 끝난 지 tail_seconds 가 안 됨"""
+        engine = self.engine or get_playback_engine()
+        return engine.idle_for() < self.tail_seconds
+
+    def barge_in_db(self):
+        """지금 barge-in 으로 인정하는 레벨 (에코 추정치 + margin, 최소 start_db)"""
+        echo = self.start_db if self.echo_db is None else self.echo_db
+        return max(self.start_db, echo + self.barge_in_margin_db)
+
+    def observe(self, db, block_seconds):
+        """녹음 중이 아닐 때 블록마다 호출. 이 블록에서 녹음이 시작되면 붙일 trigger 를 반환
+
+        Returns:
+            str: "idle" (재생 없음) / "barge_in" (재생 중이지만 에코보다 충분히 큼) / "echo"
+        """
+        if not self.playback_active():
+            self._reset_playback_state()
+            return "idle"
+        if db < self.start_db:
+            self._suppressing = False
+        if self.barge_in_margin_db is not None:
+            if db >= self.barge_in_db():
+                self._loud_run += 1
+                if self._loud_run >= self.barge_in_blocks:
+                    return "barge_in"
+                return "echo"
+            self._loud_run = 0
+        # barge-in 후보가 아닌 블록으로 에코 레벨 추정 (peak hold + 천천히 감소)
+        decayed = self.start_db if self.echo_db is None else self.echo_db - self.echo_decay * block_seconds
+        self.echo_db = max(db, decayed)
+        return "echo"
+
+    def allow(self, trigger):
+        """VAD start 이벤트를 받아들일지. False 면 호출한 쪽에서 VAD 를 reset"""
+        if trigger == "barge_in":
+            with self.lock:
+                self.barge_ins += 1
+            self._reset_playback_state()
+            return True
+        if trigger == "echo" and self.enabled:
+            with self.lock:
+                if not self._suppressing:
+                    self.suppressed += 1
+            self._suppressing = True
+            return False
+        return True
+
+    def started(self, trigger):
+        """상호작용이 시작됨 (allow 가 True 였을 때)"""
+        with self.lock:
+            self.interactions[trigger] += 1
+
+    def finished(self, useful):
+        """상호작용이 끝남 - useful 이 False 면 (transcript/응답 없음) API 호출이 낭비된 것"""
+        if not useful:
+            with self.lock:
+                self.wasted += 1
+
+    def stats(self):
+        with self.lock:
+            return {"enabled": self.enabled, "suppressed": self.suppressed, "barge_ins": self.barge_ins,
+                    "interactions": dict(self.interactions), "echo_interactions": self.interactions["echo"],
+                    "wasted": self.wasted}
+
+    def print_stats(self):
+        s = self.stats()
+        mode = "on" if s["enabled"] else "off (counting only)"
+        log.info(f"🔇 Half-duplex gate {mode}: {s['suppressed']} echo triggers suppressed, {s['barge_ins']} barge-ins, "
+              f"{sum(s['interactions'].values())} interactions ({s['echo_interactions']} started by playback echo), "
+              f"{s['wasted']} wasted")
+
+
+# =========================
+# Demo
+# =========================
+class _ScriptedEngine:
+    """idle_for() 만 있는 재생 엔진 대역 (demo 용 - 재생 구간을 블록 번호로 지정)"""
+
+    def __init__(self, playing, block_seconds):
+        self.playing = playing
+        self.block_seconds = block_seconds
+        self.block = 0
+
+    def idle_for(self):
+        past = [end for start, end in self.playing if end <= self.block]
+        if any(start <= self.block < end for start, end in self.playing):
+            return 0.0
+        return (self.block - max(past)) * self.block_seconds if past else float("inf")
+
+
+def demo(block_seconds=0.032, start_db=-35.0, echo_db=-28.0, speech_db=-8.0):
+    """재생 2초 (에코 echo_db) + tail 잔향, 그 뒤 재생 중 operator 의 barge-in 을 게이트 on/off 로 비교"""
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    n = int(8 / block_seconds)
+    playing = [(int(0.5 / block_seconds), int(2.5 / block_seconds)), (int(4.0 / block_seconds), n)]
+    barge_in_at = int(6.0 / block_seconds)
+    levels = np.full(n, -55.0)
+    for start, end in playing:
+        levels[start:end] = echo_db + rng.normal(0, 2.5, end - start)
+        # 출력 버퍼 + 잔향: 재생이 끝난 뒤 0.3초 동안 30dB 감소
+        tail_end = min(end + int(0.3 / block_seconds), n)
+        levels[end:tail_end] = echo_db - np.linspace(0, 30, int(0.3 / block_seconds))[:tail_end - end]
+    levels[barge_in_at:barge_in_at + int(1.0 / block_seconds)] = speech_db + rng.normal(0, 2, int(1.0 / block_seconds))
+
+    log.info(f"📊 {n} blocks: playback at 0.5-2.5s and 4.0-8.0s (echo {echo_db} dB), "
+          f"operator barge-in at 6.0s ({speech_db} dB), start threshold {start_db} dB")
+    for name, kwargs in (("gate off", {"enabled": False}), ("suppress only", {}),
+                         ("barge-in +10dB", {"barge_in_margin_db": 10.0})):
+        engine = _ScriptedEngine(playing, block_seconds)
+        gate = HalfDuplexGate(engine, start_db, **kwargs)
+        starts = []
+        in_speech_until = -1
+        for i, db in enumerate(levels):
+            engine.block = i
+            if i < in_speech_until:
+                continue
+            trigger = gate.observe(db, block_seconds)
+            if db > start_db and gate.allow(trigger):  # VAD start 이벤트 대신 임계값만 확인
+                gate.started(trigger)
+                starts.append(f"{i * block_seconds:.2f}s {trigger}")
+                in_speech_until = i + int(1.0 / block_seconds)  # 녹음 1초 (그동안 게이트는 관여하지 않음)
+        log.info(f"{name:<15} recordings: {', '.join(starts) or '-'}")
+        gate.print_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Half-duplex input gating")
+    parser.add_argument("--demo", action="store_true", help="합성 에코로 게이트 on/off 비교")
+    args = parser.parse_args()
+    setup_logging()
+    if args.demo:
+        demo()
+        return
+    parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -11,15 +11,26 @@ Usage:
     python elevenlabs_tts.py "텍스트를 여기에 입력하세요"
     또는
     python elevenlabs_tts.py  # 대화형 모드
+    python elevenlabs_tts.py --batch prompts.jsonl --out-dir prompt_bank   # 배치 합성 (중단 후 이어서 실행)
 """
 
 import os
 import sys
+import json
+import time
+import hashlib
+import tempfile
 import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
 from dotenv import load_dotenv
 from elevenlabs.client import ElevenLabs
 from elevenlabs import play, save
+from tts_cache import get_tts_cache, cache_key, read_cached
+from playback import get_playback_engine
+from rate_limit import RequestRateLimiter
+from robot_log import setup_logging
 
 class ElevenLabsTTS:
     """ElevenLabs Text-to-Speech 클래스"""
@@ -51,25 +62,42 @@ class ElevenLabsTTS:
         "mp3_medium": "mp3_44100_64",     # 중간 품질 MP3
         "mp3_low": "mp3_22050_32",        # 저품질 MP3 (빠름)
         "wav": "pcm_44100",               # WAV 형식
+        "pcm_16k": "pcm_16000",           # raw PCM16 16kHz (--pcm 직접 재생용)
     }
 
-    def __init__(self, api_key: str = None):
+    # 음성 설정 (속도 조절 포함)
+    VOICE_SETTINGS = {
+        "stability": 1,
+        "similarity_boost": 1,
+        "style": 0,
+        "use_speaker_boost": True,
+        "speed": 0.7
+    }
+
+    def __init__(self, api_key: str = None, use_cache: bool = True, base_url: str = None):
         """
         ElevenLabsTTS 초기화
         
         Args:
             api_key (str): ElevenLabs API 키. None이면 환경변수에서 로드
+            use_cache (bool): 같은 텍스트/음성/모델이면 tts_cache 의 파일 사용 (API 호출 생략)
+            base_url (str): API 주소 (None 이면 ELEVENLABS_BASE_URL 또는 기본 주소, 로컬 stand-in 테스트용)
         """
         load_dotenv()
         
-        self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY")
+        self.base_url = base_url or os.getenv("ELEVENLABS_BASE_URL")
+        self.api_key = api_key or os.getenv("ELEVENLABS_API_KEY") or ("stand-in" if self.base_url else None)
         if not self.api_key:
             raise ValueError(
                 "ElevenLabs API 키가 필요합니다. "
                 ".env 파일에 ELEVENLABS_API_KEY를 설정하거나 매개변수로 전달하세요."
             )
         
-        self.client = ElevenLabs(api_key=self.api_key)
+        if self.base_url:
+            self.client = ElevenLabs(api_key=self.api_key, base_url=self.base_url)
+        else:
+            self.client = ElevenLabs(api_key=self.api_key)
+        self.cache = get_tts_cache() if use_cache else None
         print("✅ ElevenLabs 클라이언트 초기화 완료")
 
     def list_voices(self):
@@ -95,7 +123,8 @@ class ElevenLabsTTS:
         voice: str = "antoni",
         model: str = "multilingual_v2", 
         output_file: str = None,
-        play_audio: bool = True
+        play_audio: bool = True,
+        pcm: bool = False
     ):
         """
         텍스트를 음성으로 변환
@@ -106,9 +135,10 @@ class ElevenLabsTTS:
             model (str): 사용할 모델
             output_file (str): 저장할 파일명 (없으면 자동 생성)
             play_audio (bool): 생성 후 자동 재생 여부
+            pcm (bool): True 면 raw PCM 을 스트림으로 받아 sounddevice 로 바로 재생 (파일 저장 없음)
         
         Returns:
-            str: 생성된 오디오 파일 경로
+            str: 생성된 오디오 파일 경로 (pcm 모드는 None)
         """
         try:
             # 음성 ID 확인
@@ -117,6 +147,9 @@ class ElevenLabsTTS:
             # 모델 ID 확인
             model_id = self.MODELS.get(model.lower(), model)
             
+            if pcm:
+                return self._speak_pcm(text, voice_id, model_id)
+
             # 출력 포맷 고정 (고품질 MP3)
             output_format = "mp3_high"
             format_string = self.OUTPUT_FORMATS[output_format]
@@ -127,27 +160,16 @@ class ElevenLabsTTS:
             print(f"  🤖 모델: {model} ({model_id})")
             print(f"  📁 포맷: {output_format} ({format_string}) - 고품질 고정")
             
-            # 텍스트를 음성으로 변환 (속도 조절 추가)
-            audio = self.client.text_to_speech.convert(
-                text=text,
-                voice_id=voice_id,
-                model_id=model_id,
-                output_format=format_string,
-                voice_settings={
-                    "stability": 1,
-                    "similarity_boost": 1,
-                    "style": 0,
-                    "use_speaker_boost": True,
-                    "speed": 0.7
-                }
-            )
-            
             # 출력 파일명 고정
             if not output_file:
                 output_file = "wait.mp3"
-            
-            # 파일 저장
             output_path = Path(output_file)
+
+            audio, cached = self.synthesize_bytes(text, voice_id, model_id, format_string)
+            if cached:
+                print("  🗄️ 캐시 hit - API 호출 생략")
+
+            # 파일 저장
             save(audio, str(output_path))
             
             print(f"✅ 오디오 파일 생성 완료: {output_path.absolute()}")
@@ -170,6 +192,58 @@ class ElevenLabsTTS:
             print(f"❌ 오디오 생성 오류: {e}")
             return None
 
+    def synthesize_bytes(self, text: str, voice_id: str, model_id: str, format_string: str, limiter=None):
+        """오디오 바이트 합성 (캐시 우선). (audio, 캐시 hit 여부) 반환
+
+        limiter 가 있으면 실제 API 호출 전에만 limiter.acquire() (캐시 hit 은 제한하지 않음)
+        """
+        key = cache_key(text, voice_id, model_id, format_string, self.VOICE_SETTINGS)
+        cached = self.cache.get(key) if self.cache else None
+        audio = read_cached(cached) if cached else None
+        if audio:
+            # 캐시 hit - API 호출 없이 저장된 오디오 사용 (다른 워커가 evict 했으면 다시 합성)
+            return audio, True
+        if limiter:
+            limiter.acquire()
+        # 텍스트를 음성으로 변환 (속도 조절 추가)
+        audio = b"".join(self.client.text_to_speech.convert(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=format_string,
+            voice_settings=self.VOICE_SETTINGS
+        ))
+        if self.cache:
+            self.cache.put(key, audio, format_string, text)
+        return audio, False
+
+    def _speak_pcm(self, text: str, voice_id: str, model_id: str):
+        """raw PCM 을 디코딩/파일 없이 바로 재생 (라즈베리파이용)"""
+        format_string = self.OUTPUT_FORMATS["pcm_16k"]
+        sample_rate = int(format_string.split("_")[1])
+        print(f"🔄 PCM 직접 재생: '{text[:50]}{'...' if len(text) > 50 else ''}' ({format_string})")
+
+        key = cache_key(text, voice_id, model_id, format_string, self.VOICE_SETTINGS)
+        cached = self.cache.get(key) if self.cache else None
+        data = read_cached(cached) if cached else None
+        if data:
+            print("  🗄️ 캐시 hit - API 호출 생략")
+            chunks = [data]
+        else:
+            chunks = self.client.text_to_speech.stream(
+                text=text,
+                voice_id=voice_id,
+                model_id=model_id,
+                output_format=format_string,
+                voice_settings=self.VOICE_SETTINGS,
+                request_options={"chunk_size": sample_rate // 5}  # 100ms 단위
+            )
+        played = get_playback_engine().play_pcm(chunks, sample_rate).result()
+        if self.cache and not data and played:
+            self.cache.put(key, played, format_string, text)
+        print(f"✅ PCM 재생 완료 ({len(played) / 2 / sample_rate:.1f}s)")
+        return None
+
     def get_voice_info(self, voice_name: str):
         """특정 음성의 정보 출력"""
         voice_id = self.POPULAR_VOICES.get(voice_name.lower(), voice_name)
@@ -191,6 +265,121 @@ class ElevenLabsTTS:
             print(f"❌ 음성 정보 로드 오류: {e}")
 
 
+def load_batch(path: str):
+    """배치 입력 읽기 - .jsonl 이면 {"text", "id"?, "voice"?, "model"?} 한 줄씩, 아니면 한 줄에 한 문장 (#은 주석)"""
+    items = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            items.append(json.loads(line) if path.endswith(".jsonl") else {"text": line})
+    for i, item in enumerate(items):
+        if not item.get("id"):
+            slug = "".join(c if c.isalnum() else "_" for c in item["text"][:24].lower()).strip("_")
+            item["id"] = f"{i:04d}_{slug}"
+    return items
+
+
+def _read_manifest(manifest_path: Path):
+    """완료된 항목 {id: entry} (같은 id 가 여러 번 있으면 마지막 것)"""
+    done = {}
+    if manifest_path.exists():
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # 중단 시 마지막 줄이 잘렸을 수 있음
+                done[entry["id"]] = entry
+    return done
+
+
+def run_batch(tts: ElevenLabsTTS, batch_file: str, out_dir: str = "prompt_bank", voice: str = "antoni",
+              model: str = "multilingual_v2", output_format: str = "mp3_high", workers: int = 4,
+              per_minute: float = 60):
+    """배치 합성 - 동시 요청 workers 개, 분당 per_minute 요청 제한, manifest.jsonl 로 이어서 실행
+
+    Returns:
+        dict: 처리 결과 요약 (done, skipped, failed, bytes, seconds, ...)
+    """
+    items = load_batch(batch_file)
+    out_path = Path(out_dir)
+    out_path.mkdir(parents=True, exist_ok=True)
+    manifest_path = out_path / "manifest.jsonl"
+    format_string = tts.OUTPUT_FORMATS.get(output_format, output_format)
+    extension = "mp3" if format_string.startswith("mp3") else "pcm"
+
+    def item_hash(item, voice_id, model_id):
+        payload = json.dumps([item["text"], voice_id, model_id, format_string], ensure_ascii=False)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    # 이미 끝난 항목 (같은 텍스트/설정이고 파일이 남아 있으면) 은 건너뜀
+    done = _read_manifest(manifest_path)
+    pending = []
+    for item in items:
+        voice_id = tts.POPULAR_VOICES.get(item.get("voice", voice).lower(), item.get("voice", voice))
+        model_id = tts.MODELS.get(item.get("model", model).lower(), item.get("model", model))
+        digest = item_hash(item, voice_id, model_id)
+        entry = done.get(item["id"])
+        if entry and entry.get("hash") == digest and (out_path / entry["file"]).exists():
+            continue
+        pending.append((item, voice_id, model_id, digest))
+
+    print(f"📦 Batch: {len(items)} items, {len(items) - len(pending)} already done, {len(pending)} to synthesize")
+    print(f"  ⚙️ workers {workers}, rate limit {per_minute or 'unlimited'}/min, format {format_string} → {out_path}")
+
+    limiter = RequestRateLimiter(per_minute, burst=workers) if per_minute else None
+    manifest_lock = threading.Lock()
+    stats = {"done": 0, "failed": 0, "cached": 0, "bytes": 0}
+
+    def synthesize(item, voice_id, model_id, digest):
+        audio, cached = tts.synthesize_bytes(item["text"], voice_id, model_id, format_string, limiter=limiter)
+        filename = f"{item['id']}.{extension}"
+        # 임시 파일에 쓴 뒤 교체 - 중단되어도 반쯤 쓰인 파일이 남지 않음
+        fd, tmp_path = tempfile.mkstemp(dir=out_path, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(audio)
+        os.replace(tmp_path, out_path / filename)
+        entry = {"id": item["id"], "file": filename, "hash": digest, "text": item["text"],
+                 "bytes": len(audio), "cached": cached}
+        with manifest_lock:
+            with open(manifest_path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        return entry
+
+    start = time.perf_counter()
+    pool = ThreadPoolExecutor(max_workers=workers)
+    try:
+        futures = {pool.submit(synthesize, *job): job[0] for job in pending}
+        for future in as_completed(futures):
+            item = futures[future]
+            try:
+                entry = future.result()
+                stats["done"] += 1
+                stats["bytes"] += entry["bytes"]
+                stats["cached"] += entry["cached"]
+                print(f"  ✅ [{stats['done'] + stats['failed']}/{len(pending)}] {entry['file']} "
+                      f"({entry['bytes'] / 1024:.1f} KB{', cache' if entry['cached'] else ''})")
+            except Exception as e:
+                stats["failed"] += 1
+                print(f"  ❌ {item['id']}: {e}")
+    except KeyboardInterrupt:
+        print("\n⏸️ 중단됨 - 같은 명령을 다시 실행하면 manifest 기준으로 이어서 합성합니다.")
+        pool.shutdown(wait=True, cancel_futures=True)
+        raise
+    finally:
+        pool.shutdown(wait=True)
+    elapsed = time.perf_counter() - start
+
+    stats.update(skipped=len(items) - len(pending), seconds=elapsed)
+    print(f"\n📊 {stats['done']} clips in {elapsed:.1f}s "
+          f"({stats['done'] / elapsed * 60 if elapsed else 0:.1f} clips/min, "
+          f"{stats['bytes'] / elapsed / 1024 if elapsed else 0:.1f} KB/s), "
+          f"skipped {stats['skipped']}, failed {stats['failed']}, cache hits {stats['cached']}")
+    return stats
+
+
 def main():
     """메인 함수"""
     # 미리 정의된 wait.mp3용 대기 메시지
@@ -206,7 +395,9 @@ def main():
   python elevenlabs_tts.py "Hello World" --voice antoni --model flash_v2.5
   python elevenlabs_tts.py --list-voices
   python elevenlabs_tts.py --interactive
-  (출력 포맷은 고품질 MP3로 고정됨)
+  python elevenlabs_tts.py --batch prompts.txt --out-dir prompt_bank --workers 4 --rate 60
+  python elevenlabs_tts.py --batch prompts.jsonl --stand-in     # 로컬 stand-in 서버로 오프라인 실행
+  (출력 포맷은 고품질 MP3로 고정됨, --batch 는 --format 으로 변경 가능)
         """
     )
     
@@ -223,11 +414,41 @@ def main():
     parser.add_argument("--voice-info", help="특정 음성의 정보 출력")
     parser.add_argument("--interactive", "-i", action="store_true",
                        help="대화형 모드")
+    parser.add_argument("--pcm", action="store_true",
+                       help="raw PCM 을 받아 sounddevice 로 바로 재생 (파일 저장/MP3 디코딩 없음)")
+    parser.add_argument("--no-cache", action="store_true",
+                       help="TTS 캐시를 사용하지 않고 항상 API로 합성")
+    parser.add_argument("--batch", metavar="FILE",
+                       help="배치 합성 입력 (.txt: 한 줄에 한 문장, .jsonl: {\"text\", \"id\"?, \"voice\"?, \"model\"?})")
+    parser.add_argument("--out-dir", default="prompt_bank", help="배치 출력 폴더 (manifest.jsonl 포함)")
+    parser.add_argument("--workers", type=int, default=4, help="배치 동시 요청 수 (기본값: 4)")
+    parser.add_argument("--rate", type=float, default=60, help="배치 분당 최대 API 요청 수 (0: 제한 없음)")
+    parser.add_argument("--format", default="mp3_high", choices=list(ElevenLabsTTS.OUTPUT_FORMATS),
+                       help="배치 출력 포맷 (기본값: mp3_high)")
+    parser.add_argument("--stand-in", action="store_true",
+                       help="로컬 stand-in TTS 서버(stub_servers.py)를 띄워서 오프라인으로 실행")
     
     args = parser.parse_args()
+    setup_logging()  # tts_cache / rate_limit 의 log 출력
     
+    server = None
+    if args.stand_in:
+        from stub_servers import StandInServer
+
+        server = StandInServer().start()
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        print(f"🧪 Stand-in TTS server: {server.url}")
+
     try:
-        tts = ElevenLabsTTS()
+        tts = ElevenLabsTTS(use_cache=not args.no_cache)
+
+        # 배치 합성
+        if args.batch:
+            run_batch(tts, args.batch, out_dir=args.out_dir, voice=args.voice, model=args.model,
+                      output_format=args.format, workers=args.workers, per_minute=args.rate)
+            if tts.cache:
+                tts.cache.print_stats()
+            return
         
         # 음성 목록 출력
         if args.list_voices:
@@ -261,7 +482,8 @@ def main():
                     voice=args.voice,
                     model=args.model,
                     output_file=args.output,
-                    play_audio=not args.no_play
+                    play_audio=not args.no_play,
+                    pcm=args.pcm
                 )
             return
         
@@ -272,7 +494,8 @@ def main():
                 voice=args.voice,
                 model=args.model,
                 output_file=args.output,
-                play_audio=not args.no_play
+                play_audio=not args.no_play,
+                pcm=args.pcm
             )
         else:
             # 텍스트가 없으면 자동으로 wait.mp3 생성
@@ -285,12 +508,17 @@ def main():
                 output_file=args.output or "wait.mp3",  # 명시적으로 wait.mp3 지정
                 play_audio=not args.no_play
             )
+        if tts.cache:
+            tts.cache.print_stats()
                 
     except KeyboardInterrupt:
         print("\n👋 사용자에 의해 중단되었습니다.")
     except Exception as e:
         print(f"❌ 오류 발생: {e}")
         sys.exit(1)
+    finally:
+        if server:
+            server.stop()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,158 @@
+"""
+Adaptive endpointing
+====================
+고정된 SILENCE_DURATION(1.0초) 대신 침묵이 시작될 때마다 hangover 길이를 정합니다.
+
+- 발화가 충분히 길고, 침묵 직전 에너지가 떨어지는 추세(문장 끝 억양)면 "끝난 것 같음" → 짧게
+- 발화가 짧거나 에너지가 유지/상승한 채 끊겼으면 "문장 중간 쉼" → 길게
+
+THRESHOLD_DB / SILENCE_THRESHOLD_DB 판정은 VoiceActivityDetector 가 그대로 하고,
+이 클래스는 VoiceActivityDetector(endpointer=...) 로 붙어서 hangover 만 결정합니다.
+
+Usage:
+    # 녹음 세션 재생: 고정 1.0초 규칙 대비 endpoint 지연 median/p95 비교
+    python endpointing.py sessions/*.wav [--min-hangover 0.35] [--max-hangover 1.2]
+"""
+
+import argparse
+from collections import deque
+import numpy as np
+from vad import VoiceActivityDetector
+
+
+class AdaptiveEndpointer:
+    """Chooses a hangover per pause from utterance length and the energy trend before it."""
+
+    def __init__(
+        self,
+        min_hangover=0.35,
+        max_hangover=1.2,
+        min_utterance=0.4,
+        complete_utterance=1.5,
+        trend_window=0.5,
+        falling_slope=-20.0
+    ):
+        """
+        Args:
+            min_hangover (float): 발화가 끝난 것으로 보일 때의 hangover(초)
+            max_hangover (float): 문장 중간 쉼으로 보일 때의 hangover(초)
+            min_utterance (float): 이보다 짧은 발화는 미완성으로 간주(초)
+            complete_utterance (float): 이보다 긴 발화는 길이 점수 만점(초)
+            trend_window (float): 침묵 직전 에너지 추세를 볼 구간(초)
+            falling_slope (float): 이 기울기(dB/초) 이하로 떨어지면 추세 점수 만점
+        """
+        self.min_hangover = min_hangover
+        self.max_hangover = max_hangover
+        self.min_utterance = min_utterance
+        self.complete_utterance = complete_utterance
+        self.trend_window = trend_window
+        self.falling_slope = falling_slope
+        self._recent = deque()
+        self.reset()
+
+    def reset(self):
+        """새 발화 시작"""
+        self._recent.clear()
+        self._recent_seconds = 0.0
+        self.voiced_seconds = 0.0
+        self.last_score = None
+
+    def observe(self, db, seconds):
+        """음성 프레임 하나(dB, 길이)를 기록"""
+        self.voiced_seconds += seconds
+        self._recent.append((db, seconds))
+        self._recent_seconds += seconds
+        while self._recent_seconds - self._recent[0][1] >= self.trend_window:
+            self._recent_seconds -= self._recent.popleft()[1]
+
+    def energy_slope(self):
+        """침묵 직전 trend_window 구간의 에너지 기울기 (dB/초)"""
+        if len(self._recent) < 3:
+            return 0.0
+        db = np.array([d for d, _ in self._recent], dtype=np.float64)
+        t = np.cumsum([s for _, s in self._recent])
+        return float(np.polyfit(t, db, 1)[0])
+
+    def completeness(self):
+        """0(문장 중간) ~ 1(발화 끝) 점수"""
+        span = max(self.complete_utterance - self.min_utterance, 1e-6)
+        length_score = np.clip((self.voiced_seconds - self.min_utterance) / span, 0.0, 1.0)
+        trend_score = np.clip(self.energy_slope() / self.falling_slope, 0.0, 1.0)
+        return float(0.5 * length_score + 0.5 * trend_score)
+
+    def hangover(self, default):
+        """현재 침묵에 적용할 hangover(초). default 는 VAD 의 고정 hangover (사용하지 않음)"""
+        self.last_score = self.completeness()
+        return self.max_hangover - self.last_score * (self.max_hangover - self.min_hangover)
+
+
+# =========================
+# 오프라인 평가: 녹음 세션 재생
+# =========================
+def endpoint_delays(vad, path):
+    """파일을 처리해서 발화마다 (마지막 음성 끝 → end 이벤트) 지연(초)을 반환"""
+    events, _, _ = vad.process_file(path)
+    delays = []
+    speech_end = None
+    for event in events:
+        if event.kind == "pause":
+            speech_end = event.time - vad.frame_size / vad.sample_rate
+        elif event.kind == "resume":
+            speech_end = None
+        elif event.kind == "end" and speech_end is not None:
+            delays.append(event.time - speech_end)
+            speech_end = None
+    return delays
+
+
+def _summary(label, delays, utterances):
+    if not delays:
+        print(f"  {label:<10} | no utterances detected")
+        return
+    print(f"  {label:<10} | utterances {utterances:3d} | median {np.median(delays) * 1000:6.0f}ms | "
+          f"p95 {np.percentile(delays, 95) * 1000:6.0f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded sessions: adaptive vs fixed endpointing")
+    parser.add_argument("files", nargs="+", help="녹음된 세션 WAV 파일")
+    parser.add_argument("--threshold-db", type=float, default=-35.0, help="THRESHOLD_DB (기본값: -35)")
+    parser.add_argument("--silence-threshold-db", type=float, default=-35.0, help="SILENCE_THRESHOLD_DB (기본값: -35)")
+    parser.add_argument("--silence-duration", type=float, default=1.0, help="고정 규칙 hangover (기본값: 1.0)")
+    parser.add_argument("--min-hangover", type=float, default=0.35, help="적응형 최소 hangover (기본값: 0.35)")
+    parser.add_argument("--max-hangover", type=float, default=1.2, help="적응형 최대 hangover (기본값: 1.2)")
+    parser.add_argument("--frame-size", type=int, default=256, help="분석 프레임 크기 (기본값: 256)")
+    args = parser.parse_args()
+
+    import soundfile as sf
+
+    fixed_delays, adaptive_delays = [], []
+    for path in args.files:
+        sample_rate = sf.info(path).samplerate
+        common = dict(
+            frame_size=args.frame_size,
+            start_db=args.threshold_db,
+            stop_db=args.silence_threshold_db,
+            hangover=args.silence_duration
+        )
+        fixed = endpoint_delays(VoiceActivityDetector(sample_rate, **common), path)
+        adaptive = endpoint_delays(VoiceActivityDetector(
+            sample_rate,
+            endpointer=AdaptiveEndpointer(args.min_hangover, args.max_hangover),
+            **common
+        ), path)
+        fixed_delays.extend(fixed)
+        adaptive_delays.extend(adaptive)
+        print(f"📁 {path}: fixed {len(fixed)} utterances, adaptive {len(adaptive)} utterances")
+
+    # 적응형이 더 많은 발화로 쪼갰다면 문장 중간에서 끊긴 것 (hangover 가 너무 짧음)
+    print("\n📊 Endpoint delay (last voiced frame → end of recording)")
+    _summary(f"fixed {args.silence_duration:.1f}s", fixed_delays, len(fixed_delays))
+    _summary("adaptive", adaptive_delays, len(adaptive_delays))
+    if len(adaptive_delays) > len(fixed_delays):
+        print(f"⚠️ Adaptive split {len(adaptive_delays) - len(fixed_delays)} extra utterance(s) - "
+              f"consider a larger --max-hangover")
+
+
+if __name__ == "__main__":
+    main()
@@ -16,6 +16,7 @@ import threading
 from LLM_function import process_voice_text as process_for_commands, process_voice_audio as process_for_audio_commands
 from LLM_conversation import process_voice_text as process_for_conversation, process_voice_audio as process_for_audio_conversation
 from text_to_audio import text_to_speech
+from robot_log import setup_logging
 from client_vlm_parallel_alt import main as run_vlm_alt
 import json
 
@@ -772,6 +773,8 @@ def run_spike(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
 		print("\n프로그램 강제 종료.")
 
 if __name__ == "__main__":
+	# LLM / TTS 모듈의 log 출력 (robot_log)
+	setup_logging()
 	# Display welcome message
 	print("=" * 50)
 	print("가짜 VIRUS COMBAT ROBOT CONTROL SYSTEM")
@@ -0,0 +1,353 @@
+"""
+Asyncio interaction pipeline
+============================
+main_robot_controller.MultiThreadManager 는 단계마다 스레드 + Event + lock 을 직접 관리했고,
+이전 작업이 아직 돌고 있으면 "already running" 을 출력하고 요청을 버렸습니다.
+process_recorded_audio 도 STT → VLM → 대화 순서로 40초 timeout 을 하나씩 기다렸습니다.
+
+InteractionPipeline 은 단계를 Stage(이름, 함수, 의존 단계) 로 선언하고 asyncio 이벤트 루프
+(전용 스레드) 에서 실행합니다.
+    - 의존 단계가 모두 끝나면 바로 시작, 서로 독립인 단계는 동시에 실행
+    - 단계별 timeout / concurrency 제한 (동시 실행 수를 넘으면 버리지 않고 순서대로 대기)
+    - blocking SDK 호출(일반 함수)은 ThreadPoolExecutor 에서 실행, async 함수는 루프에서 직접 실행
+    - 의존 단계가 실패하면 건너뜀 (optional=True 인 단계가 실패하면 None 을 넘기고 계속)
+    - Interaction.cancel() 로 남은 단계 전체 취소
+    - 상호작용마다 단계별 시작/종료 시각과 critical path (끝나는 시각을 결정한 의존 사슬) 출력
+
+입력(inputs) 은 나중에 다른 스레드에서 provide() 로 넣는 값입니다. 예를 들어 controller 는
+녹음 시작 시 상호작용을 만들어 VLM 단계를 바로 시작하고, 녹음이 끝나면 "utterance" 를 넣습니다.
+
+Usage:
+    python interaction_pipeline.py                  # 시뮬레이션 단계로 순차 실행과 비교
+    python interaction_pipeline.py --vision-timeout 0.5
+"""
+
+import argparse
+import asyncio
+import functools
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+
+class StageSkipped(Exception):
+    """단계를 실행하지 않음 (의존 단계 실패, 또는 단계 함수가 처리할 입력이 없다고 판단)"""
+
+
+class Stage:
+    """파이프라인 단계 선언
+
+    Args:
+        name (str): 단계 이름 (의존 단계의 결과는 이 이름의 keyword 인자로 전달됨)
+        fn (callable): 단계 함수. 일반 함수는 executor 에서, async 함수는 루프에서 실행
+        deps (tuple): 먼저 끝나야 하는 단계 / 입력 이름
+        timeout (float): 실행 시간 제한(초), None 이면 제한 없음
+        concurrency (int): 상호작용 전체에서 동시에 실행할 수 있는 수
+        optional (bool): True 면 실패/timeout 시 의존 단계에 None 을 넘기고 계속
+    """
+
+    def __init__(self, name, fn, deps=(), timeout=None, concurrency=1, optional=False):
+        self.name = name
+        self.fn = fn
+        self.deps = tuple(deps)
+        self.timeout = timeout
+        self.concurrency = concurrency
+        self.optional = optional
+
+
+class StageRecord:
+    """상호작용 한 번에서 단계 하나의 실행 기록 (시각은 Interaction.t0 기준 초)"""
+
+    def __init__(self, name, deps=()):
+        self.name = name
+        self.deps = deps
+        self.status = "pending"  # pending / running / ok / error / timeout / skipped / cancelled / input
+        self.ready = None        # 의존 단계가 모두 끝난 시각
+        self.start = None        # concurrency 슬롯을 얻어 실행을 시작한 시각
+        self.end = None
+        self.result = None
+        self.error = None
+
+    @property
+    def duration(self):
+        if self.start is None or self.end is None:
+            return None
+        return self.end - self.start
+
+
+class Interaction:
+    """pipeline.start() 가 반환하는 상호작용 한 번. 다른 스레드에서 provide() / cancel() / result() 사용"""
+
+    def __init__(self, pipeline):
+        self.pipeline = pipeline
+        self.t0 = time.perf_counter()
+        self.records = {name: StageRecord(name) for name in pipeline.inputs}
+        for stage in pipeline.stages:
+            self.records[stage.name] = StageRecord(stage.name, stage.deps)
+        self._inputs = {}  # 이름 → asyncio.Future (루프 스레드에서만 접근)
+        self.future = None
+
+    def _now(self):
+        return time.perf_counter() - self.t0
+
+    def _input(self, name):
+        if name not in self._inputs:
+            self._inputs[name] = self.pipeline.loop.create_future()
+        return self._inputs[name]
+
+    def _set_input(self, name, value):
+        future = self._input(name)
+        if not future.done():
+            record = self.records[name]
+            record.status, record.start, record.end, record.result = "input", 0.0, self._now(), value
+            future.set_result(value)
+
+    def provide(self, name, value):
+        """입력 값을 넣음 (어느 스레드에서나 호출 가능)"""
+        if name not in self.pipeline.inputs:
+            raise KeyError(f"Unknown input '{name}'. Declared inputs: {', '.join(self.pipeline.inputs)}")
+        self.pipeline.loop.call_soon_threadsafe(self._set_input, name, value)
+
+    def cancel(self):
+        """남은 단계를 모두 취소 (executor 에서 이미 실행 중인 blocking 호출은 끝날 때까지 계속됨)"""
+        return self.future.cancel()
+
+    def result(self, timeout=None):
+        """단계 이름 → 결과 (성공한 단계만)"""
+        return self.future.result(timeout)
+
+    def done(self):
+        return self.future.done()
+
+    def add_done_callback(self, fn):
+        """모든 단계가 끝나면 fn(interaction) 호출 (루프 스레드에서 실행)"""
+        self.future.add_done_callback(lambda _: fn(self))
+
+    # -------------------------
+    # Report
+    # -------------------------
+    def critical_path(self):
+        """가장 늦게 끝난 단계에서 시작해서, 매번 가장 늦게 끝난 의존 단계를 따라 올라간 사슬"""
+        finished = [r for r in self.records.values() if r.end is not None]
+        if not finished:
+            return []
+        record = max(finished, key=lambda r: r.end)
+        path = [record]
+        while record.deps:
+            deps = [self.records[d] for d in record.deps if self.records[d].end is not None]
+            if not deps:
+                break
+            record = max(deps, key=lambda r: r.end)
+            path.append(record)
+        return path[::-1]
+
+    def print_report(self):
+        log.info("📋 Interaction stages (ms since interaction start):")
+        for record in self.records.values():
+            if record.status == "pending":
+                continue
+            span = ""
+            if record.start is not None and record.end is not None:
+                span = f"{record.start * 1000:6.0f} → {record.end * 1000:6.0f}"
+                if record.status != "input":
+                    span += f" ({record.duration * 1000:.0f}ms"
+                    if record.ready is not None and record.start - record.ready > 0.001:
+                        span += f", queued {(record.start - record.ready) * 1000:.0f}ms"
+                    span += ")"
+            error = f" - {record.error}" if record.error else ""
+            log.info(f"  {record.name:<10} {record.status:<9} {span}{error}")
+
+        path = self.critical_path()
+        if path:
+            steps, previous = [], 0.0
+            for record in path:
+                steps.append(f"{record.name} +{(record.end - previous) * 1000:.0f}ms")
+                previous = record.end
+            log.info(f"🧭 Critical path: {' → '.join(steps)} = {path[-1].end * 1000:.0f}ms")
+
+
+class InteractionPipeline:
+    """Stage 목록을 asyncio 로 실행하는 파이프라인 (전용 이벤트 루프 스레드 + blocking 호출용 executor)"""
+
+    def __init__(self, stages, inputs=(), max_workers=8):
+        self.stages = list(stages)
+        self.inputs = tuple(inputs)
+        self._check(self.stages, self.inputs)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="stage")
+        self.loop = asyncio.new_event_loop()
+        self._semaphores = {}  # 단계 이름 → asyncio.Semaphore (루프 스레드에서 생성)
+        self._interactions = set()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="pipeline-loop", daemon=True)
+        self._thread.start()
+
+    @staticmethod
+    def _check(stages, inputs):
+        """의존 이름 확인 + stage 순서가 의존 순서인지 (순환 없음) 확인"""
+        known = set(inputs)
+        for stage in stages:
+            missing = [d for d in stage.deps if d not in known]
+            if missing:
+                raise ValueError(f"Stage '{stage.name}' depends on undeclared/later stage(s): {', '.join(missing)}")
+            if stage.name in known:
+                raise ValueError(f"Duplicate stage name '{stage.name}'")
+            known.add(stage.name)
+
+    def start(self, **inputs):
+        """상호작용을 시작 (입력에 의존하지 않는 단계는 바로 실행). 입력은 여기서 주거나 나중에 provide()"""
+        interaction = Interaction(self)
+        interaction.future = asyncio.run_coroutine_threadsafe(self._run(interaction), self.loop)
+        self._interactions.add(interaction)
+        interaction.future.add_done_callback(lambda _: self._interactions.discard(interaction))
+        for name, value in inputs.items():
+            interaction.provide(name, value)
+        return interaction
+
+    def run(self, timeout=None, **inputs):
+        """start() 후 끝날 때까지 대기 (입력을 모두 주는 경우)"""
+        interaction = self.start(**inputs)
+        interaction.result(timeout)
+        return interaction
+
+    def close(self):
+        """실행 중인 상호작용을 취소하고 루프를 멈춤"""
+        for interaction in list(self._interactions):
+            interaction.cancel()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=2.0)
+        self.executor.shutdown(wait=False)
+
+    # -------------------------
+    # Event loop side
+    # -------------------------
+    async def _run(self, interaction):
+        tasks = {}
+        for stage in self.stages:
+            tasks[stage.name] = asyncio.ensure_future(self._run_stage(stage, interaction, tasks))
+        try:
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+        except asyncio.CancelledError:
+            for task in tasks.values():
+                task.cancel()
+            await asyncio.gather(*tasks.values(), return_exceptions=True)
+            raise
+        return {name: record.result for name, record in interaction.records.items() if record.status == "ok"}
+
+    async def _dependency(self, name, interaction, tasks):
+        """의존 단계 / 입력의 결과. optional 단계가 실패했으면 None, 그 외 실패는 StageSkipped"""
+        if name in tasks:
+            try:
+                # shield: 이 단계가 취소돼도 같은 의존 단계를 기다리는 다른 단계에는 영향 없음
+                return await asyncio.shield(tasks[name])
+            except asyncio.CancelledError:
+                if tasks[name].cancelled():
+                    raise StageSkipped(f"{name} cancelled")
+                raise
+            except Exception:
+                record = interaction.records[name]
+                if next(s for s in self.stages if s.name == name).optional:
+                    return None
+                raise StageSkipped(f"{name} {record.status}")
+        return await asyncio.shield(interaction._input(name))
+
+    async def _run_stage(self, stage, interaction, tasks):
+        record = interaction.records[stage.name]
+        try:
+            values = {}
+            for dep in stage.deps:
+                values[dep] = await self._dependency(dep, interaction, tasks)
+            record.ready = interaction._now()
+
+            semaphore = self._semaphores.setdefault(stage.name, asyncio.Semaphore(stage.concurrency))
+            await semaphore.acquire()
+            record.status, record.start = "running", interaction._now()
+            if asyncio.iscoroutinefunction(stage.fn):
+                try:
+                    record.result = await asyncio.wait_for(stage.fn(**values), stage.timeout)
+                finally:
+                    semaphore.release()
+            else:
+                future = self.loop.run_in_executor(self.executor, functools.partial(stage.fn, **values))
+                try:
+                    record.result = await asyncio.wait_for(asyncio.shield(future), stage.timeout)
+                finally:
+                    # timeout/취소돼도 스레드는 계속 돌기 때문에 끝날 때까지 슬롯을 잡고 있음
+                    # (예: 카메라를 쓰는 VLM 단계가 다음 상호작용과 겹치지 않도록)
+                    if future.done():
+                        semaphore.release()
+                    else:
+                        future.add_done_callback(lambda _: semaphore.release())
+            record.status = "ok"
+            return record.result
+        except asyncio.TimeoutError:
+            record.status, record.error = "timeout", f"> {stage.timeout:.1f}s"
+            log.warning(f"⚠️ [{stage.name}] timed out after {stage.timeout:.1f}s")
+            raise
+        except StageSkipped as e:
+            record.status, record.error = "skipped", str(e)
+            raise
+        except asyncio.CancelledError:
+            record.status = "cancelled"
+            raise
+        except Exception as e:
+            record.status, record.error = "error", str(e)
+            log.error(f"❌ [{stage.name}] {e}")
+            raise
+        finally:
+            if record.status != "pending":
+                record.end = interaction._now()
+
+
+# =========================
+# Demo
+# =========================
+def _simulated(name, seconds, result=None):
+    def stage(**_):
+        time.sleep(seconds)
+        return result if result is not None else name
+    stage.__name__ = name
+    return stage
+
+
+def demo(vision_timeout=5.0, speech_seconds=1.0):
+    """controller 와 같은 모양의 단계 (sleep 으로 흉내) 를 순차 실행과 비교"""
+    durations = {"stt": 0.4, "vision": 1.8, "commands": 0.6, "robot": 0.8, "reply": 0.9, "tts": 1.2}
+    stages = [
+        Stage("vision", _simulated("vision", durations["vision"]), timeout=vision_timeout, optional=True),
+        Stage("stt", _simulated("stt", durations["stt"]), deps=("utterance",), timeout=5.0),
+        Stage("commands", _simulated("commands", durations["commands"]), deps=("stt", "vision"), timeout=5.0),
+        Stage("robot", _simulated("robot", durations["robot"]), deps=("commands",), timeout=5.0),
+        Stage("reply", _simulated("reply", durations["reply"]), deps=("stt", "vision"), timeout=5.0),
+        Stage("tts", _simulated("tts", durations["tts"]), deps=("reply",), timeout=5.0),
+    ]
+    pipeline = InteractionPipeline(stages, inputs=("utterance",))
+    try:
+        # 녹음 시작 시 상호작용 시작 → speech_seconds 뒤에 발화 종료
+        interaction = pipeline.start()
+        time.sleep(speech_seconds)
+        endpoint = time.perf_counter()
+        interaction.provide("utterance", b"")
+        interaction.result(timeout=30)
+        asynchronous = time.perf_counter() - endpoint
+        interaction.print_report()
+    finally:
+        pipeline.close()
+
+    after_speech = sum(durations.values()) - min(durations["vision"], speech_seconds)
+    log.info(f"\n📊 End of speech → all stages done: {asynchronous * 1000:.0f}ms "
+          f"(one after another: {after_speech * 1000:.0f}ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Asyncio interaction pipeline demo")
+    parser.add_argument("--vision-timeout", type=float, default=5.0, help="VLM 단계 timeout (초)")
+    parser.add_argument("--speech", type=float, default=1.0, help="발화 길이 (초)")
+    args = parser.parse_args()
+    setup_logging()
+    demo(vision_timeout=args.vision_timeout, speech_seconds=args.speech)
+
+
+if __name__ == "__main__":
+    main()
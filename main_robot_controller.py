@@ -1,246 +1,234 @@
-from multiprocessing import process
-import os
-import io
-import queue
 import time
-import json
-from typing import Any
-import numpy as np
-import sounddevice as sd
-import soundfile as sf
-from dotenv import load_dotenv
-import openai
+_IMPORT_START = time.perf_counter()  # time-to-ready 측정 기준 (startup_profile.py 참고)
+import os
 import threading
-import pygame
+from concurrent.futures import ThreadPoolExecutor, wait
+from dotenv import load_dotenv
 # Import the modules needed for the complete system
+# sounddevice / soundfile / openai / elevenlabs / pygame / cv2 / picamera / pi_exercise 는
+# 처음 쓰는 곳에서 import 합니다 (python startup_profile.py 로 모듈별 import 비용 확인)
 from LLM_function import process_voice_text as process_for_commands, process_voice_audio as process_for_audio_commands
 from LLM_conversation import process_voice_text as process_for_conversation, process_voice_audio as process_for_audio_conversation
-from text_to_audio import text_to_speech
-from client_vlm_parallel_alt import main as run_vlm_alt
-
-try:
-    from pi_exercise import main as run_spike
-    SPIKE_AVAILABLE = True
-    print("✅ SPIKE robot control available")
-except ImportError as e:
-    print(f"⚠️ SPIKE robot control unavailable: {e}")
-    SPIKE_AVAILABLE = False
-    def run_spike(command):
-        print(f"🤖 [SIMULATION] Would execute robot command: {command}")
+from text_to_audio import text_to_speech, tts_health, PCM_FORMAT, OUTPUT_FORMAT
+from audio_buffer import RingBufferRecorder
+from playback import get_playback_engine
+from audio_pipeline import CaptureStage, AudioWorker
+from vad import VoiceActivityDetector
+from endpointing import AdaptiveEndpointer
+from streaming_stt import StreamingTranscriber, HTTPChunkTransport, WhisperWindowTransport
+from api_clients import (get_openai_client, get_http_session, print_pool_stats, default_endpoints, warm_up,
+                         print_warm_up, KeepAlive)
+from tts_pipeline import speak_chunked, split_sentences
+from tts_cache import get_tts_cache, prewarm as prewarm_tts_cache, STOCK_PHRASES
+from interaction_pipeline import InteractionPipeline, Stage, StageSkipped
+from rate_limit import limited, print_limiter_stats
+from tracing import begin_trace, end_trace, current_trace, span, event as trace_event
+from robot_log import setup_logging, get_logger, Meter
+from duplex import HalfDuplexGate
+
+
+def run_vlm_alt(mode="image"):
+    """client_vlm_parallel_alt (cv2, picamera) 는 첫 VLM 요청 때 import"""
+    from client_vlm_parallel_alt import main
+    return main(mode=mode)
+
+
+SPIKE_AVAILABLE = None  # load_spike() 전에는 알 수 없음
+_spike = None
+_spike_lock = threading.Lock()
+
+
+def _simulate_spike(command):
+    log.info(f"🤖 [SIMULATION] Would execute robot command: {command}")
+
+
+def load_spike():
+    """pi_exercise (bt, client_face_parallel) import - 실패하면 시뮬레이션으로 대체"""
+    global _spike, SPIKE_AVAILABLE
+    with _spike_lock:
+        if _spike is None:
+            try:
+                from pi_exercise import main as run
+                SPIKE_AVAILABLE = True
+                log.info("✅ SPIKE robot control available")
+            except ImportError as e:
+                log.warning(f"⚠️ SPIKE robot control unavailable: {e}")
+                SPIKE_AVAILABLE = False
+                run = _simulate_spike
+            _spike = run
+    return _spike
+
+
+def run_spike(command):
+    return load_spike()(command)
 
 # Load environment variables for API keys
 load_dotenv()
-api_lock = threading.Lock()
-sound_lock = threading.Lock()
 
 def convert_audio_to_text_via_api(audio_data, sample_rate):
     """Converts audio data to text using OpenAI's Whisper API."""
-    global client # 전역 OpenAI 클라이언트 사용
+    from audio_codec import encode_audio, as_upload_file
+
+    client = get_openai_client()  # 공유 OpenAI 클라이언트 (LLM 모듈과 같은 연결 풀)
 
     if audio_data is None or len(audio_data) == 0:
-        print("❌ No audio data to transcribe.")
+        log.error("❌ No audio data to transcribe.")
         return None
 
     try:
-        wav_buffer = io.BytesIO()
-        # Whisper API는 다양한 오디오 형식을 지원하지만, WAV가 일반적입니다.
-        # LLM_function.py/LLM_conversation.py 에서 사용된 PCM_U8을 유지하여 파일 크기를 줄입니다.
-        sf.write(wav_buffer, audio_data, sample_rate, format="WAV", subtype="PCM_U8")
-        wav_buffer.name = "audio_for_stt.wav" # 파일 이름 명시 (API 일부에서 필요할 수 있음)
-        wav_buffer.seek(0)
-
-        print(f"📤 Uploading audio ({len(wav_buffer.getvalue())/1024:.1f}KB) to Whisper API...")
+        # Whisper API는 wav/flac/ogg 등을 지원합니다. 코덱은 UPLOAD_CODEC 으로 선택
+        # (python audio_codec.py --sweep 결과로 결정)
+        encoded = encode_audio(audio_data, sample_rate, codec=UPLOAD_CODEC)
+        wav_buffer = as_upload_file(encoded) # 파일 이름으로 포맷 판단
+
+        log.info(f"📤 Uploading audio ({encoded.n_bytes/1024:.1f}KB {encoded.codec}, encoded in {encoded.encode_ms:.1f}ms) to Whisper API...")
         
         # client.audio.transcriptions.create는 파일 객체를 직접 받습니다.
-        response = client.audio.transcriptions.create(
-            model="gpt-4o-mini-transcribe",
-            file=wav_buffer, # wav_buffer는 BytesIO 객체이므로 파일처럼 동작합니다.
-            response_format="text",
-            language="en" # 영어로 고정 (필요시 변경 가능)
-        )
+        with limited("openai", "stt"), span("stt.upload", codec=encoded.codec, kb=round(encoded.n_bytes / 1024, 1)):
+            response = client.audio.transcriptions.create(
+                model="gpt-4o-mini-transcribe",
+                file=wav_buffer, # wav_buffer는 BytesIO 객체이므로 파일처럼 동작합니다.
+                response_format="text",
+                language="en" # 영어로 고정 (필요시 변경 가능)
+            )
         
         # Whisper API 응답은 텍스트 문자열 자체입니다 (response_format="text"인 경우).
         transcribed_text = response.strip() if response else None
         return transcribed_text
     except Exception as e:
-        print(f"❌ Whisper API transcription error: {e}")
+        log.error(f"❌ Whisper API transcription error: {e}")
         return None
 
-class MultiThreadManager:
-    def __init__(self):
-        self.vlm_thread = None
-        self.vlm_result = None
-        self.vlm_complete = threading.Event()
-        
-        self.conversation_thread = None
-        self.conversation_result = None
-        self.conversation_complete = threading.Event()
-        
-        # self.face_thread = None
-        # self.face_result = None
-        # self.face_complete = threading.Event()
-        
-        self.lock = threading.Lock()
-    def start_vlm_processing(self):
-        with self.lock:
-            if self.vlm_thread is None or not self.vlm_thread.is_alive():
-                self.vlm_complete.clear()
-                self.vlm_thread = threading.Thread(
-                    target=self._run_vlm,
-                    daemon=True
-                )
-                self.vlm_thread.start()
-            else:
-                print("[VLM] Processing already running")
-    def _run_vlm(self):
-        try:
-            result = run_vlm_alt(mode="image")
-            with self.lock:
-                self.vlm_result = result
-        except Exception as e:
-            print(f"VLM error: {e}")
-            with self.lock:
-                self.vlm_result = None
-        finally:
-            self.vlm_complete.set()
-    def get_vlm_result(self, timeout=30):
-        finished = self.vlm_complete.wait(timeout)
-        with self.lock:
-            return self.vlm_result if finished else None
-    def start_text_conversation_processing(self, transcribed_text, vlm_result):
-        with self.lock:
-            if self.conversation_thread is None or not self.conversation_thread.is_alive():
-                self.conversation_complete.clear()
-                self.conversation_thread = threading.Thread(
-                    target=self._run_text_conversation,
-                    args = [transcribed_text, vlm_result],
-                    daemon=True
-                )
-                self.conversation_thread.start()
-            else:
-                print("[Conversation] Processing already running")
-    def _run_text_conversation(self, transcribed_text, vlm_result):
-        result = False
+# =========================
+# Interaction stages (interaction_pipeline 에서 실행 - 일반 함수는 executor 스레드에서)
+# =========================
+def speak_response(text):
+    """응답 음성을 합성/재생하고 재생이 끝날 때까지 대기 (CHUNKED_TTS / PCM_TTS / STREAMING_TTS 설정에 따라)"""
+    if CHUNKED_TTS and len(split_sentences(text)) > 1:
+        # 여러 문장이면 문장별로 병렬 합성하고 준비되는 대로 순서대로 재생
+        report = speak_chunked(
+            text,
+            voice_id=VOICE_ID,
+            on_playback_start=lambda: mark_time("response_playback"),
+            pcm=PCM_TTS
+        )
+        return report["first_audio"] is not None
+    if PCM_TTS:
+        # raw PCM 을 받아 바로 출력 장치로 (response.mp3 저장/MP3 디코딩 없음). 재생한 PCM 바이트, 실패하면 None
+        return text_to_speech(
+            text=text,
+            voice_id=VOICE_ID,
+            pcm=True,
+            on_playback_start=lambda: mark_time("response_playback")
+        )
+    if STREAMING_TTS:
+        # 첫 오디오 청크가 도착하면 바로 재생 (파일 저장은 백그라운드, 재생 완료까지 대기)
+        response_file_path = text_to_speech(
+            text=text,
+            voice_id=VOICE_ID,
+            output_filename=RESPONSE_AUDIO_FILE,
+            stream=True,
+            on_playback_start=lambda: mark_time("response_playback")
+        )
+        if response_file_path:
+            log.info(f"Conversational audio response saved to {RESPONSE_AUDIO_FILE}")
+        return True
+
+    response_file_path = text_to_speech(
+        text=text,
+        voice_id=VOICE_ID,
+        output_filename=RESPONSE_AUDIO_FILE
+    )
+    if response_file_path and os.path.exists(response_file_path):
+        log.info(f"Conversational audio response saved to {RESPONSE_AUDIO_FILE}")
+        # 재생 큐에 넣음 - wait 안내 음성이 아직 재생 중이면 그 다음에 재생됨
+        log.info("🔊 Playing response audio...")
+        get_playback_engine().play(
+            response_file_path,
+            on_start=lambda: mark_time("response_playback")
+        ).result()
+    return True
+
+def stage_vision():
+    """녹음 시작과 동시에 카메라 이미지를 VLM 으로 분석"""
+    vlm_result = run_vlm_alt(mode="image")
+    mark_time("vlm")
+    if vlm_result:
+        log.info(f"🎯 VLM analysis complete: {vlm_result[:100]}..." if len(vlm_result) > 100 else f"🎯 VLM analysis complete: {vlm_result}")
+    else:
+        log.warning("⚠️ VLM processing failed")
+    return vlm_result
+
+def stage_wait_cue(utterance):
+    """안내 음성은 재생 엔진에서 재생 (OVERLAP_WAIT_CUE 가 False 면 재생이 끝날 때까지 STT 를 미룸)"""
+    wait_cue = play_wait_cue()
+    if not OVERLAP_WAIT_CUE:
         try:
-            with api_lock:
-                conversation_response_text = process_for_conversation(
-                    transcribed_text,
-                    additional_prompt=f"[Image/Video Description]: {vlm_result}"
-                )
-            
-            if conversation_response_text:
-                print("\n🔊 Converting response to speech...")
-                response_file_path = text_to_speech(
-                    text=conversation_response_text,
-                    voice_id=VOICE_ID,
-                    output_filename=RESPONSE_AUDIO_FILE
-                )
-                result = True
-                
-                if response_file_path and os.path.exists(response_file_path):
-                    print(f"Conversational audio response saved to {RESPONSE_AUDIO_FILE}")
-                    # Try to play the audio response
-                    try:
-                        import pygame
-                        pygame.mixer.init()
-                        pygame.mixer.music.load(response_file_path)
-                        pygame.mixer.music.play()
-                        print("🔊 Playing response audio...")
-                        while pygame.mixer.music.get_busy():
-                            pygame.time.Clock().tick(10)
-                    except ImportError:
-                        print(f"Audio saved to {RESPONSE_AUDIO_FILE}. Install pygame to enable autoplay.")
-                    except Exception as e:
-                        print(f"Error playing audio: {e}")
-            else:
-                print("⚠️ No conversational response generated.")
-                
-            with self.lock:
-                self.conversation_result = result
+            wait_cue.result()
         except Exception as e:
-            print(f"Conversation (text input) error: {e}")
-            with self.lock:
-                self.conversation_result = False
-        finally:
-            self.conversation_complete.set()
-    def get_conversation_result(self, timeout=30):
-        finished = self.conversation_complete.wait(timeout)
-        with self.lock:
-            return self.conversation_result if finished else None
-    # def start_converation_processing(self, audio_data, vlm_result):
-    #     def _converation_wrapper():
-    #         self.conversation_running.set()
-    #         try:
-    #             with api_lock:
-    #                 conversation_response = process_for_audio_conversation(
-    #                 audio_data,
-    #                 SAMPLE_RATE,
-    #                 additional_prompt=f"[Image/Video Description]: {vlm_result}"
-    #                 )
-    #             if conversation_response:
-    #                 print("\n🔊 Converting response to speech...")
-    #                 text_to_speech(
-    #                     text=conversation_response,
-    #                     voice_id=VOICE_ID,
-    #                     output_filename=OUTPUT_AUDIO_FILE
-    #                 )
-    #                 # Optionally play the audio response
-    #                 try:
-    #                     print("pygame start")
-    #                     # pygame.mixer.init()
-    #                     # pygame.mixer.music.load(OUTPUT_AUDIO_FILE)
-    #                     # pygame.mixer.music.play()
-    #                     print("pypgame end")
-    #                     # while pygame.mixer.music.get_busy():
-    #                     #     pygame.time.Clock().tick(10)
-    #                 except ImportError:
-    #                     print(f"Audio saved to {OUTPUT_AUDIO_FILE}. Install pygame to enable autoplay.")
-    #         finally:
-    #             print("conversation end")
-    #             self.conversation_running.clear()
-    #     self.conversation_thread = threading.Thread(target=_converation_wrapper, daemon=True)
-    #     self.conversation_thread.start()
-    # def start_face_processing(self):
-    #     with self.lock:
-    #         if self.face_thread is None or not self.face_thread.is_alive():
-    #             self.face_complete.clear()
-    #             self.face_thread = threading.Thread(
-    #                 target=self._run_face,
-    #                 daemon=True
-    #             )
-    #             self.face_thread.start()
-    #         else:
-    #             print("[face] Processing already running")
-    # def _run_face(self):
-    #     try:
-    #         with self.lock:
-    #             self.face_result = run_face_alt(mode="image")
-    #     except Exception as e:
-    #         print(f"face error: {e}")
-    #         with self.lock:
-    #             self.face_result = None
-    #     finally:
-    #         self.face_complete.set()
-    # def get_face_result(self, timeout=30):
-    #     finished = self.face_complete.wait(timeout)
-    #     with self.lock:
-    #         return self.face_result if finished else None
-
-
-
-
-manager = MultiThreadManager()
+            log.warning(f"⚠️ Cannot play {WAIT_AUDIO_FILE}: {e}")
+
+def stage_stt(utterance, wait_cue=None):
+    """스트리밍 transcript (없으면 one-shot Whisper 업로드)"""
+    audio_data, stt_future = utterance
+    if len(audio_data) == 0:  # Skip if no audio was recorded
+        raise StageSkipped("No audio recorded")
+    log.info(f"\n🎙️ Converting speech to text ({len(audio_data) / SAMPLE_RATE:.1f}s)...")
+    with span("stt.wait", streaming=stt_future is not None):
+        transcribed_text = get_streaming_transcript(stt_future)
+    if not transcribed_text:
+        log.info("🎙️ Falling back to one-shot Whisper API upload...")
+        transcribed_text = convert_audio_to_text_via_api(audio_data, SAMPLE_RATE)
+    mark_time("stt")
+    if not transcribed_text:
+        raise StageSkipped("No transcribed text")
+    log.info(f"✅ Transcribed text: \"{transcribed_text}\"")
+    return transcribed_text
+
+def stage_commands(stt, vision):
+    log.info("⚙️ Interpreting robot commands...")
+    # provider 제한은 LLM_function 안에서 (rate_limit) - 대화 응답 요청과 동시에 실행됨
+    command_response_json = process_for_commands(
+        stt,
+        additional_prompt=f"[Image/Video Description]: {vision}"
+    )
+    log.info(f"→ Robot command generated: {command_response_json}")
+    if not command_response_json:
+        raise StageSkipped("No robot command to execute")
+    return command_response_json
+
+def stage_robot(commands):
+    log.info(f"\n🤖 Executing robot command sequence...")
+    run_spike(commands)
+    log.info("✅ Robot command executed successfully")
+
+def stage_reply(stt, vision):
+    log.info("\n🤖 Generating VIRUS conversational response...")
+    conversation_response_text = process_for_conversation(
+        stt,
+        additional_prompt=f"[Image/Video Description]: {vision}"
+    )
+    if not conversation_response_text:
+        raise StageSkipped("No conversational response generated")
+    return conversation_response_text
+
+def stage_tts(reply):
+    log.info("\n🔊 Converting response to speech...")
+    if not speak_response(reply):
+        raise RuntimeError("No response audio was played")
+    log.info("✅ Conversational response completed")
+
+
 # Check if OpenAI API key is available
 openai_api_key = os.getenv("OPENAI_API_KEY")
 if not openai_api_key:
     raise ValueError("OpenAI API key is not set. Please check your .env file.")
 
-# Initialize OpenAI client
-client = openai.OpenAI()
-
 # Audio recording settings - Optimized for Raspberry Pi
 SAMPLE_RATE = 8000     # Reduced from 16000 for faster upload (still decent quality)
 CHANNELS = 1           # Mono
+BLOCK_SIZE = 256       # 콜백 블록 크기(프레임) - 8kHz 기준 32ms
+UPLOAD_CODEC = "wav_pcm_u8"  # STT 업로드 코덱 (wav_pcm16 / wav_pcm_u8 / flac / ogg_opus)
 VOICE_ID = "ErXwobaYiN019PkySvjV"    # Voice ID for ElevenLabs - antoni (남성, 미국 억양)
 WAIT_AUDIO_FILE = "wait.mp3"  # Fixed wait message file
 RESPONSE_AUDIO_FILE = "response.mp3"  # Response audio file (generated by text_to_audio.py)
@@ -250,261 +238,408 @@ THRESHOLD_DB = -35     # 녹음 시작을 위한 임계 데시벨 (적절한 값
 SILENCE_THRESHOLD_DB = -35  # 녹음 종료를 위한 임계 데시벨 (적절한 값으로 조정 필요)
 SILENCE_DURATION = 1.0  # 녹음 종료를 위한 침묵 지속 시간(초) - 빠른 응답을 위해 1초로 단축
 # MAX_RECORDING_DURATION = None  # 최대 녹음 시간 제한 없음
+ADAPTIVE_ENDPOINTING = True  # True 면 발화 길이/에너지 추세로 침묵 시간을 조절 (SILENCE_DURATION 대신)
+MIN_SILENCE_DURATION = 0.35  # 발화가 끝난 것으로 보일 때의 침묵 시간(초)
+MAX_SILENCE_DURATION = 1.2   # 문장 중간 쉼으로 보일 때의 침묵 시간(초)
+STREAMING_STT = True  # 녹음 중에 오디오를 미리 전송해서 endpoint 직후 transcript 확보 (실패 시 one-shot 업로드)
+STT_STREAM_URL = os.getenv("STT_STREAM_URL")  # 스트리밍 STT 서버 주소 (없으면 Whisper partial 방식 -
+# 첫 pause 에서 그때까지의 오디오를 한 번 전사, pause 뒤에 다시 말했으면 endpoint 에서 한 번 더: 발화당 과금 STT 호출 1~2회)
+STT_TIMEOUT = 20  # 스트리밍 transcript 대기 시간(초)
+VLM_URL = os.getenv("VLM_URL")  # warm-up 할 VLM 서버 주소 (없으면 colab_vlm.COLAB_URL - cv2 가 있어야 import 됨)
+CONNECTION_WARMUP = True  # 시작 시 STT/LLM/TTS/VLM endpoint 에 병렬로 연결을 미리 열어 둠 (cold/warm 지연 출력)
+KEEPALIVE_INTERVAL = 20.0  # 유휴 중 keep-alive probe 간격(초) - 풀의 keepalive_expiry(60초)보다 짧게, 0 이면 끔
+TTS_PREWARM = True  # 시작 시 STOCK_PHRASES 를 백그라운드에서 미리 합성해서 캐시 (이미 있으면 생략)
+CHUNKED_TTS = True  # True 면 여러 문장 응답을 문장별로 병렬 합성해서 첫 문장부터 재생 (한 문장이면 STREAMING_TTS 경로)
+PCM_TTS = True  # True 면 응답을 raw PCM(16kHz) 으로 받아 sounddevice 로 바로 재생 - 라즈베리파이에서 MP3 디코딩 생략
+STREAMING_TTS = True  # True 면 TTS 응답을 스트림으로 받아 첫 청크부터 재생 (False: 전체 저장 후 재생)
+OVERLAP_WAIT_CUE = True  # True 면 wait.mp3 재생과 STT/VLM 대기를 동시에 진행 (False: 예전처럼 재생 후 처리)
+MAX_UTTERANCE_SECONDS = 60.0  # 녹음 버퍼 크기(초) - 미리 할당, 넘으면 잘림
+PREROLL_SECONDS = 0.3  # 임계값을 넘기 전 보존할 오디오(초) - 첫 음절 잘림 방지
+HALF_DUPLEX = True  # True 면 스피커 재생 중(+ PLAYBACK_TAIL_SECONDS)에는 녹음을 시작하지 않음 (False: 막지 않고 에코로 시작된 상호작용만 셈)
+PLAYBACK_TAIL_SECONDS = 0.5  # 재생이 끝난 뒤에도 녹음 시작을 막는 시간(초) - 출력 버퍼 + 잔향
+BARGE_IN_MARGIN_DB = 10.0  # 재생 중에도 에코 레벨보다 이만큼 큰 소리면 녹음 시작 (None: 재생 중에는 항상 막음)
 
-frames = []
-recording = False
-recording_start_time = None  # 녹음 시작 시간 추적 - 추가
-silence_start_time = None
-last_db_print_time = 0  # 데시벨 출력 제한을 위한 마지막 출력 시간
+# 콜백에서 할당 없이 기록하는 녹음 버퍼 (list + np.concatenate 대체)
+recorder = RingBufferRecorder(
+    SAMPLE_RATE,
+    CHANNELS,
+    max_seconds=MAX_UTTERANCE_SECONDS,
+    preroll_seconds=PREROLL_SECONDS
+)
+# 로봇 자신의 음성(wait.mp3 / 응답)으로 새 녹음이 시작되지 않도록 재생 엔진 활동에 따라 트리거를 막음
+duplex_gate = HalfDuplexGate(
+    start_db=THRESHOLD_DB,
+    tail_seconds=PLAYBACK_TAIL_SECONDS,
+    barge_in_margin_db=BARGE_IN_MARGIN_DB,
+    enabled=HALF_DUPLEX
+)
+log = get_logger(__name__)
 last_countdown_time = 0  # 카운트다운 출력 제한을 위한 마지막 출력 시간
 DB_PRINT_INTERVAL = 0.5  # 데시벨 출력 간격(초)
 COUNTDOWN_PRINT_INTERVAL = 0.2  # 카운트다운 출력 간격(초)
 recording_completed = False  # 녹음 완료 플래그 (녹음만 중단하고 이후 처리는 계속함)
 processing_audio = False
-def calculate_db(audio_data):
-    """오디오 데이터의 데시벨 레벨 계산"""
-    if len(audio_data) == 0:
-        return -np.inf
-    # RMS 값 계산
-    rms = np.sqrt(np.mean(np.square(audio_data)))
-    # RMS를 dB로 변환 (0 dB 기준은 최대 가능 진폭 1.0)
-    if rms > 0:
-        db = 20 * np.log10(rms)
-    else:
-        db = -np.inf
-    return db
-record_count = 0
-def audio_callback(indata, frames_count, time_info, status):
-    """Callback function for audio stream"""
-    global frames, recording, recording_start_time, silence_start_time, last_db_print_time, last_countdown_time, recording_completed, record_count,manager, api_lock, processing_audio
-    if status:
-        print(f"⚠️ Recording warning: {status}")
-    
+
+# 녹음 시작/종료 판정 (히스테리시스 + hangover) - 예전 recording/silence_start_time 전역 변수 대체
+vad = VoiceActivityDetector(
+    SAMPLE_RATE,
+    frame_size=BLOCK_SIZE,
+    start_db=THRESHOLD_DB,
+    stop_db=SILENCE_THRESHOLD_DB,
+    hangover=SILENCE_DURATION,
+    endpointer=AdaptiveEndpointer(MIN_SILENCE_DURATION, MAX_SILENCE_DURATION) if ADAPTIVE_ENDPOINTING else None
+)
+
+# 녹음 중 청크 업로드 (전송은 별도 스레드)
+transcriber = StreamingTranscriber(
+    HTTPChunkTransport(STT_STREAM_URL, session=get_http_session()) if STT_STREAM_URL else WhisperWindowTransport(),
+    SAMPLE_RATE
+) if STREAMING_STT else None
+interaction_times = {}  # 단계 이름 → time.perf_counter() (print_interaction_timing 용)
+
+# 상호작용 단계와 의존 관계 - 녹음 시작 시 pipeline.start() (vision 바로 시작), 녹음 종료 시 "utterance" 입력
+STAGE_TIMEOUTS = {  # 단계별 실행 시간 제한(초)
+    "vision": 40, "wait_cue": 15, "stt": STT_TIMEOUT + 20, "commands": 30, "robot": 60, "reply": 30, "tts": 60,
+}
+pipeline = InteractionPipeline([
+    Stage("vision", stage_vision, timeout=STAGE_TIMEOUTS["vision"], optional=True),  # 카메라 1개
+    Stage("wait_cue", stage_wait_cue, deps=("utterance",), timeout=STAGE_TIMEOUTS["wait_cue"]),
+    Stage("stt", stage_stt, deps=("utterance",) if OVERLAP_WAIT_CUE else ("utterance", "wait_cue"),
+          timeout=STAGE_TIMEOUTS["stt"]),
+    Stage("commands", stage_commands, deps=("stt", "vision"), timeout=STAGE_TIMEOUTS["commands"], concurrency=2),
+    Stage("robot", stage_robot, deps=("commands",), timeout=STAGE_TIMEOUTS["robot"]),  # 로봇 1대
+    Stage("reply", stage_reply, deps=("stt", "vision"), timeout=STAGE_TIMEOUTS["reply"], concurrency=2),
+    Stage("tts", stage_tts, deps=("reply",), timeout=STAGE_TIMEOUTS["tts"]),  # 스피커 1개
+], inputs=("utterance",))
+interaction = None  # 현재 상호작용 (녹음 시작 시 생성)
+speech_started_at = None  # 녹음 시작 / 마지막 침묵 시작 시각 (trace 의 audio.capture / endpointing span)
+silence_started_at = None
+
+def db_status(db):
+    if db > THRESHOLD_DB:
+        return "🔊 ACTIVE"
+    if db < SILENCE_THRESHOLD_DB:
+        return "🔈 SILENT"
+    return "🔉 NORMAL"
+
+# DB_PRINT_INTERVAL 마다 한 줄 (그 사이 블록은 min/max/mean 으로 요약 - json 모드에서 확인)
+sound_meter = Meter(log, "sound_level", interval=DB_PRINT_INTERVAL, unit="dB", label=db_status,
+                    prefix="🎤 Sound level")
+
+# 오디오 콜백은 블록을 큐에 넣기만 하고, 나머지는 audio_worker 스레드에서 처리
+capture = CaptureStage(SAMPLE_RATE, CHANNELS, blocksize=BLOCK_SIZE)
+audio_callback = capture.callback
+
+def process_audio_block(indata, current_time):
+    """Worker-side handler: VAD 이벤트에 따라 녹음 시작/종료, 처리 스레드 시작"""
+    global last_countdown_time, recording_completed, processing_audio, interaction
+    global speech_started_at, silence_started_at
     # 이미 녹음이 완료되었으면 데이터 수집하지 않음
     if recording_completed:
         return
     
-    # 현재 오디오 데이터의 데시벨 레벨 계산
-    current_db = calculate_db(indata)
+    listening = not vad.in_speech
+    events = vad.process(indata)
+    # 녹음 전에는 블록마다 재생 중인지 / 에코보다 충분히 큰 소리인지 확인
+    trigger = duplex_gate.observe(vad.last_db, BLOCK_SIZE / SAMPLE_RATE) if listening else None
+    # 일정 간격으로 현재 데시벨 기록 (출력은 logging listener 스레드에서)
+    sound_meter.update(vad.last_db, now=current_time)
     
-    # 현재 시간
-    current_time = time.time()
-    
-    # 일정 간격으로 현재 데시벨 출력
-    if current_time - last_db_print_time >= DB_PRINT_INTERVAL:
-        db_status = ""
-        if current_db > THRESHOLD_DB:
-            db_status = "🔊 ACTIVE"
-        elif current_db < SILENCE_THRESHOLD_DB:
-            db_status = "🔈 SILENT"
-        else:
-            db_status = "🔉 NORMAL"
-        
-        print(f"🎤 Sound level: {current_db:.1f} dB {db_status}")
-        last_db_print_time = current_time
-    
-    # 녹음 중이 아닐 때, 임계값 이상이면 녹음 시작
-    if not recording and current_db > THRESHOLD_DB:
-        recording = True
-        frames.clear()
-        silence_start_time = None
-        recording_start_time = current_time
-        record_count=0
-        print(f"\n⏺️ Recording started automatically (detected {current_db:.2f} dB > threshold {THRESHOLD_DB} dB)...")
-
-        # Trigger image or video upload via client_vlm_parallel_alt
-        
+    # 녹음 중이면 녹음 버퍼에, 아니면 pre-roll 링 버퍼에 기록 (할당 없음)
+    recorder.write(indata)
 
-        # Start a thread pool executor to upload image or video and get result
-        # executor = concurrent.futures.ThreadPoolExecutor()
-        # future_vlm = executor.submit(run_vlm_alt, mode="image")  # or "video"
-        # vlm_thread = threading.Thread(
-        #     target = lambda: vlm_result_queue.put(run_vlm_alt(mode="image")),
-        #     daemon=True
-        # )
-        # vlm_thread.start()
-        manager.start_vlm_processing()
-    # 녹음 중일 때
-    if recording:
-        frames.append(indata.copy())
-        record_count+=1
-        # 최대 녹음 시간 제한 없음으로 변경 - 주석 처리
-        # recording_duration = current_time - recording_start_time
-        # if recording_duration >= MAX_RECORDING_DURATION:
-        #     recording = False
-        #     recording_completed = True
-        #     print(f"\n⏹️ Recording ended automatically (max duration {MAX_RECORDING_DURATION} seconds reached).")
-        #     process_recorded_audio()
-        #     return
-        
-        # 임계값 이하의 소리가 감지되면 침묵 시간 체크 시작/업데이트
-        if current_db < SILENCE_THRESHOLD_DB:
-            if silence_start_time is None:
-                silence_start_time = current_time
-                print(f"\n⏸️ Silence detected ({current_db:.2f} dB < threshold {SILENCE_THRESHOLD_DB} dB)")
-            
-            # 침묵 경과 시간
-            elapsed_silence = current_time - silence_start_time
-            # 종료까지 남은 시간
-            remaining_time = SILENCE_DURATION - elapsed_silence
-            
-            # 일정 간격으로 카운트다운 출력
-            if current_time - last_countdown_time >= COUNTDOWN_PRINT_INTERVAL and remaining_time > 0:
-                print(f"⏱️ Recording will end in: {remaining_time:.1f} seconds...")
-                last_countdown_time = current_time
-            
-            # 침묵 시간이 임계값을 넘으면 녹음 종료
-            if elapsed_silence >= SILENCE_DURATION:
-                recording = False
-                recording_completed = True  # 녹음 완료 플래그 설정 (더 이상 오디오 입력을 받지 않음)
-                processing_audio = True
-                print(f"\n⏹️ Recording ended automatically (silence for {SILENCE_DURATION} seconds).")
-                processing_thread = threading.Thread(
-                    target=process_recorded_audio_async,
-                    daemon=True
-                )
-                processing_thread.start()
-        else:
-            # 소리가 다시 임계값 이상이 되면 침묵 타이머 초기화
-            if silence_start_time is not None:
-                print(f"🔊 Voice detected again ({current_db:.2f} dB > {SILENCE_THRESHOLD_DB} dB) - Silence timer reset")
-                silence_start_time = None
-def process_recorded_audio_async():
-    """비동기로 녹음된 오디오 처리"""
-        # Play wait.mp3 before processing
+    for event in events:
+        if event.kind == "start":
+            if not duplex_gate.allow(trigger):
+                # 스피커 소리 (재생 중 또는 tail) - 녹음하지 않고 VAD 를 처음 상태로
+                vad.reset()
+                log.debug(f"🔇 Ignoring trigger during playback ({event.db:.2f} dB)",
+                          extra={"event": "trigger_suppressed", "db": round(event.db, 2)})
+                break
+            duplex_gate.started(trigger)
+            recorder.start()  # pre-roll (현재 블록 포함) 을 녹음 앞부분으로 이동
+            if transcriber:
+                transcriber.begin(recorder)
+            log.info(f"\n⏺️ Recording started automatically (detected {event.db:.2f} dB > threshold {THRESHOLD_DB} dB)...",
+                     extra={"event": "speech_start", "db": round(event.db, 2)})
+            # 상호작용 시작 - vision 단계(client_vlm_parallel_alt)는 바로 실행, 나머지는 utterance 를 기다림
+            begin_trace("interaction", trigger_db=round(event.db, 1), trigger=trigger)
+            speech_started_at, silence_started_at = time.perf_counter(), None
+            interaction = pipeline.start()
+        elif event.kind == "pause":
+            log.info(f"\n⏸️ Silence detected ({event.db:.2f} dB < threshold {SILENCE_THRESHOLD_DB} dB)",
+                     extra={"event": "speech_pause", "db": round(event.db, 2)})
+            silence_started_at = time.perf_counter()
+            if transcriber:
+                transcriber.pause()
+        elif event.kind == "resume":
+            silence_started_at = None
+            if transcriber:
+                transcriber.resume()
+            log.info(f"🔊 Voice detected again ({event.db:.2f} dB > {SILENCE_THRESHOLD_DB} dB) - Silence timer reset",
+                     extra={"event": "speech_resume", "db": round(event.db, 2)})
+        elif event.kind == "end":
+            recorder.stop()
+            mark_time("endpoint")
+            trace = current_trace()
+            if trace:
+                now = time.perf_counter()
+                trace.add_span("audio.capture", speech_started_at, now, seconds=round(recorder.duration, 2))
+                if silence_started_at is not None:
+                    trace.add_span("endpointing", silence_started_at, now, hangover=round(vad.last_hangover, 2))
+                trace_event("endpoint")
+            stt_future = transcriber.end() if transcriber else None
+            if recorder.overflowed:
+                log.warning(f"⚠️ Recording truncated at {MAX_UTTERANCE_SECONDS:.0f} seconds")
+            recording_completed = True  # 녹음 완료 플래그 설정 (더 이상 오디오 입력을 받지 않음)
+            processing_audio = True
+            log.info(f"\n⏹️ Recording ended automatically (silence for {vad.last_hangover:.2f} seconds).",
+                     extra={"event": "speech_end", "seconds": round(recorder.duration, 2),
+                            "hangover": round(vad.last_hangover, 2)})
+            log.info("\n🔄 Processing recorded audio...")
+            # 녹음 버퍼의 복사본 - stt 단계가 timeout 되면 executor 스레드가 아직 읽는 중에 상호작용이 끝나고
+            # (finish_interaction → recorder.reset) 다음 녹음이 ring buffer 를 덮어쓸 수 있으므로 view 를 넘기지 않음
+            interaction.add_done_callback(finish_interaction)
+            interaction.provide("utterance", (recorder.utterance().copy(), stt_future))
+            return
+
+    if transcriber and vad.in_speech:
+        transcriber.update()
+
+    # 일정 간격으로 카운트다운 출력
+    remaining_time = vad.current_hangover() - vad.silence_elapsed()
+    if vad.in_speech and vad.silence_start_sample is not None and remaining_time > 0 \
+            and current_time - last_countdown_time >= COUNTDOWN_PRINT_INTERVAL:
+        log.debug(f"⏱️ Recording will end in: {remaining_time:.1f} seconds...")
+        last_countdown_time = current_time
+def mark_time(stage):
+    """endpoint 기준 단계별 완료 시각 기록"""
+    interaction_times[stage] = time.perf_counter()
+
+def print_interaction_timing():
+    """endpoint(녹음 종료) 이후 각 단계까지 걸린 시간 출력"""
+    start = interaction_times.get("endpoint")
+    if start is None:
+        return
+    stages = sorted((t, stage) for stage, t in interaction_times.items() if stage != "endpoint")
+    log.info("⏱️ Timing since end of speech (" + ("cue overlapped" if OVERLAP_WAIT_CUE else "cue blocking") + "): " +
+          ", ".join(f"{stage} {(t - start) * 1000:.0f}ms" for t, stage in stages))
+    interaction_times.clear()
+
+def play_wait_cue():
+    """wait.mp3 재생을 큐에 넣고 Future 반환 (캐시된 디코딩 결과 사용, 응답 음성보다 먼저 재생됨)"""
+    log.info("🔊 Playing wait message...")
+    done = get_playback_engine().play(WAIT_AUDIO_FILE, cache=True)
+    done.add_done_callback(lambda _: mark_time("wait_cue_done"))
+    return done
+
+def get_streaming_transcript(future):
+    """녹음 중에 업로드된 오디오의 transcript. 없거나 실패하면 None"""
+    if future is None:
+        return None
+    try:
+        return future.result(timeout=STT_TIMEOUT)
+    except Exception as e:
+        log.warning(f"⚠️ Streaming STT unavailable: {e}")
+        return None
+
+def finish_interaction(interaction):
+    """모든 단계가 끝나면 (pipeline 루프 스레드) 단계별 시간 / critical path 출력 후 다음 녹음 준비"""
     global processing_audio, recording_completed
-    
+    log.info("\n✅ All processing completed. Ready for next command...")
+    # 보고/trace 기록이 실패해도 (done callback 의 예외는 Future 가 삼킴) 다음 녹음은 받을 수 있도록 finally 에서 리셋
     try:
-        process_recorded_audio()
+        interaction.print_report()
+        trace = current_trace()
+        if trace:
+            # 파이프라인 단계도 span 으로 (대기 시간 포함 구간은 stage.*, 실제 호출은 stt.* / llm.* / tts.* 등)
+            for record in interaction.records.values():
+                if record.start is not None and record.end is not None and record.status != "input":
+                    trace.add_span(f"stage.{record.name}", interaction.t0 + record.start,
+                                   interaction.t0 + record.end, status=record.status)
+            end_trace()
+        print_interaction_timing()
+        # 음성 응답도 로봇 명령도 없이 끝났으면 STT/LLM/TTS 호출이 낭비된 상호작용
+        duplex_gate.finished(any(record.status == "ok" for name, record in interaction.records.items()
+                                 if name in ("tts", "robot")))
+    except Exception as e:
+        log.error(f"❌ Interaction report failed: {e}")
     finally:
+        recorder.reset()
         # 처리 완료 후 플래그 리셋
+        vad.reset()
         processing_audio = False
         recording_completed = False
-        print("\n🎤 Ready for next recording...")
-def process_recorded_audio():
-    """녹음된 오디오 처리"""
-    global frames
-    
-    if not frames:  # Skip if no audio was recorded
-        print("No audio recorded. Try again.")
-        return
-    
-    print("\n🔄 Processing recorded audio...")
-    print("🔊 Playing wait message...")
+    capture.print_report()
+    get_tts_cache().print_stats()
+    tts_health.print_status()
+    print_pool_stats()
+    print_limiter_stats()
+    duplex_gate.print_stats()
+    log.info("\n🎤 Ready for next recording...")
+
+
+STARTUP_TIMEOUT = 30.0  # 병렬 초기화(연결 warm-up, 카메라/로봇 모듈 import) 대기 시간(초)
+
+
+def _timed(fn):
+    """fn() 의 결과와 걸린 시간(초)"""
+    start = time.perf_counter()
+    return fn(), time.perf_counter() - start
+
+
+def _load_sounddevice():
+    import sounddevice as sd  # PortAudio 초기화 포함
+    return sd
+
+
+def _preload_playback():
+    # Mixer 초기화와 wait.mp3 디코딩을 첫 상호작용 전에 끝내 둠
     try:
-        import pygame
-        pygame.mixer.init()
-        pygame.mixer.music.load(WAIT_AUDIO_FILE)
-        pygame.mixer.music.play()
-        while pygame.mixer.music.get_busy():
-            pygame.time.Clock().tick(10)
-    except ImportError:
-        print(f"⚠️ pygame not installed. Cannot play {WAIT_AUDIO_FILE}")
-    print("\n⏳ Waiting for VLM (Vision Language Model) result...")
-    vlm_result = manager.get_vlm_result(timeout=40)
-    if vlm_result:
-        print(f"🎯 VLM analysis complete: {vlm_result[:100]}..." if len(vlm_result) > 100 else f"🎯 VLM analysis complete: {vlm_result}")
-    else:
-        print("⚠️ VLM processing timeout or failed")
-    
-    # Convert audio data to numpy array
-    print("\n📊 Preparing audio data for transcription...")
-    audio_data = np.concatenate(frames, axis=0)
-
-    # 1. Convert audio to text using Whisper API
-    print("\n🎙️ Converting speech to text using Whisper API...")
-    transcribed_text = convert_audio_to_text_via_api(audio_data, SAMPLE_RATE)
-
-    if transcribed_text:
-        print(f"✅ Transcribed text: \"{transcribed_text}\"")
-
-        # 2. Start conversation processing using the transcribed text (threaded)
-        #    This will handle the conversational response and TTS.
-        print("\n🤖 Generating VIRUS conversational response (async thread)...")
-        manager.start_text_conversation_processing(transcribed_text, vlm_result)
-
-        # 3. Process command interpretation using the transcribed text (synchronous here)
-        print("⚙️ Interpreting robot commands...")
-        command_response_json = None
-        with api_lock: # Ensure API calls are thread-safe
-            try:
-                # Use process_for_commands (from LLM_function, expects text)
-                command_response_json = process_for_commands( # 여기가 process_for_commands 여야 합니다.
-                    transcribed_text,
-                    additional_prompt=f"[Image/Video Description]: {vlm_result}"
-                )
-                print(f"→ Robot command generated: {command_response_json}")
-            except Exception as e:
-                print(f"❌ Command processing error: {e}")
-                command_response_json = None
-    else:
-        print("⚠️ No transcribed text available for command processing")
-        
-    if command_response_json:
-        print(f"\n🤖 Executing robot command sequence...")
-        try:
-            run_spike(command_response_json)
-            print("✅ Robot command executed successfully")
-        except Exception as e:
-            print(f"❌ Robot command execution error: {e}")
-    else:
-        print("ℹ️ No robot command to execute")
-    print("\n⏳ Waiting for conversational response to complete...")
-    conversation_completed = manager.get_conversation_result(timeout = 40)
-    if conversation_completed:
-        print("✅ Conversational response completed")
-    else:
-        print("⚠️ Conversational response timeout or failed")
-        
-    print("\n✅ All processing completed. Ready for next command...")
-    frames.clear()
+        get_playback_engine().preload(WAIT_AUDIO_FILE)
+    except Exception as e:
+        log.warning(f"⚠️ Cannot preload {WAIT_AUDIO_FILE}: {e}")
+
+
+def _vlm_url():
+    """VLM warm-up 주소. colab_vlm 을 import 할 수 없으면 (cv2 없음) VLM 만 빼고 warm-up"""
+    if VLM_URL:
+        return VLM_URL
+    try:
+        from colab_vlm import COLAB_URL
+    except ImportError as e:
+        log.warning(f"⚠️ VLM warm-up 생략 (VLM_URL 미설정, colab_vlm import 실패: {e})")
+        return None
+    return COLAB_URL
+
+
+def _warm_up_connections():
+    """첫 상호작용에서 DNS/TCP/TLS 를 하지 않도록 모든 endpoint 연결을 미리 열어 둠 (KeepAlive 반환)"""
+    if not CONNECTION_WARMUP:
+        return None
+    endpoints = default_endpoints(vlm_url=_vlm_url(), stt_url=STT_STREAM_URL)
+    print_warm_up(warm_up(endpoints))
+    if not KEEPALIVE_INTERVAL:
+        return None
+    keepalive = KeepAlive(endpoints, interval=KEEPALIVE_INTERVAL,
+                          is_idle=lambda: not processing_audio and not vad.in_speech)
+    keepalive.start()
+    return keepalive
+
+
+def _load_vision():
+    """cv2 / picamera import 를 첫 VLM 요청 전에 끝내 둠 (없는 환경이면 첫 요청 때 오류 출력)"""
+    try:
+        import client_vlm_parallel_alt
+    except ImportError as e:
+        log.warning(f"⚠️ Vision module unavailable: {e}")
+
+
+def print_startup_report(startup, loaded, mic_ready):
+    """병렬 초기화 항목별 시간과 time-to-ready (모두 _IMPORT_START 기준)"""
+    log.info(f"\n⏱️ Startup: module load {loaded:.2f}s, mic open at {mic_ready:.2f}s")
+    for name, future in startup.items():
+        if not future.done():
+            log.warning(f"  {name:<13} still running (> {STARTUP_TIMEOUT:.0f}s)")
+        elif future.exception():
+            log.warning(f"  {name:<13} failed: {future.exception()}")
+        else:
+            log.info(f"  {name:<13} {future.result()[1]:6.2f}s")
+    log.info(f"  ready in {time.perf_counter() - _IMPORT_START:.2f}s")
 
 
 def process_complete_interaction():
     """Main function to handle the complete interaction flow"""
-    global processing_audio, recording_completed, recording
+    global processing_audio, recording_completed
+    loaded = time.perf_counter() - _IMPORT_START
     processing_audio = False
     recording_completed = False
-    recording = False
+    vad.reset()
+    if TTS_PREWARM:
+        # 재생할 때와 같은 포맷으로 합성해야 캐시 hit (PCM_TTS 면 PCM_FORMAT)
+        threading.Thread(target=prewarm_tts_cache, args=(STOCK_PHRASES, VOICE_ID, PCM_FORMAT if PCM_TTS else OUTPUT_FORMAT),
+                         daemon=True).start()
+
+    # 서로 독립적인 초기화는 병렬로 실행하고, 마이크는 sounddevice 만 준비되면 바로 엶
+    startup_pool = ThreadPoolExecutor(max_workers=5, thread_name_prefix="startup")
+    startup = {
+        "audio device": startup_pool.submit(_timed, _load_sounddevice),
+        "playback": startup_pool.submit(_timed, _preload_playback),
+        "connections": startup_pool.submit(_timed, _warm_up_connections),
+        "vision": startup_pool.submit(_timed, _load_vision),
+        "robot": startup_pool.submit(_timed, load_spike),
+    }
+    startup_pool.shutdown(wait=False)
+
+    # Start the worker stage before the stream so no block waits in the queue
+    audio_worker = AudioWorker(capture.queue, process_audio_block)
+    audio_worker.start()
+
     # Create and start the audio stream
+    sd, _ = startup["audio device"].result()
     stream = sd.InputStream(
         samplerate=SAMPLE_RATE,
         channels=CHANNELS,
+        blocksize=BLOCK_SIZE,
         callback=audio_callback
     )
     stream.start()
-    print("\n🚀 VIRUS System initialized successfully!")
-    print("🎤 Voice detection active - speak to trigger recording")
-    print(f"📊 Recording triggers at >{THRESHOLD_DB} dB, stops after {SILENCE_DURATION}s of silence <{SILENCE_THRESHOLD_DB} dB")
-    
+    mic_ready = time.perf_counter() - _IMPORT_START
+    log.info("\n🚀 VIRUS System initialized successfully!")
+    log.info("🎤 Voice detection active - speak to trigger recording")
+    if ADAPTIVE_ENDPOINTING:
+        log.info(f"📊 Recording triggers at >{THRESHOLD_DB} dB, stops after {MIN_SILENCE_DURATION}-{MAX_SILENCE_DURATION}s (adaptive) of silence <{SILENCE_THRESHOLD_DB} dB")
+    else:
+        log.info(f"📊 Recording triggers at >{THRESHOLD_DB} dB, stops after {SILENCE_DURATION}s of silence <{SILENCE_THRESHOLD_DB} dB")
+
+    # 나머지 초기화는 마이크가 열린 뒤에도 계속 진행 - 끝나면 time-to-ready 출력
+    wait(startup.values(), timeout=STARTUP_TIMEOUT)
+    print_startup_report(startup, loaded, mic_ready)
+
     try:
         # 프로그램이 계속 실행되도록 무한 루프 유지
         while True:
             time.sleep(0.1)  # 시스템 부하 방지용 약간의 지연
     
     except KeyboardInterrupt:
-        print("\n🔌 Shutting down system.")
+        log.info("\n🔌 Shutting down system.")
     finally:
         # Clean up resources
 
         if 'stream' in locals():
             stream.stop()
             stream.close()
+        audio_worker.stop()
+        pipeline.close()
+        connections = startup["connections"]
+        if connections.done() and not connections.exception():
+            keepalive, _ = connections.result()
+            if keepalive:
+                keepalive.stop()
+        capture.print_report()
+        duplex_gate.print_stats()
+        get_tts_cache().print_stats()
+        get_tts_cache().flush()
 
 if __name__ == "__main__":
+    # 출력은 queue 를 거쳐 listener 스레드에서 (LOG_LEVEL=DEBUG 면 카운트다운도, LOG_FORMAT=json 이면 JSON 한 줄씩)
+    setup_logging()
     # Display welcome message
-    print("=" * 50)
-    print("VIRUS COMBAT ROBOT CONTROL SYSTEM")
-    print("Versatile, Intelligent Robotic Unit for Strategy")
-    print("=" * 50)
-    print("Ready for voice commands - System features:")
-    print(f"  • Voice threshold: {THRESHOLD_DB} dB (auto-start)")
-    print(f"  • Silence detection: {SILENCE_DURATION}s below {SILENCE_THRESHOLD_DB} dB (auto-stop)")
-    print(f"  • Audio format: {SAMPLE_RATE}Hz, 8-bit mono (optimized for Raspberry Pi)")
-    print("  • Parallel processing: Vision analysis + Speech recognition + Response generation")
-    print("  • Continuous operation: Automatically ready for next command after processing")
-    print("\nPress Ctrl+C to exit anytime.")
-    print("=" * 50)
+    log.info("=" * 50)
+    log.info("VIRUS COMBAT ROBOT CONTROL SYSTEM")
+    log.info("Versatile, Intelligent Robotic Unit for Strategy")
+    log.info("=" * 50)
+    log.info("Ready for voice commands - System features:")
+    log.info(f"  • Voice threshold: {THRESHOLD_DB} dB (auto-start)")
+    log.info(f"  • Silence detection: {SILENCE_DURATION}s below {SILENCE_THRESHOLD_DB} dB (auto-stop)")
+    log.info(f"  • Audio format: {SAMPLE_RATE}Hz, 8-bit mono (optimized for Raspberry Pi)")
+    log.info("  • Parallel processing: Vision analysis + Speech recognition + Response generation")
+    log.info("  • Continuous operation: Automatically ready for next command after processing")
+    log.info(f"  • Half-duplex: no new recording while the robot speaks (+{PLAYBACK_TAIL_SECONDS}s tail)"
+          + (f", barge-in {BARGE_IN_MARGIN_DB:+.0f} dB over echo" if BARGE_IN_MARGIN_DB is not None else "")
+          + ("" if HALF_DUPLEX else " - disabled, counting only"))
+    log.info("\nPress Ctrl+C to exit anytime.")
+    log.info("=" * 50)
     
     # Start the interaction loop
     process_complete_interaction() 
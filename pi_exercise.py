@@ -4,6 +4,9 @@ import json
 
 from bt import BT
 from client_face_parallel import main as run_face_alt
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
 
 # -----------------------------------------------------
 # MultiThreadManager: face 처리 스레드 관리 클래스
@@ -29,7 +32,7 @@ class MultiThreadManagerfaces:
                 )
                 self.face_thread.start()
             else:
-                print("[face] Processing already running")
+                log.info("[face] Processing already running")
 
     def _run_face(self):
         """
@@ -41,7 +44,7 @@ class MultiThreadManagerfaces:
             with self.face_lock:
                 self.face_result = run_face_alt(mode="image")
         except Exception as e:
-            print(f"[face] Error during processing: {e}")
+            log.error(f"[face] Error during processing: {e}")
             with self.face_lock:
                 self.face_result = None
         finally:
@@ -75,12 +78,12 @@ class HubController:
         BT.connect(address)를 호출하여 self.sock에 소켓 할당.
         실패 시 self.sock은 None으로 남음.
         """
-        print(f"[{self.hub_id}] 연결 시도...")
+        log.info(f"[{self.hub_id}] 연결 시도...")
         try:
             self.sock = self.bt.connect(self.address)
-            print(f"[{self.hub_id}] 연결 성공!")
+            log.info(f"[{self.hub_id}] 연결 성공!")
         except Exception as e:
-            print(f"[{self.hub_id}] 연결 실패: {e}")
+            log.error(f"[{self.hub_id}] 연결 실패: {e}")
             self.sock = None
 
     def send_single_command(self, cmd_json_str):
@@ -106,11 +109,11 @@ class HubController:
                         break
                     buf += chunk
 
-                print(f"[{self.hub_id}] 실행 완료: {cmd_json_str}")
+                log.info(f"[{self.hub_id}] 실행 완료: {cmd_json_str}")
                 return True
 
             except Exception as e:
-                print(f"[{self.hub_id}] 오류 발생: {e}")
+                log.error(f"[{self.hub_id}] 오류 발생: {e}")
                 return False
 
 # -----------------------------------------------------
@@ -134,7 +137,7 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
 
     # 3) 연결 확인
     if not hub1.sock or not hub2.sock:
-        print("연결 실패! 프로그램을 종료합니다.")
+        log.error("연결 실패! 프로그램을 종료합니다.")
         return
 
     # 4) 사용자 입력 또는 인자로 받은 llmcmd 사용
@@ -156,7 +159,7 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
         if not isinstance(parsed_cmd_list, list):
             raise ValueError("최상위 JSON 객체가 리스트가 아닙니다.")
     except Exception as e:
-        print(f"JSON 파싱 오류: {e}")
+        log.error(f"JSON 파싱 오류: {e}")
         return
 
     # 6) 명령 순차 처리
@@ -164,7 +167,7 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
         for single_cmd in parsed_cmd_list:
             # single_cmd는 이제 Python 리스트 자료구조: [ { "cmd": "...", "val": ... }, ... ]
             if not isinstance(single_cmd, list):
-                print(f"잘못된 명령 형식: {single_cmd} (리스트가 아님)")
+                log.warning(f"잘못된 명령 형식: {single_cmd} (리스트가 아님)")
                 continue
 
             # 6-1) 이 명령 블록에 "shoot, val=0" 조건이 있는지 검사
@@ -188,7 +191,7 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
                 face_mgr.start_face_processing()
                 result = face_mgr.get_face_result(timeout=10)
                 if result is None:
-                    print("[face] 결과를 얻지 못했습니다. 기본 shoot 커맨드만 전송합니다.")
+                    log.warning("[face] 결과를 얻지 못했습니다. 기본 shoot 커맨드만 전송합니다.")
                     # 예: 아무 대상 지정 없이 허브에 shoot=1 전송
                     fallback_json = json.dumps([{"cmd": "shoot", "val": 1}])
                     t1 = threading.Thread(target=hub1.send_single_command, args=(fallback_json,))
@@ -201,7 +204,7 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
                         face_list = json.loads(result)
                         # face_list는 [ { "label": "...", "center": [x, y] }, ... ] 형태
                     except Exception as e:
-                        print(f"[face] result JSON 파싱 오류: {e}\n raw result: {result}")
+                        log.error(f"[face] result JSON 파싱 오류: {e}\n raw result: {result}")
                         face_list = []"""
 
                     # 예: "label == 'enemy'" 인 것만 처리
@@ -271,10 +274,11 @@ def main(llmcmd='[[ { "cmd": "shoot",    "val":  0 }]]'):
                 t1.join(timeout = 15); t2.join(timeout = 15)
 
     except KeyboardInterrupt:
-        print("\n프로그램 강제 종료.")
+        log.info("\n프로그램 강제 종료.")
 
 # -----------------------------------------------------
 # 바로 실행 시 main() 호출
 # -----------------------------------------------------
 if __name__ == "__main__":
+    setup_logging()
     main()
@@ -0,0 +1,342 @@
+"""
+Persistent audio playback engine
+================================
+예전에는 재생할 때마다 pygame.mixer.init() → music.load(mp3) → Clock().tick(10) 루프를
+돌았기 때문에, mixer 초기화와 MP3 디코딩 비용이 매 상호작용의 hot path 에 있었습니다.
+
+PlaybackEngine 은
+    - 프로세스당 한 번만 mixer 를 초기화하고
+    - 하나의 재생 스레드가 큐 순서대로 재생하며 (wait.mp3 → response.mp3 순서 보장)
+    - wait.mp3 같은 고정 클립은 디코딩된 Sound 를 메모리에 캐시하고
+    - play() 는 바로 Future 를 돌려줍니다 (재생 완료 시 set_result)
+    - play_stream() 은 네트워크에서 도착하는 MP3 청크를 첫 청크부터 외부 플레이어(mpv/ffplay)
+      stdin 으로 흘려보냅니다. 플레이어가 없으면 다 받은 뒤 메모리에서 바로 재생합니다.
+    - play_pcm() 은 raw PCM16 청크를 디코딩/파일 없이 sounddevice 출력 스트림에 바로 씁니다.
+
+Usage:
+    from playback import get_playback_engine
+    engine = get_playback_engine()
+    engine.preload("wait.mp3")
+    done = engine.play("wait.mp3")          # non-blocking
+    engine.play("response.mp3").result()    # 순서대로 재생, 완료까지 대기
+    engine.play_stream(ChunkStream(chunks, save_path="response.mp3")).result()
+    pcm_bytes = engine.play_pcm(chunks, sample_rate=16000).result()
+    engine.idle_for()                       # 재생이 끝난 뒤 지난 시간 (재생 중이면 0)
+"""
+
+import io
+import os
+import queue
+import shutil
+import subprocess
+import tempfile
+import threading
+import time
+from concurrent.futures import Future
+from tracing import span, event
+from robot_log import get_logger
+
+log = get_logger(__name__)
+
+# stdin 으로 MP3 스트림을 받아 바로 재생할 수 있는 플레이어 (앞에 있을수록 우선)
+STREAM_PLAYERS = (
+    ("mpv", ["mpv", "--no-cache", "--no-terminal", "--", "fd://0"]),
+    ("ffplay", ["ffplay", "-autoexit", "-nodisp", "-loglevel", "quiet", "-i", "-"]),
+)
+
+
+class ChunkStream:
+    """Drains a network byte-chunk iterator on a background thread.
+
+    재생 차례가 오기 전에도 네트워크에서 미리 받아 두고, save_path 가 있으면
+    임시 파일에 쓰다가 완료 시 원자적으로 교체합니다.
+    """
+
+    def __init__(self, chunks, save_path=None):
+        self.save_path = save_path
+        self.first_chunk = threading.Event()   # 첫 청크 도착 (또는 실패)
+        self.first_chunk_time = None
+        self.error = None
+        self.n_bytes = 0
+        self.saved = Future()                  # 저장 완료 시 경로 (저장 안 하면 None)
+        self._queue = queue.Queue()
+        self._start = time.perf_counter()
+        self._thread = threading.Thread(target=self._drain, args=(chunks,), daemon=True)
+        self._thread.start()
+
+    def _drain(self, chunks):
+        out, tmp_path = None, None
+        try:
+            if self.save_path:
+                directory = os.path.dirname(os.path.abspath(self.save_path))
+                fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".part")
+                out = os.fdopen(fd, "wb")
+            for chunk in chunks:
+                if not chunk:
+                    continue
+                if self.first_chunk_time is None:
+                    self.first_chunk_time = time.perf_counter() - self._start
+                    self.first_chunk.set()
+                self.n_bytes += len(chunk)
+                self._queue.put(chunk)
+                if out:
+                    out.write(chunk)
+            if out:
+                out.close()
+                os.replace(tmp_path, self.save_path)
+            self.saved.set_result(self.save_path)
+        except Exception as e:
+            self.error = e
+            if out:
+                out.close()
+                os.remove(tmp_path)
+            self.saved.set_exception(e)
+        finally:
+            self.first_chunk.set()
+            self._queue.put(None)
+
+    def __iter__(self):
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                if self.error:
+                    raise self.error
+                return
+            yield chunk
+
+
+def find_stream_player():
+    """설치된 스트리밍 플레이어 명령어 (없으면 None)"""
+    for name, command in STREAM_PLAYERS:
+        if shutil.which(name):
+            return command
+    return None
+
+
+_engine = None
+_engine_lock = threading.Lock()
+
+
+class PlaybackEngine:
+    """Single long-lived playback thread with one mixer and an ordered queue."""
+
+    def __init__(self, frequency=22050, channels=1, buffer=512, poll_interval=0.01):
+        self.frequency = frequency
+        self.channels = channels
+        self.buffer = buffer
+        self.poll_interval = poll_interval
+        self._queue = queue.Queue()
+        self._cache = {}          # 절대 경로 → 디코딩된 pygame.mixer.Sound
+        self._cache_lock = threading.Lock()
+        self._pending = 0         # 큐에 넣은 뒤 아직 끝나지 않은 항목 수 (대기 + 재생 중)
+        self._pending_lock = threading.Lock()
+        self._last_active = None  # 마지막 재생이 끝난 시각 (time.monotonic) - duplex.HalfDuplexGate 의 tail 판정용
+        self._stop = False
+        self._ready = threading.Event()
+        self._init_error = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # -------------------------
+    # Public API
+    # -------------------------
+    def preload(self, path):
+        """고정 클립을 미리 디코딩해서 캐시 (시작 시 한 번)"""
+        self._wait_ready()
+        return self._load(path, cache=True)
+
+    def play(self, path=None, data=None, cache=False, on_start=None):
+        """재생을 큐에 넣고 Future 를 반환합니다.
+
+        Args:
+            path (str): 오디오 파일 경로
+            data (bytes): 파일 대신 메모리의 오디오 데이터 (mp3/wav/ogg)
+            cache (bool): True 면 디코딩 결과를 캐시 (고정 클립용)
+            on_start (callable): 실제 재생이 시작될 때 재생 스레드에서 호출
+        """
+        return self._enqueue("clip", (path, data, cache), on_start)
+
+    def play_stream(self, stream, on_start=None):
+        """ChunkStream 재생을 큐에 넣고 Future 를 반환합니다 (첫 청크부터 재생)."""
+        return self._enqueue("stream", stream, on_start)
+
+    def play_pcm(self, chunks, sample_rate, channels=1, on_start=None):
+        """raw PCM16 (little-endian) 청크 재생을 큐에 넣고 Future 를 반환합니다.
+
+        Future 결과는 재생한 PCM 바이트 (캐시 저장용)
+        """
+        return self._enqueue("pcm", (chunks, sample_rate, channels), on_start)
+
+    def _enqueue(self, kind, payload, on_start):
+        # 넣기 전에 세어야 queue.get() 과 재생 시작 사이에도 is_busy() 가 True
+        future = Future()
+        with self._pending_lock:
+            self._pending += 1
+        self._queue.put((kind, payload, on_start, future))
+        return future
+
+    def is_busy(self):
+        """재생 중이거나 대기 중인 항목이 있으면 True"""
+        return self._pending > 0
+
+    def idle_for(self):
+        """마지막 재생이 끝난 뒤 지난 시간(초). 재생 중이면 0, 한 번도 재생하지 않았으면 inf"""
+        if self.is_busy():
+            return 0.0
+        if self._last_active is None:
+            return float("inf")
+        return time.monotonic() - self._last_active
+
+    def wait_idle(self, timeout=None):
+        """큐가 비고 재생이 끝날 때까지 대기"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.is_busy():
+            if deadline is not None and time.monotonic() > deadline:
+                return False
+            time.sleep(self.poll_interval)
+        return True
+
+    def shutdown(self):
+        self._stop = True
+        self._queue.put(None)
+
+    # -------------------------
+    # Playback thread
+    # -------------------------
+    def _wait_ready(self):
+        self._ready.wait()
+        if self._init_error:
+            raise RuntimeError(f"pygame mixer unavailable: {self._init_error}")
+
+    def _load(self, path, data=None, cache=False):
+        import pygame
+
+        if data is not None:
+            return pygame.mixer.Sound(file=io.BytesIO(data))
+        key = os.path.abspath(path)
+        with self._cache_lock:
+            sound = self._cache.get(key)
+        if sound is None:
+            sound = pygame.mixer.Sound(key)
+            if cache:
+                with self._cache_lock:
+                    self._cache[key] = sound
+        return sound
+
+    def _run(self):
+        channel = None
+        try:
+            import pygame
+
+            pygame.mixer.init(frequency=self.frequency, channels=self.channels, buffer=self.buffer)
+            channel = pygame.mixer.Channel(0)
+        except Exception as e:
+            self._init_error = e
+            log.warning(f"⚠️ Audio playback unavailable: {e}")
+        finally:
+            self._ready.set()
+
+        while not self._stop:
+            item = self._queue.get()
+            if item is None:
+                break
+            try:
+                self._play_item(*item, channel)
+            finally:
+                with self._pending_lock:
+                    self._pending -= 1
+
+    def _play_item(self, kind, payload, on_start, future, channel):
+        """큐 항목 하나 재생 (재생 스레드)"""
+        if not future.set_running_or_notify_cancel():
+            return
+        player = find_stream_player() if kind == "stream" else None
+        if self._init_error and not player and kind != "pcm":
+            future.set_exception(RuntimeError(f"pygame mixer unavailable: {self._init_error}"))
+            return
+
+        # 실제 재생 시작 시각을 trace 에 기록
+        def started(kind=kind, on_start=on_start):
+            event("playback.start", kind=kind)
+            if on_start:
+                on_start()
+
+        on_start = started
+        try:
+            with span(f"playback.{kind}"):
+                result = True
+                if kind == "pcm":
+                    result = self._write_pcm(*payload, on_start)
+                elif player:
+                    self._pipe_to_player(player, payload, on_start)
+                else:
+                    if kind == "stream":
+                        # 스트리밍 플레이어가 없으면 다 받은 뒤 메모리에서 바로 재생 (파일 왕복 없음)
+                        sound = self._load(None, data=b"".join(payload))
+                    else:
+                        sound = self._load(*payload)
+                    channel.play(sound)
+                    if on_start:
+                        on_start()
+                    while channel.get_busy():
+                        time.sleep(self.poll_interval)
+            future.set_result(result)
+        except Exception as e:
+            log.error(f"Error playing audio: {e}")
+            future.set_exception(e)
+        finally:
+            self._last_active = time.monotonic()
+
+    def _write_pcm(self, chunks, sample_rate, channels, on_start):
+        import sounddevice as sd
+
+        frame_bytes = 2 * channels
+        played, carry = [], b""
+        # with 블록을 나갈 때 stop() 이 남은 버퍼 재생이 끝날 때까지 기다림
+        with sd.RawOutputStream(samplerate=sample_rate, channels=channels, dtype="int16") as out:
+            for chunk in chunks:
+                # 청크 경계가 샘플 중간일 수 있으므로 남은 바이트는 다음 청크와 합침
+                data = carry + chunk
+                usable = len(data) - len(data) % frame_bytes
+                carry = data[usable:]
+                if not usable:
+                    continue
+                out.write(data[:usable])
+                played.append(data[:usable])
+                if on_start:
+                    on_start()
+                    on_start = None
+        return b"".join(played)
+
+    def _pipe_to_player(self, command, stream, on_start):
+        process = subprocess.Popen(command, stdin=subprocess.PIPE, stdout=subprocess.DEVNULL,
+                                   stderr=subprocess.DEVNULL)
+        try:
+            started = False
+            for chunk in stream:
+                process.stdin.write(chunk)
+                process.stdin.flush()
+                if not started:
+                    started = True
+                    if on_start:
+                        on_start()
+        finally:
+            process.stdin.close()
+            process.wait()
+
+
+def get_playback_engine():
+    """프로세스 전체에서 공유하는 PlaybackEngine (처음 호출 시 생성)"""
+    global _engine
+    with _engine_lock:
+        if _engine is None:
+            _engine = PlaybackEngine()
+        return _engine
+
+
+def set_playback_engine(engine):
+    """공유 엔진 교체 (simulator.py 의 가상 스피커 등) - 이전 엔진 반환"""
+    global _engine
+    with _engine_lock:
+        previous, _engine = _engine, engine
+        return previous
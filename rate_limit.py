@@ -0,0 +1,231 @@
+"""
+Per-provider rate limiting
+==========================
+main_robot_controller 는 모든 LLM 호출을 전역 api_lock 하나로 감쌌기 때문에, 서로 독립인
+명령 해석(LLM_function) 과 대화 응답(LLM_conversation) 요청이 항상 하나씩 순서대로 실행됐습니다.
+
+여기서는 provider 별로 제한을 둡니다.
+    - 토큰 버킷 (분당 요청 수 + burst) - provider 의 RPM 한도를 넘지 않도록
+    - 동시 요청 수 (semaphore) - ElevenLabs 요금제별 동시 요청 한도 등
+    - 요청마다 대기 시간 기록 (WAIT_LOG_MS 이상 기다리면 출력), provider 별 p50/p95/max 집계
+
+한도 안에서는 서로 다른 요청이 동시에 실행되고, 한도를 넘으면 버리지 않고 순서대로 기다립니다.
+PROVIDER_LIMITS 는 환경 변수 <PROVIDER>_RPM / <PROVIDER>_CONCURRENCY 로 바꿀 수 있습니다 (예: OPENAI_RPM=3500).
+
+Usage:
+    with limited("openai", "conversation"):
+        client.chat.completions.create(...)
+
+    python rate_limit.py --demo      # 전역 lock 과 provider limiter 비교 (sleep 으로 흉내낸 요청)
+"""
+
+import argparse
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+# provider: 분당 요청 수 (None 이면 제한 없음), burst, 동시 요청 수 (None 이면 제한 없음)
+PROVIDER_LIMITS = {
+    "openai": {"rpm": 500, "burst": 10, "concurrency": 8},         # Tier 1 - gpt-4.1-mini / transcribe 500 RPM
+    "elevenlabs": {"rpm": None, "burst": 1, "concurrency": 3},    # Starter 요금제 동시 요청 3
+    "vlm": {"rpm": None, "burst": 1, "concurrency": 1},           # Colab VLM 서버 (GPU 1장)
+}
+WAIT_LOG_MS = 50  # 이보다 오래 기다린 요청은 출력
+
+
+class RequestRateLimiter:
+    """클라이언트 측 요청 속도 제한 (분당 요청 수, 토큰 버킷 - 여러 워커 스레드가 공유)"""
+
+    def __init__(self, per_minute: float, burst: int = 1):
+        self.interval = 60.0 / per_minute
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """토큰 하나를 얻을 때까지 대기하고, 기다린 시간(초)을 반환"""
+        start = time.monotonic()
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) / self.interval)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return now - start
+                wait = (1 - self.tokens) * self.interval
+            time.sleep(wait)
+
+
+class ProviderLimiter:
+    """한 provider 의 요청 속도 + 동시 요청 수 제한과 요청별 대기 시간 기록"""
+
+    def __init__(self, provider, rpm=None, burst=1, concurrency=None, history=200):
+        self.provider = provider
+        self.rpm = rpm
+        self.concurrency = concurrency
+        self.bucket = RequestRateLimiter(rpm, burst) if rpm else None
+        self.slots = threading.BoundedSemaphore(concurrency) if concurrency else None
+        self.waits = deque(maxlen=history)  # (label, 대기 시간 초)
+        self.requests = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def acquire(self, label=None):
+        """동시 요청 슬롯과 토큰을 얻을 때까지 대기. 기다린 시간(초) 반환 - 끝나면 release() 필요"""
+        start = time.perf_counter()
+        if self.slots:
+            self.slots.acquire()
+        if self.bucket:
+            self.bucket.acquire()
+        wait = time.perf_counter() - start
+        with self.lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            self.waits.append((label, wait))
+        if wait * 1000 >= WAIT_LOG_MS:
+            log.info(f"⏳ [{self.provider}] {label or 'request'} waited {wait * 1000:.0f}ms for the rate limit")
+        return wait
+
+    def release(self):
+        with self.lock:
+            self.in_flight -= 1
+        if self.slots:
+            self.slots.release()
+
+    @contextmanager
+    def request(self, label=None):
+        """with 블록 동안 슬롯을 잡고 있음. 기다린 시간(초)을 돌려줌"""
+        wait = self.acquire(label)
+        try:
+            yield wait
+        finally:
+            self.release()
+
+    def stats(self):
+        with self.lock:
+            waits = sorted(w for _, w in self.waits)
+            requests, in_flight, max_in_flight = self.requests, self.in_flight, self.max_in_flight
+
+        def percentile(p):
+            return waits[min(len(waits) - 1, int(p * len(waits)))] * 1000 if waits else None
+
+        return {
+            "provider": self.provider,
+            "rpm": self.rpm,
+            "concurrency": self.concurrency,
+            "requests": requests,
+            "in_flight": in_flight,
+            "max_in_flight": max_in_flight,
+            "p50_wait_ms": percentile(0.5),
+            "p95_wait_ms": percentile(0.95),
+            "max_wait_ms": waits[-1] * 1000 if waits else None,
+        }
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def _limits(provider):
+    limits = dict(PROVIDER_LIMITS.get(provider, {}))
+    for key, env in (("rpm", f"{provider.upper()}_RPM"), ("concurrency", f"{provider.upper()}_CONCURRENCY")):
+        if os.getenv(env):
+            limits[key] = int(os.getenv(env)) or None  # 0 이면 제한 없음
+    return limits
+
+
+def get_limiter(provider):
+    """프로세스 전체에서 공유하는 provider 별 limiter (PROVIDER_LIMITS 에 없으면 제한 없이 기록만)"""
+    with _limiters_lock:
+        if provider not in _limiters:
+            _limiters[provider] = ProviderLimiter(provider, **_limits(provider))
+        return _limiters[provider]
+
+
+def limited(provider, label=None):
+    """with limited("openai", "stt"): ... - provider 제한 안에서 요청 실행"""
+    return get_limiter(provider).request(label)
+
+
+def limiter_stats():
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
+
+
+def print_limiter_stats():
+    for s in limiter_stats():
+        if not s["requests"]:
+            continue
+        p50 = f"{s['p50_wait_ms']:.0f}" if s["p50_wait_ms"] is not None else "-"
+        p95 = f"{s['p95_wait_ms']:.0f}" if s["p95_wait_ms"] is not None else "-"
+        log.info(f"🚦 {s['provider']:<11} {s['requests']} requests, peak {s['max_in_flight']}"
+              f"/{s['concurrency'] or '∞'} concurrent, {s['rpm'] or '∞'} rpm, "
+              f"wait p50 {p50}ms p95 {p95}ms max {s['max_wait_ms']:.0f}ms")
+
+
+# =========================
+# Demo
+# =========================
+def demo(request_seconds=0.5):
+    """명령 해석 + 대화 응답 (각각 request_seconds) 을 동시에 보냈을 때 전역 lock 과 provider limiter 비교"""
+    from concurrent.futures import ThreadPoolExecutor
+
+    api_lock = threading.Lock()
+
+    def with_lock(label):
+        start = time.perf_counter()
+        with api_lock:
+            wait = time.perf_counter() - start
+            time.sleep(request_seconds)
+        return wait
+
+    def with_limiter(label):
+        with limited("openai", label) as wait:
+            time.sleep(request_seconds)
+        return wait
+
+    for name, call in (("api_lock", with_lock), ("limiter", with_limiter)):
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            waits = list(pool.map(call, ["commands", "conversation"]))
+        log.info(f"{name:<9} both replies in {(time.perf_counter() - start) * 1000:.0f}ms, "
+              f"queue wait {', '.join(f'{w * 1000:.0f}ms' for w in waits)}")
+
+    # 한도를 넘는 요청은 버리지 않고 순서대로 대기
+    quota = ProviderLimiter("quota-demo", rpm=600, burst=2, concurrency=2)
+
+    def limited_call(i):
+        with quota.request(f"request {i}") as wait:
+            time.sleep(0.05)
+        return wait
+
+    with ThreadPoolExecutor(max_workers=6) as pool:
+        waits = list(pool.map(limited_call, range(6)))
+    log.info(f"600 rpm / burst 2 / 2 concurrent: queue wait {', '.join(f'{w * 1000:.0f}ms' for w in waits)}")
+    print_limiter_stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-provider rate limiting")
+    parser.add_argument("--demo", action="store_true", help="전역 lock 과 provider limiter 비교")
+    args = parser.parse_args()
+    setup_logging()
+    if args.demo:
+        demo()
+        return
+    for provider in PROVIDER_LIMITS:
+        log.info(f"{provider:<11} {_limits(provider)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,263 @@
+"""
+Non-blocking logging
+====================
+모든 모듈이 print 로 출력하는데, 라즈베리파이의 시리얼 콘솔에서는 stdout 쓰기가 동기식이라
+(115200 baud 에서 한 줄에 수 ms) 오디오 워커 / 파이프라인 스레드의 타이밍에 그대로 잡혔습니다.
+
+setup_logging() 은
+    - root logger 에 QueueHandler 를 달고, 실제 출력은 QueueListener 스레드에서 (호출한 스레드는 큐에 넣기만)
+    - LOG_LEVEL (기본 INFO), LOG_FORMAT=text|json, LOG_FILE (있으면 파일에도) 환경 변수로 설정
+json 모드에서는 한 줄에 JSON 하나 (ts, level, logger, thread, msg + extra 필드) 로 기록합니다.
+
+controller 가 상호작용마다 부르는 모듈 (audio_pipeline, interaction_pipeline, tts_pipeline, streaming_stt,
+playback, text_to_audio, LLM_*, colab_vlm / colab_vlm_video / client_vlm_parallel_alt, pi_exercise ...) 은 모두
+get_logger(__name__) 로 레벨을 지정해서 기록합니다. print 는 단독 실행 스크립트의 결과 출력에만 남아 있고,
+그것까지 큐로 보내야 하면 LOG_CAPTURE_PRINT=1 (또는 capture_print=True) 로 PrintRouter 를 켭니다 -
+sys.stdout 을 프로세스 전체에서 바꾸므로 기본값은 꺼져 있습니다.
+
+Meter 는 dB 레벨처럼 자주 바뀌는 값을 interval 마다 한 번만 (그 사이 min/max/mean 요약과 함께) 기록합니다.
+
+Usage:
+    from robot_log import setup_logging, get_logger, Meter
+    setup_logging()
+    log = get_logger(__name__)
+    log.info("🎤 Voice detection active", extra={"threshold_db": -35})
+
+    python robot_log.py --benchmark     # 느린 콘솔 (115200 baud) 에서 print 와 queue 로깅 비교
+"""
+
+import argparse
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+import time
+
+_STANDARD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+# 요청마다 INFO 를 남기는 라이브러리 (openai/elevenlabs SDK 의 httpx 등) - DEBUG 가 아니면 WARNING 부터
+QUIET_LOGGERS = ("httpx", "httpcore", "urllib3")
+
+_listener = None
+_setup_lock = threading.Lock()
+
+
+class JSONFormatter(logging.Formatter):
+    """한 줄에 JSON 하나 - extra 로 넘긴 필드도 그대로 포함"""
+
+    def format(self, record):
+        entry = {
+            "ts": round(record.created, 6),
+            "level": record.levelname,
+            "logger": record.name,
+            "thread": record.threadName,
+            "msg": record.getMessage().strip(),
+        }
+        for key, value in vars(record).items():
+            if key not in _STANDARD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exc"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class PrintRouter:
+    """sys.stdout 대체 - print 한 줄을 호출한 모듈의 logger 로 보냄 (줄 단위, 스레드별 버퍼)
+
+    get_logger 로 바꾸지 않은 모듈용 fallback (LOG_CAPTURE_PRINT=1 일 때만 사용)
+    """
+
+    encoding = "utf-8"
+
+    def __init__(self, stream, skip_blank=False):
+        self.stream = stream
+        self.skip_blank = skip_blank  # json 모드에서는 줄 간격용 빈 print() 를 기록하지 않음
+        self._local = threading.local()
+
+    def write(self, text):
+        buffer = getattr(self._local, "buffer", "") + text
+        if "\n" not in buffer:
+            self._local.buffer = buffer
+            return len(text)
+        *lines, self._local.buffer = buffer.split("\n")
+        # print() 를 호출한 코드의 모듈 이름
+        name = sys._getframe(1).f_globals.get("__name__", "print")
+        logger = logging.getLogger(name)
+        for line in lines:
+            stripped = line.lstrip()
+            if self.skip_blank and not stripped:
+                continue
+            level = (logging.ERROR if stripped.startswith("❌")
+                     else logging.WARNING if stripped.startswith("⚠️") else logging.INFO)
+            if logger.isEnabledFor(level):
+                logger.log(level, line)
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        return self.stream.fileno()
+
+
+def setup_logging(level=None, json_mode=None, log_file=None, capture_print=None, stream=None):
+    """root logger 를 queue 기반 비동기 출력으로 설정 (여러 번 호출해도 한 번만 적용)
+
+    capture_print 가 None 이면 LOG_CAPTURE_PRINT=1 일 때만 print 를 PrintRouter 로 보냄 (opt-in fallback)
+    """
+    global _listener
+    with _setup_lock:
+        if _listener is not None:
+            return _listener
+        level = level or os.getenv("LOG_LEVEL", "INFO").upper()
+        if json_mode is None:
+            json_mode = os.getenv("LOG_FORMAT", "text").lower() == "json"
+        log_file = log_file or os.getenv("LOG_FILE")
+        if capture_print is None:
+            capture_print = os.getenv("LOG_CAPTURE_PRINT", "0") == "1"
+        stream = stream or sys.stdout
+
+        formatter = JSONFormatter() if json_mode else logging.Formatter("%(message)s")
+        handlers = [logging.StreamHandler(stream)]
+        if log_file:
+            handlers.append(logging.FileHandler(log_file, encoding="utf-8"))
+        for handler in handlers:
+            handler.setFormatter(formatter)
+
+        log_queue = queue.SimpleQueue()
+        root = logging.getLogger()
+        root.handlers = [logging.handlers.QueueHandler(log_queue)]
+        root.setLevel(level)
+        if root.getEffectiveLevel() > logging.DEBUG:
+            for name in QUIET_LOGGERS:
+                logging.getLogger(name).setLevel(logging.WARNING)
+        _listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+        # 종료 시 큐에 남은 기록을 모두 출력
+        atexit.register(shutdown_logging)
+        if capture_print:
+            sys.stdout = PrintRouter(stream, skip_blank=json_mode)
+        return _listener
+
+
+def shutdown_logging():
+    """큐에 남은 기록을 출력하고 listener 스레드를 멈춤 (sys.stdout 복원)"""
+    global _listener
+    with _setup_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        if isinstance(sys.stdout, PrintRouter):
+            sys.stdout = sys.stdout.stream
+
+
+def get_logger(name):
+    return logging.getLogger(name)
+
+
+class Meter:
+    """자주 바뀌는 값을 interval(초) 마다 한 번만 기록 (그 사이 값은 min/max/mean 으로 요약)
+
+    Args:
+        logger: 기록할 logger
+        name (str): 값 이름 (json 모드의 meter 필드)
+        interval (float): 최소 기록 간격(초)
+        unit (str): 단위
+        label (callable): 마지막 값 → 덧붙일 문자열 (예: dB → "🔈 SILENT")
+        prefix (str): 메시지 앞부분
+    """
+
+    def __init__(self, logger, name, interval=1.0, unit="", label=None, prefix=None, level=logging.INFO):
+        self.logger = logger
+        self.name = name
+        self.interval = interval
+        self.unit = unit
+        self.label = label
+        self.prefix = prefix or name
+        self.level = level
+        self._last_emit = 0.0
+        self._reset()
+
+    def _reset(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = float("inf")
+        self.max = float("-inf")
+
+    def update(self, value, now=None):
+        self.count += 1
+        self.total += value
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        now = time.monotonic() if now is None else now
+        if now - self._last_emit < self.interval:
+            return
+        self._last_emit = now
+        if self.logger.isEnabledFor(self.level):
+            label = f" {self.label(value)}" if self.label else ""
+            self.logger.log(
+                self.level, f"{self.prefix}: {value:.1f} {self.unit}{label}".rstrip(),
+                extra={"meter": self.name, "value": round(value, 2), "min": round(self.min, 2),
+                       "max": round(self.max, 2), "mean": round(self.total / self.count, 2), "count": self.count}
+            )
+        self._reset()
+
+
+# =========================
+# Benchmark
+# =========================
+class SlowConsole:
+    """시리얼 콘솔 흉내 - 바이트 수에 비례해서 쓰기가 막힘 (8N1: 바이트당 10 bit)"""
+
+    def __init__(self, baud=115200):
+        self.seconds_per_byte = 10 / baud
+
+    def write(self, text):
+        time.sleep(len(text.encode("utf-8")) * self.seconds_per_byte)
+        return len(text)
+
+    def flush(self):
+        pass
+
+
+def benchmark(lines=200, baud=115200):
+    """출력 스레드(호출한 쪽)가 한 줄에 쓰는 시간: 직접 print vs queue 로깅"""
+    console = SlowConsole(baud)
+    message = "🎤 Sound level: -41.3 dB 🔈 SILENT"
+
+    start = time.perf_counter()
+    for _ in range(lines):
+        print(message, file=console)
+    direct = (time.perf_counter() - start) / lines
+
+    setup_logging(stream=console, capture_print=False)
+    log = get_logger("benchmark")
+    start = time.perf_counter()
+    for _ in range(lines):
+        log.info(message)
+    queued = (time.perf_counter() - start) / lines
+    shutdown_logging()  # 남은 기록 출력 (실제 콘솔 쓰기는 listener 스레드에서)
+
+    print(f"📊 {lines} lines @ {baud} baud, caller-side time per line: "
+          f"print {direct * 1e6:.0f}us, queued log {queued * 1e6:.1f}us")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Non-blocking logging")
+    parser.add_argument("--benchmark", action="store_true", help="느린 콘솔에서 print 와 queue 로깅 비교")
+    parser.add_argument("--baud", type=int, default=115200)
+    args = parser.parse_args()
+    if args.benchmark:
+        benchmark(baud=args.baud)
+
+
+if __name__ == "__main__":
+    main()
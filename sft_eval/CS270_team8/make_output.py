@@ -1,6 +1,8 @@
 import csv
 import time
 import os
+import sys
+import logging
 import openai # Import the openai library
 import random # Import the random library
 from dotenv import load_dotenv # Import load_dotenv
@@ -8,6 +10,9 @@ from dotenv import load_dotenv # Import load_dotenv
 # Load environment variables from .env file
 load_dotenv()
 
+# Per-instruction progress goes through logging (LOG_LEVEL=DEBUG also shows each API output)
+log = logging.getLogger(__name__)
+
 # Initialize the OpenAI client
 # It will now also pick up keys loaded from .env by load_dotenv()
 try:
@@ -274,7 +279,7 @@ def call_openai_api(instruction_text, model_id, system_prompt_content):
     if not client:
         return "ERROR: OpenAI client not initialized."
 
-    print(f"Calling OpenAI API (model: {model_id}) for: {instruction_text[:50]}...")
+    log.debug(f"Calling OpenAI API (model: {model_id}) for: {instruction_text[:50]}...")
     try:
         completion = client.chat.completions.create(
             model=model_id,
@@ -286,10 +291,10 @@ def call_openai_api(instruction_text, model_id, system_prompt_content):
         response_content = completion.choices[0].message.content
         return response_content.strip() if response_content else ""
     except openai.APIError as e:
-        print(f"OpenAI API Error: {e}")
+        log.error(f"OpenAI API Error: {e}")
         return f"ERROR_OPENAI_API: {e}"
     except Exception as e:
-        print(f"An unexpected error occurred during OpenAI API call: {e}")
+        log.error(f"An unexpected error occurred during OpenAI API call: {e}")
         return f"ERROR_UNEXPECTED_API_CALL: {e}"
 # --- End of OpenAI API call logic ---
 
@@ -358,11 +363,11 @@ def generate_outputs_from_api(user_content_file, output_csv_file, model_id, syst
     # 3. Call API for each selected instruction and collect responses
     processed_data = [] # Store [instruction, response] pairs
     for i, instruction in enumerate(selected_instructions):
-        print(f"Processing instruction {i+1}/{len(selected_instructions)} ('{instruction[:30]}...')...")
+        log.info(f"Processing instruction {i+1}/{len(selected_instructions)} ('{instruction[:30]}...')...")
         response = call_openai_api(instruction, model_id, system_prompt_content)
-        print(f"  Instruction: {instruction[:80]}...") # Print the instruction
-        print(f"  API Output: {response}") # Print the API response
-        print("---") # Separator
+        log.debug(f"  Instruction: {instruction[:80]}...") # Log the instruction
+        log.debug(f"  API Output: {response}") # Log the API response
+        log.debug("---") # Separator
         processed_data.append([instruction, response]) # Store instruction and response
         
         # Optional: Add a delay to respect API rate limits if necessary
@@ -379,6 +384,11 @@ def generate_outputs_from_api(user_content_file, output_csv_file, model_id, syst
         print(f"Error writing to {output_csv_file}: {e}")
 
 if __name__ == "__main__":
+    # Route output through the repo-wide queue-backed logger (robot_log.py at the repo root)
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+    from robot_log import setup_logging
+    setup_logging()
+
     user_csv = "user_content.csv"
 
     # Check for OPENAI_API_KEY after attempting to load from .env
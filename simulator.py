@@ -0,0 +1,516 @@
+"""
+Offline full-pipeline simulator / load generator
+================================================
+마이크, Pi 카메라, 스피커, 실제 OpenAI / ElevenLabs / VLM endpoint 없이 main_robot_controller 를 실행합니다.
+
+    - 마이크: WAV 를 BLOCK_SIZE 블록으로 잘라 실시간 속도로 capture.callback 에 넣음
+      (sounddevice InputStream 자리 - 이후 AudioWorker → VAD → InteractionPipeline 은 실제 코드 그대로)
+    - 카메라: 고정 JPEG 을 VLM endpoint 로 전송 (picamera 촬영 대기 시간은 --camera-seconds)
+    - 스피커: PlaybackEngine 의 PCM 출력을 재생 시간만큼 기다리는 가상 장치로 (mp3 클립은 SDL dummy 드라이버)
+      --echo-db 를 주면 재생 중 (+ 출력 지연, 잔향) 마이크에 그 레벨의 에코가 섞임 (half-duplex 게이트 확인용)
+    - 로봇: 명령마다 --robot-seconds 대기
+    - STT / chat / TTS / VLM: stub_servers.StandInServer (route 별 지연/오류 분포, 처리 용량)
+
+operator 한 명 = controller 프로세스 하나 (로봇 한 대). --operators 1,2,4,8 이면 operator 수를 늘려가며
+같은 stand-in 서버에 동시에 붙여서 처리량과 단계별 지연 percentile 을 비교합니다.
+(MultiThreadManager 는 InteractionPipeline 으로 바뀌었으므로 측정 대상은 pipeline 의 단계들입니다.)
+
+Usage:
+    python simulator.py                                         # operator 1명, test.wav 3회
+    python simulator.py --operators 1,2,4,8 --interactions 5
+    python simulator.py --wav a.wav --wav b.wav --route chat=lognormal:0.8:0.4@0.02 --capacity vlm=1
+    python simulator.py --operators 1,4 --json sim.json         # 결과 저장
+    python simulator.py --echo-db -28 [--no-half-duplex]        # 스피커 에코로 시작되는 낭비된 상호작용 확인
+"""
+
+import argparse
+import base64
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import tempfile
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from playback import PlaybackEngine
+from stub_servers import StandInServer, parse_routes, parse_capacity
+from tracing import load_traces, summarize
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_WAV = os.path.join(BASE_DIR, "test.wav")
+DEFAULT_IMAGE = os.path.join(BASE_DIR, "KakaoTalk_Photo_2025-05-16-03-37-07.jpeg")
+DEFAULT_ROUTES = [  # 실제 서비스와 비슷한 기본 지연 (--route 로 덮어씀)
+    "stt=lognormal:0.35:0.3",
+    "chat=lognormal:0.9:0.35",
+    "tts=lognormal:0.25:0.3",
+    "vlm=lognormal:1.2:0.3",
+]
+TTS_AUDIO_SECONDS_PER_CHAR = 0.065  # stand-in TTS 응답 길이 (영어 낭독 속도 ~15자/초)
+INTERACTION_TIMEOUT = 90.0  # 발화가 끝난 뒤 상호작용 완료까지 기다리는 시간(초)
+NO_TRIGGER_SECONDS = 2.0    # 발화가 끝나고 이 시간 안에 녹음이 시작되지 않았으면 no_trigger
+ECHO_LATENCY_SECONDS = 0.15  # 재생 스레드가 끝난 뒤에도 출력 장치 버퍼에서 나오는 시간(초)
+ECHO_RT60_SECONDS = 0.3      # 방 잔향이 60dB 줄어드는 시간(초)
+
+
+# =========================
+# Simulated devices (operator 프로세스 안에서 사용)
+# =========================
+class SimulatedMicrophone:
+    """sounddevice InputStream 대신 - 블록을 실시간 속도로 callback(indata, frames, time, status) 에 넣음"""
+
+    def __init__(self, callback, sample_rate, blocksize, noise_db=-55.0, speed=1.0, seed=None, echo=None):
+        import numpy as np
+
+        self.np = np
+        self.callback = callback
+        self.sample_rate = sample_rate
+        self.blocksize = blocksize
+        self.noise_level = 10 ** (noise_db / 20)
+        self.block_seconds = blocksize / sample_rate / speed
+        self._next = None
+        # seed 가 같으면 배경 소음도 같음 (cassette 재생 시 업로드되는 오디오 청크가 같은 key)
+        self._rng = np.random.default_rng(seed)
+        self.echo = echo  # 지금 마이크에 들리는 스피커 에코 진폭 (SimulatedSpeaker.echo_level)
+
+    def load(self, path, gain=1.0):
+        """WAV → controller 샘플링 레이트의 float32 (n, 1)"""
+        import soundfile as sf
+        from audio_codec import resample
+
+        audio, rate = sf.read(path, dtype="float32", always_2d=True)
+        audio = resample(audio[:, :1], rate, self.sample_rate) * gain
+        return audio.reshape(-1, 1).astype(self.np.float32)
+
+    def _feed(self, block):
+        # 실제 장치처럼 block_seconds 간격으로 (밀리면 따라잡고, 1초 넘게 밀리면 다시 맞춤)
+        now = time.perf_counter()
+        if self._next is None or now - self._next > 1.0:
+            self._next = now
+        elif self._next > now:
+            time.sleep(self._next - now)
+        level = self.echo() if self.echo else 0.0
+        if level:
+            block = block + (self._rng.standard_normal(block.shape) * level).astype(self.np.float32)
+        self.callback(block, len(block), None, None)
+        self._next += self.block_seconds
+
+    def _noise(self):
+        return (self._rng.standard_normal((self.blocksize, 1)) * self.noise_level).astype(self.np.float32)
+
+    def play(self, audio):
+        for i in range(0, len(audio) - self.blocksize + 1, self.blocksize):
+            self._feed(audio[i:i + self.blocksize])
+
+    def silence(self, seconds):
+        for _ in range(max(int(seconds / self.block_seconds), 0)):
+            self._feed(self._noise())
+
+    def idle_until(self, predicate, timeout):
+        """predicate() 가 True 가 될 때까지 배경 소음을 넣음. timeout 이면 False"""
+        deadline = time.perf_counter() + timeout
+        while not predicate():
+            if time.perf_counter() > deadline:
+                return False
+            self._feed(self._noise())
+        return True
+
+
+class SimulatedCamera:
+    """picamera 촬영 + colab_vlm.send_frame 대신 - 고정 JPEG 을 stand-in VLM endpoint 로 전송"""
+
+    def __init__(self, url, image_path=DEFAULT_IMAGE, capture_seconds=2.0, endpoint="VLM_face"):
+        self.url = url.rstrip("/")
+        self.capture_seconds = capture_seconds
+        self.endpoint = endpoint
+        with open(image_path, "rb") as f:
+            self.jpeg = f.read()
+
+    def __call__(self, mode="image"):
+        from api_clients import get_http_session
+        from rate_limit import limited
+        from tracing import span
+
+        with span("vlm.capture"):
+            time.sleep(self.capture_seconds)  # client_vlm_parallel_alt 의 카메라 준비 시간
+        with span("vlm.encode"):
+            img_b64 = base64.b64encode(self.jpeg).decode("utf-8")
+        try:
+            with limited("vlm", self.endpoint), span("vlm.upload", endpoint=self.endpoint,
+                                                     kb=round(len(img_b64) / 1024, 1)):
+                response = get_http_session().post(f"{self.url}/{self.endpoint}", json={"image": img_b64},
+                                                   timeout=20)
+            if response.status_code == 200:
+                return response.json()["response"]
+            print("서버 오류:", response.text)
+            return None
+        except Exception as e:
+            print("전송 실패:", str(e))
+            return None
+
+
+class SimulatedRobot:
+    """pi_exercise.main 대신 - 명령 시퀀스 실행 시간만큼 대기"""
+
+    def __init__(self, seconds=1.0):
+        self.seconds = seconds
+
+    def __call__(self, command):
+        time.sleep(self.seconds)
+
+
+class SimulatedSpeaker(PlaybackEngine):
+    """PCM 출력 장치 대신 - 재생 시간만큼 기다림 (mp3 클립은 pygame SDL dummy 드라이버로 실제 디코딩/재생)"""
+
+    def __init__(self, speed=1.0, echo_db=None, **kwargs):
+        self.speed = speed
+        self.echo_amplitude = 10 ** (echo_db / 20) if echo_db is not None else 0.0
+        super().__init__(**kwargs)
+
+    def echo_level(self):
+        """마이크에 들리는 에코 진폭 - 재생 중과 출력 지연 동안은 그대로, 그 뒤로는 잔향으로 감소"""
+        if not self.echo_amplitude:
+            return 0.0
+        idle = self.idle_for() * self.speed
+        if idle <= ECHO_LATENCY_SECONDS:
+            return self.echo_amplitude
+        decay_db = 60 * (idle - ECHO_LATENCY_SECONDS) / ECHO_RT60_SECONDS
+        return self.echo_amplitude * 10 ** (-decay_db / 20) if decay_db < 60 else 0.0
+
+    def _write_pcm(self, chunks, sample_rate, channels, on_start):
+        bytes_per_second = 2 * channels * sample_rate * self.speed
+        played, played_until = [], None
+        for chunk in chunks:
+            now = time.perf_counter()
+            if played_until is None:
+                played_until = now
+                if on_start:
+                    on_start()
+            # 청크가 늦게 오면 그 사이 출력이 끊긴 것 (underrun)
+            played_until = max(played_until, now) + len(chunk) / bytes_per_second
+            played.append(chunk)
+        if played_until is not None:
+            time.sleep(max(played_until - time.perf_counter(), 0.0))
+        return b"".join(played)
+
+
+# =========================
+# Operator (spawn 된 프로세스에서 실행)
+# =========================
+def _interaction_result(interaction, times, wav):
+    optional = {stage.name for stage in interaction.pipeline.stages if stage.optional}
+    stages, status = {}, "ok"
+    for record in interaction.records.values():
+        if record.status == "input":
+            continue
+        stages[record.name] = {
+            "status": record.status,
+            "ms": record.duration * 1000 if record.duration is not None else None,
+            "queued_ms": (record.start - record.ready) * 1000 if record.start is not None and record.ready is not None
+            else None,
+        }
+        if record.status in ("error", "timeout") and record.name not in optional:
+            status = "error"
+    endpoint = times.get("endpoint")
+    playback = times.get("response_playback")
+    return {
+        "wav": os.path.basename(wav),
+        "status": status,
+        "stages": stages,
+        "response_ms": (playback - endpoint) * 1000 if endpoint and playback else None,
+        "total_ms": (time.perf_counter() - endpoint) * 1000 if endpoint else None,
+        "critical_path": [record.name for record in interaction.critical_path()],
+        "finished_at": time.time(),
+    }
+
+
+def run_operator(operator_id, config):
+    """controller 하나를 시뮬레이션 장치로 실행하고 상호작용별 결과를 반환"""
+    os.environ.update(config["env"])
+    os.environ["TRACE_DIR"] = os.path.join(config["run_dir"], f"operator-{operator_id}")
+    os.environ["TTS_CACHE_DIR"] = os.path.join(config["run_dir"], f"tts-cache-{operator_id}")
+
+    from robot_log import setup_logging
+    setup_logging(level=config["log_level"])
+
+    from playback import set_playback_engine
+    speaker = SimulatedSpeaker(speed=config["speed"], echo_db=config["echo_db"])
+    set_playback_engine(speaker)
+
+    import main_robot_controller as controller
+    from audio_pipeline import AudioWorker
+    from api_clients import warm_up, default_endpoints
+    from rate_limit import limiter_stats
+    from tracing import get_tracer
+
+    rng = random.Random(config["seed"] + operator_id)
+    controller.run_vlm_alt = SimulatedCamera(config["url"], capture_seconds=config["camera_seconds"])
+    controller.run_spike = SimulatedRobot(config["robot_seconds"])
+    controller.duplex_gate.enabled = config["half_duplex"]
+
+    results = []
+    done = threading.Event()
+    original_finish = controller.finish_interaction
+
+    def finish_interaction(interaction):
+        # finish_interaction 이 interaction_times 를 지우기 전에 기록
+        results.append(_interaction_result(interaction, dict(controller.interaction_times), current_wav[0]))
+        original_finish(interaction)
+        done.set()
+
+    controller.finish_interaction = finish_interaction
+    warm_up(default_endpoints(vlm_url=config["url"], stt_url=os.getenv("STT_STREAM_URL")))
+    try:
+        controller.get_playback_engine().preload(controller.WAIT_AUDIO_FILE)
+    except Exception as e:
+        print(f"⚠️ Cannot preload {controller.WAIT_AUDIO_FILE}: {e}")
+
+    mic = SimulatedMicrophone(controller.capture.callback, controller.SAMPLE_RATE, controller.BLOCK_SIZE,
+                              noise_db=config["noise_db"], speed=config["speed"],
+                              seed=config["seed"] + operator_id, echo=speaker.echo_level)
+    clips = [(path, mic.load(path, config["gain"])) for path in config["wavs"]]
+    worker = AudioWorker(controller.capture.queue, controller.process_audio_block)
+    worker.start()
+    current_wav = [None]
+    started_at = time.time()
+    try:
+        mic.silence(0.5)
+        for k in range(config["interactions"]):
+            path, audio = clips[(operator_id + k) % len(clips)]
+            current_wav[0] = path
+            previous = controller.interaction
+            done.clear()
+            mic.play(audio)
+            spoken = time.perf_counter()
+            # 발화 뒤에도 배경 소음을 계속 넣으면서 (VAD endpoint) 상호작용이 끝날 때까지
+            finished = mic.idle_until(
+                lambda: done.is_set() or (controller.interaction is previous
+                                          and time.perf_counter() - spoken > NO_TRIGGER_SECONDS),
+                timeout=INTERACTION_TIMEOUT
+            )
+            if not done.is_set():
+                status = "no_trigger" if finished else "timeout"
+                results.append({"wav": os.path.basename(path), "status": status, "stages": {},
+                                "response_ms": None, "total_ms": None, "critical_path": [],
+                                "finished_at": time.time()})
+                if status == "timeout" and controller.interaction is not None:
+                    controller.interaction.cancel()
+                    done.wait(10)
+            mic.silence(rng.uniform(0.5, 1.5) * config["think_seconds"])
+    finally:
+        worker.stop()
+        controller.pipeline.close()
+        controller.get_playback_engine().shutdown()
+
+    return {
+        "operator": operator_id,
+        "started_at": started_at,
+        "interactions": results,
+        "capture": controller.capture.report(),
+        "limiters": limiter_stats(),
+        "duplex": controller.duplex_gate.stats(),
+        "trace_log": get_tracer().path,
+    }
+
+
+# =========================
+# Load generator
+# =========================
+def percentiles(values):
+    """{p50, p95, p99, max} (값이 없으면 None)"""
+    values = sorted(v for v in values if v is not None)
+    if not values:
+        return None
+    if len(values) == 1:
+        return {"p50": values[0], "p95": values[0], "p99": values[0], "max": values[0]}
+    q = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50": q[49], "p95": q[94], "p99": q[98], "max": values[-1]}
+
+
+def summarize_run(operators, outputs, server_stats):
+    interactions = [i for out in outputs for i in out["interactions"]]
+    ok = [i for i in interactions if i["status"] == "ok"]
+    start = min(out["started_at"] for out in outputs)
+    end = max((i["finished_at"] for i in interactions), default=start)
+    elapsed = max(end - start, 1e-9)
+
+    stage_names = []
+    for i in interactions:
+        stage_names += [name for name in i["stages"] if name not in stage_names]
+    stages = {}
+    for name in stage_names:
+        records = [i["stages"][name] for i in interactions if name in i["stages"]]
+        stages[name] = {
+            "ms": percentiles(r["ms"] for r in records if r["status"] == "ok"),
+            "queued_ms": percentiles(r["queued_ms"] for r in records),
+            "errors": sum(r["status"] in ("error", "timeout") for r in records),
+        }
+
+    traces = []
+    for out in outputs:
+        if out["trace_log"] and os.path.exists(out["trace_log"]):
+            traces += load_traces(out["trace_log"])
+
+    statuses = {}
+    for i in interactions:
+        statuses[i["status"]] = statuses.get(i["status"], 0) + 1
+    return {
+        "operators": operators,
+        "elapsed_s": elapsed,
+        "interactions": len(interactions),
+        "statuses": statuses,
+        "throughput_per_min": len(ok) / elapsed * 60,
+        "response_ms": percentiles(i["response_ms"] for i in ok),
+        "total_ms": percentiles(i["total_ms"] for i in ok),
+        "stages": stages,
+        "spans": summarize(traces) if traces else {},
+        "server": server_stats,
+        "dropped_blocks": sum(out["capture"]["queue_dropped"] for out in outputs),
+        "duplex": {key: sum(out["duplex"][key] for out in outputs)
+                   for key in ("suppressed", "barge_ins", "echo_interactions", "wasted")},
+    }
+
+
+def print_run(report):
+    def fmt(p):
+        return f"{p['p50']:7.0f} {p['p95']:7.0f} {p['p99']:7.0f}" if p else f"{'-':>7} {'-':>7} {'-':>7}"
+
+    statuses = ", ".join(f"{k} {v}" for k, v in sorted(report["statuses"].items()))
+    print(f"\n👥 {report['operators']} operators: {report['interactions']} interactions ({statuses}) "
+          f"in {report['elapsed_s']:.1f}s → {report['throughput_per_min']:.1f}/min, "
+          f"dropped audio blocks {report['dropped_blocks']}")
+    print(f"  {'ms':<22} {'p50':>7} {'p95':>7} {'p99':>7}")
+    print(f"  {'endpoint → first audio':<22} {fmt(report['response_ms'])}")
+    print(f"  {'endpoint → done':<22} {fmt(report['total_ms'])}")
+    for name, stage in report["stages"].items():
+        queued = stage["queued_ms"]
+        extra = f"  queued p95 {queued['p95']:.0f}ms" if queued and queued["p95"] >= 1 else ""
+        extra += f"  errors {stage['errors']}" if stage["errors"] else ""
+        print(f"  {'stage.' + name:<22} {fmt(stage['ms'])}{extra}")
+    for name, span in sorted(report["spans"].items()):
+        if name.startswith("stage.") or name == "interaction":
+            continue
+        err = f"  errors {span['errors']}" if span["errors"] else ""
+        print(f"  {name:<22} {span['p50']:7.0f} {span['p95']:7.0f} {span['p99']:7.0f}{err}")
+    d = report["duplex"]
+    print(f"  🔇 echo triggers suppressed {d['suppressed']}, barge-ins {d['barge_ins']}, "
+          f"interactions started by playback echo {d['echo_interactions']}, wasted (no reply/command) {d['wasted']}")
+    for route, s in sorted(report["server"].items()):
+        queue = f", server queue max {s['max_queue_ms']:.0f}ms" if s.get("max_queue_ms") else ""
+        print(f"  🧪 {route:<5} {s['requests']} requests, {s['errors']} errors, "
+              f"peak {s['max_in_flight']} concurrent{queue}")
+
+
+def print_scaling(reports, efficiency_floor=0.8):
+    """operator 수별 처리량 - operator 당 처리량이 첫 단계의 efficiency_floor 아래로 떨어지는 지점 표시"""
+    if len(reports) < 2:
+        return
+    base = reports[0]["throughput_per_min"] / reports[0]["operators"]
+    print(f"\n📈 Scaling ({'operators':>9} {'per min':>8} {'per op':>7} {'eff':>5} {'resp p95':>9})")
+    knee = None
+    for r in reports:
+        per_op = r["throughput_per_min"] / r["operators"]
+        efficiency = per_op / base if base else 0.0
+        p95 = f"{r['response_ms']['p95']:7.0f}ms" if r["response_ms"] else f"{'-':>9}"
+        mark = ""
+        if knee is None and efficiency < efficiency_floor:
+            knee = r["operators"]
+            mark = "  ⚠️ stops scaling"
+        print(f"           {r['operators']:>9} {r['throughput_per_min']:8.1f} {per_op:7.2f} {efficiency:5.0%} "
+              f"{p95}{mark}")
+    if knee is None:
+        print(f"✅ Per-operator throughput stayed above {efficiency_floor:.0%} of {reports[0]['operators']} operator(s)")
+
+
+def simulate(operator_counts=(1,), interactions=3, wavs=(DEFAULT_WAV,), routes=None, capacity=None,
+             speed=1.0, think_seconds=2.0, camera_seconds=2.0, robot_seconds=1.0, gain=1.0, noise_db=-55.0,
+             streaming_http=True, log_level="WARNING", seed=0, echo_db=None, half_duplex=True):
+    """stand-in 서버 하나에 operator 수를 늘려가며 붙여서 단계별 결과 반환"""
+    routes = parse_routes(DEFAULT_ROUTES) if routes is None else routes
+    run_dir = tempfile.mkdtemp(prefix="virus-sim-")
+    reports = []
+    with StandInServer(routes=routes, capacity=capacity,
+                       tts_audio_seconds_per_char=TTS_AUDIO_SECONDS_PER_CHAR) as server:
+        env = {
+            "OPENAI_API_KEY": "simulator",
+            "OPENAI_BASE_URL": f"{server.url}/v1",
+            "ELEVENLABS_API_KEY": "simulator",
+            "ELEVENLABS_BASE_URL": server.url,
+            "SDL_AUDIODRIVER": "dummy",
+        }
+        # 스트리밍 STT: stand-in 세션 API (HTTPChunkTransport) 또는 Whisper partial 윈도우 (OpenAI 형식)
+        env["STT_STREAM_URL"] = server.url if streaming_http else ""
+        print(f"🧪 Stand-in server {server.url} - " + ", ".join(f"{k} {v}" for k, v in routes.items()))
+        for n in operator_counts:
+            config = {
+                "env": env, "url": server.url, "run_dir": os.path.join(run_dir, f"{n}-operators"),
+                "wavs": list(wavs), "interactions": interactions, "speed": speed, "gain": gain,
+                "noise_db": noise_db, "think_seconds": think_seconds, "camera_seconds": camera_seconds,
+                "robot_seconds": robot_seconds, "log_level": log_level, "seed": seed,
+                "echo_db": echo_db, "half_duplex": half_duplex,
+            }
+            server.state.route_stats(reset=True)
+            print(f"\n▶️ {n} operator(s) × {interactions} interactions...")
+            # 프로세스마다 controller 모듈 전역 상태가 따로 (spawn - fork 된 pygame/스레드 상태를 물려받지 않음)
+            with ProcessPoolExecutor(max_workers=n, mp_context=multiprocessing.get_context("spawn")) as pool:
+                outputs = list(pool.map(run_operator, range(n), [config] * n))
+            report = summarize_run(n, outputs, server.state.route_stats())
+            print_run(report)
+            reports.append(report)
+    print_scaling(reports)
+    print(f"\n🗂️ Traces: {run_dir} (python tracing.py export <operator>/session-*.jsonl)")
+    return reports
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline full-pipeline simulator / load generator")
+    parser.add_argument("--operators", default="1", help="동시 operator 수 (쉼표로 여러 단계, 예: 1,2,4,8)")
+    parser.add_argument("--interactions", type=int, default=3, help="operator 당 상호작용 수")
+    parser.add_argument("--wav", action="append", help="재생할 WAV (여러 번 가능, 기본값: test.wav)")
+    parser.add_argument("--gain", type=float, default=1.0, help="WAV 음량 배율")
+    parser.add_argument("--noise-db", type=float, default=-55.0, help="발화 사이 배경 소음 (dBFS)")
+    parser.add_argument("--route", action="append", help="route 별 지연/오류 분포 (stub_servers.py 형식, 예: "
+                                                         "chat=lognormal:0.8:0.4@0.02) - 지정하면 기본값 대신 사용")
+    parser.add_argument("--capacity", action="append", default=[], help="route 별 서버 처리 용량 (예: vlm=1)")
+    parser.add_argument("--think-seconds", type=float, default=2.0, help="상호작용 사이 평균 대기 시간(초)")
+    parser.add_argument("--camera-seconds", type=float, default=2.0, help="카메라 촬영 대기 시간(초)")
+    parser.add_argument("--robot-seconds", type=float, default=1.0, help="로봇 명령 실행 시간(초)")
+    parser.add_argument("--speed", type=float, default=1.0, help="마이크/스피커 재생 속도 배율")
+    parser.add_argument("--whisper-partials", action="store_true",
+                        help="스트리밍 STT 를 세션 API 대신 Whisper partial 윈도우 방식으로")
+    parser.add_argument("--echo-db", type=float, help="재생 중 마이크에 섞이는 스피커 에코 레벨 (dBFS, 기본값: 없음)")
+    parser.add_argument("--no-half-duplex", action="store_true",
+                        help="재생 중에도 녹음 시작을 막지 않음 (에코로 시작된 상호작용만 셈)")
+    parser.add_argument("--log-level", default="WARNING", help="operator 프로세스의 LOG_LEVEL")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    args = parser.parse_args()
+
+    reports = simulate(
+        operator_counts=[int(n) for n in args.operators.split(",")],
+        interactions=args.interactions,
+        wavs=args.wav or [DEFAULT_WAV],
+        routes=parse_routes(args.route) if args.route else None,
+        capacity=parse_capacity(args.capacity),
+        speed=args.speed,
+        think_seconds=args.think_seconds,
+        camera_seconds=args.camera_seconds,
+        robot_seconds=args.robot_seconds,
+        gain=args.gain,
+        noise_db=args.noise_db,
+        streaming_http=not args.whisper_partials,
+        log_level=args.log_level,
+        seed=args.seed,
+        echo_db=args.echo_db,
+        half_duplex=not args.no_half_duplex,
+    )
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(reports, f, indent=1)
+        print(f"💾 Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""
+Import-time profile
+===================
+main_robot_controller.py 를 import 하는 데 드는 시간을 모듈별로 측정합니다.
+(python -X importtime 출력을 모아서 정리)
+
+    - controller 가 직접 import 하는 모듈별 누적 시간 (어느 import 를 lazy 로 옮길지)
+    - 최상위 패키지별 self 시간 합계 (numpy, httpx 등 실제로 시간을 쓰는 곳)
+    - DEFERRED_MODULES 중 시작 시 import 된 것 (lazy import 가 깨졌는지 확인)
+
+--json 으로 결과를 저장하고 --baseline 으로 이전 결과와 비교해서 릴리스마다 time-to-ready 를 추적합니다.
+실제 time-to-ready (마이크 열림 / 병렬 초기화 완료) 는 controller 실행 시 "⏱️ Startup" 으로 출력됩니다.
+
+Usage:
+    python startup_profile.py                           # main_robot_controller, 3회 중앙값
+    python startup_profile.py --json profile.json       # 결과 저장
+    python startup_profile.py --baseline profile.json   # 이전 결과와 비교
+    python startup_profile.py --module text_to_audio --top 20
+"""
+
+import argparse
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+DEFAULT_MODULE = "main_robot_controller"
+
+# 시작 경로에서 import 되면 안 되는 모듈 (처음 쓰는 곳에서 import)
+DEFERRED_MODULES = [
+    "sounddevice", "soundfile", "openai", "elevenlabs", "pygame",
+    "cv2", "picamera", "pi_exercise", "client_vlm_parallel_alt", "audio_codec",
+]
+
+IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$")
+
+
+def _run_importtime(module):
+    """python -X importtime -c 'import module' 를 실행하고 (self_us, cumulative_us, depth, name) 목록 반환"""
+    env = dict(os.environ)
+    # controller 는 import 시 OPENAI_API_KEY 만 확인하고 API 는 호출하지 않음
+    env.setdefault("OPENAI_API_KEY", "startup-profile")
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True
+    )
+    rows = []
+    for line in proc.stderr.splitlines():
+        match = IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((int(self_us), int(cumulative_us), len(indent) // 2, name))
+    if proc.returncode != 0:
+        errors = [line for line in proc.stderr.splitlines() if not line.startswith("import time:")]
+        raise RuntimeError(f"import {module} failed:\n" + "\n".join(errors[-10:]))
+    return rows
+
+
+def _summarize(rows, module):
+    target = next((row for row in reversed(rows) if row[3] == module), None)
+    if target is None:
+        raise RuntimeError(f"{module} not found in -X importtime output")
+    _, total_us, depth, _ = target
+
+    # import time 출력은 자식이 부모보다 먼저 나오므로, target 바로 앞의 depth+1 항목이 직접 import
+    direct = {}
+    start = rows.index(target)
+    for self_us, cumulative_us, row_depth, name in reversed(rows[:start]):
+        if row_depth <= depth:
+            break
+        if row_depth == depth + 1:
+            direct[name] = cumulative_us / 1000
+
+    packages = defaultdict(float)
+    for self_us, _, _, name in rows:
+        packages[name.split(".")[0]] += self_us / 1000
+
+    imported = {row[3] for row in rows}
+    deferred = [name for name in DEFERRED_MODULES
+                if any(n == name or n.startswith(name + ".") for n in imported)]
+    return {"total_ms": total_us / 1000, "direct": direct, "packages": dict(packages),
+            "eager_deferred": deferred, "modules": len(rows)}
+
+
+def profile(module=DEFAULT_MODULE, runs=3):
+    """runs 번 import 해서 항목별 중앙값 (첫 실행은 디스크 캐시 때문에 느림)"""
+    reports = [_summarize(_run_importtime(module), module) for _ in range(runs)]
+
+    def median(values):
+        values = sorted(values)
+        return values[len(values) // 2]
+
+    def merge(key):
+        names = set().union(*(r[key] for r in reports))
+        return {name: median([r[key].get(name, 0.0) for r in reports]) for name in names}
+
+    return {
+        "module": module,
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "runs": runs,
+        "total_ms": median([r["total_ms"] for r in reports]),
+        "modules": reports[-1]["modules"],
+        "direct": merge("direct"),
+        "packages": merge("packages"),
+        "eager_deferred": reports[-1]["eager_deferred"],
+    }
+
+
+def _git_rev():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def print_report(report, top=15, baseline=None):
+    def delta(section, name, value):
+        if not baseline:
+            return ""
+        old = baseline[section].get(name) if section else baseline["total_ms"]
+        return f" {value - old:+8.1f}ms" if old is not None else "      new"
+
+    print(f"\n📦 import {report['module']}: {report['total_ms']:.0f}ms{delta(None, None, report['total_ms'])}, "
+          f"{report['modules']} modules (median of {report['runs']}, {report['python']} {report['machine']})")
+    if baseline:
+        print(f"   baseline {baseline['total_ms']:.0f}ms @ {baseline.get('git_rev') or baseline['timestamp']}")
+
+    print(f"\n{'direct import':<28} {'cumulative':>11}")
+    for name, ms in sorted(report["direct"].items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<28} {ms:9.1f}ms{delta('direct', name, ms)}")
+
+    print(f"\n{'package':<28} {'self':>11}")
+    for name, ms in sorted(report["packages"].items(), key=lambda item: -item[1])[:top]:
+        print(f"{name:<28} {ms:9.1f}ms{delta('packages', name, ms)}")
+
+    if report["eager_deferred"]:
+        print(f"\n⚠️ Imported at startup (should be lazy): {', '.join(report['eager_deferred'])}")
+    else:
+        print(f"\n✅ None of {', '.join(DEFERRED_MODULES)} imported at startup")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-module import-time profile")
+    parser.add_argument("--module", default=DEFAULT_MODULE, help="측정할 모듈")
+    parser.add_argument("--runs", type=int, default=3, help="반복 횟수 (중앙값)")
+    parser.add_argument("--top", type=int, default=15, help="출력할 항목 수")
+    parser.add_argument("--json", metavar="PATH", help="결과를 JSON 으로 저장")
+    parser.add_argument("--baseline", metavar="PATH", help="이전 --json 결과와 비교")
+    args = parser.parse_args()
+
+    report = profile(args.module, runs=args.runs)
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+    print_report(report, top=args.top, baseline=baseline)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=1)
+        print(f"💾 Saved {args.json}")
+
+
+if __name__ == "__main__":
+    main()
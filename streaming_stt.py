@@ -0,0 +1,300 @@
+"""
+Streaming speech-to-text
+========================
+예전에는 침묵이 감지된 뒤에야 WAV 전체를 한 번에 업로드했기 때문에 STT 지연이
+발화 길이 위에 그대로 더해졌습니다. StreamingTranscriber 는 녹음이 진행되는 동안
+RingBufferRecorder 에 쌓인 오디오를 청크 단위로 미리 보내고, 침묵이 시작되면(pause)
+그때까지의 오디오로 partial 결과를 요청해 두므로 endpoint 직후 바로 transcript 를 얻습니다.
+
+전송 방식(transport)은 교체 가능합니다:
+    - HTTPChunkTransport: 청크를 스트리밍 STT 서버로 업로드 (stub_servers.py 로 로컬 테스트)
+    - WhisperWindowTransport: OpenAI transcription API 에 첫 pause 까지의 오디오를 partial 로 요청
+      (partial 한 번 = 그때까지의 오디오 전체를 다시 업로드하는 과금 STT 호출 1회 - 발화당 최대 2회)
+
+Transport 인터페이스:
+    start(sample_rate) -> session
+    send(session, pcm16_bytes)
+    partial(session) -> (covered_samples, text or None)
+    finish(session, speech_end) -> text
+
+Usage:
+    python streaming_stt.py test.wav       # 로컬 stand-in 서버로 one-shot 과 지연 비교
+"""
+
+import io
+import queue
+import threading
+import time
+from concurrent.futures import Future
+import numpy as np
+from tracing import span
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+
+def to_pcm16(audio):
+    """float32 [-1, 1] 오디오를 PCM16 little-endian 바이트로 변환"""
+    samples = audio[:, 0] if audio.ndim > 1 else audio
+    return (np.clip(samples, -1.0, 1.0) * 32767).astype("<i2").tobytes()
+
+
+class HTTPChunkTransport:
+    """Uploads PCM16 chunks to a streaming STT endpoint (see stub_servers.py)."""
+
+    def __init__(self, base_url, timeout=20, session=None):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.http = session or requests.Session()
+
+    def start(self, sample_rate):
+        response = self.http.post(f"{self.base_url}/stt/sessions", json={"sample_rate": sample_rate},
+                                  timeout=self.timeout)
+        response.raise_for_status()
+        return {"id": response.json()["session"], "samples": 0}
+
+    def send(self, session, pcm):
+        with span("stt.chunk_upload", bytes=len(pcm)):
+            response = self.http.post(
+                f"{self.base_url}/stt/sessions/{session['id']}/chunk",
+                data=pcm,
+                headers={"Content-Type": "audio/L16"},
+                timeout=self.timeout
+            )
+        response.raise_for_status()
+        session["samples"] += len(pcm) // 2
+
+    def partial(self, session):
+        # 서버가 업로드된 오디오를 이미 갖고 있으므로 별도 partial 요청은 필요 없음
+        return session["samples"], None
+
+    def finish(self, session, speech_end=None):
+        with span("stt.finish"):
+            response = self.http.post(f"{self.base_url}/stt/sessions/{session['id']}/finish", timeout=self.timeout)
+        response.raise_for_status()
+        return response.json().get("text")
+
+
+class WhisperWindowTransport:
+    """Transcribes the growing window with the OpenAI transcription API.
+
+    이 API 에는 이어 보내기가 없어서 partial 마다 지금까지의 오디오 전체를 다시 업로드합니다
+    (호출마다 과금, 업로드 양은 발화 길이에 비례해서 누적). 그래서 partial 은 발화당 max_partials 번
+    (기본값: 첫 pause 에서 한 번) 만 요청하고, finish() 는 마지막 partial 이 음성 끝(speech_end)까지
+    포함하면 그 결과를 그대로 돌려줍니다. 아니면 (pause 뒤에 다시 말한 경우) 전체를 한 번 더 전사합니다.
+    client 가 None 이면 처음 전사할 때 api_clients 의 공유 클라이언트를 가져옵니다.
+    """
+
+    def __init__(self, client=None, model="gpt-4o-mini-transcribe", language="en", codec="wav_pcm16",
+                 max_partials=1):
+        self.client = client
+        self.model = model
+        self.language = language
+        self.codec = codec
+        self.max_partials = max_partials
+
+    def start(self, sample_rate):
+        return {"sample_rate": sample_rate, "chunks": [], "samples": 0, "covered": 0, "text": None, "partials": 0}
+
+    def send(self, session, pcm):
+        session["chunks"].append(pcm)
+        session["samples"] += len(pcm) // 2
+
+    def _transcribe(self, session):
+        from audio_codec import encode_audio, as_upload_file
+        from rate_limit import limited
+
+        if self.client is None:
+            from api_clients import get_openai_client
+            self.client = get_openai_client()
+        pcm = np.frombuffer(b"".join(session["chunks"]), dtype="<i2")
+        encoded = encode_audio(pcm, session["sample_rate"], codec=self.codec)
+        with limited("openai", "stt-partial"), span("stt.partial", seconds=round(len(pcm) / session["sample_rate"], 2)):
+            response = self.client.audio.transcriptions.create(
+                model=self.model,
+                file=as_upload_file(encoded),
+                response_format="text",
+                language=self.language
+            )
+        return response.strip() if response else None
+
+    def _transcribe_window(self, session):
+        covered = session["samples"]
+        if covered and covered != session["covered"]:
+            session["text"] = self._transcribe(session)
+            session["covered"] = covered
+        return session["covered"], session["text"]
+
+    def partial(self, session):
+        if session["partials"] >= self.max_partials:
+            return session["covered"], session["text"]
+        session["partials"] += 1
+        return self._transcribe_window(session)
+
+    def finish(self, session, speech_end=None):
+        if speech_end is not None and session["covered"] >= speech_end and session["text"]:
+            return session["text"]
+        return self._transcribe_window(session)[1]
+
+
+class StreamingTranscriber:
+    """Ships recorder audio incrementally from a sender thread while the operator talks.
+
+    녹음 워커 스레드에서 호출:
+        begin(recorder)    - VAD start 이벤트
+        update()           - 블록마다 (청크 크기만큼 쌓였으면 전송 예약)
+        pause(sample)      - VAD pause 이벤트 (지금까지로 partial 요청)
+        resume()           - VAD resume 이벤트
+        end()              - VAD end 이벤트 → Future 반환
+    """
+
+    def __init__(self, transport, sample_rate, chunk_seconds=0.5, partial_interval=None):
+        """
+        Args:
+            transport: HTTPChunkTransport / WhisperWindowTransport
+            sample_rate (int): 녹음 샘플링 레이트
+            chunk_seconds (float): 청크 전송 단위(초)
+            partial_interval (float): 지정하면 pause 가 없어도 이 간격(초)마다 partial 요청
+                (WhisperWindowTransport 에서는 요청마다 전체 재업로드 - 기본값 None: pause 에서만)
+        """
+        self.transport = transport
+        self.sample_rate = sample_rate
+        self.chunk_samples = int(chunk_seconds * sample_rate)
+        self.partial_samples = int(partial_interval * sample_rate) if partial_interval else None
+        self._commands = queue.Queue()
+        self._recorder = None
+        self._queued = 0          # 전송 예약된 샘플 위치
+        self._last_partial = 0    # 마지막 partial 요청 위치
+        self._speech_end = None   # 마지막 pause 위치 (resume 되면 None)
+        self.result = None        # 현재 발화의 Future
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    # -------------------------
+    # 녹음 워커 스레드에서 호출
+    # -------------------------
+    def begin(self, recorder):
+        self._recorder = recorder
+        self._queued = 0
+        self._last_partial = 0
+        self._speech_end = None
+        self.result = Future()
+        self._commands.put(("begin", self.result))
+
+    def update(self):
+        if self._recorder is None:
+            return
+        available = len(self._recorder)
+        if available - self._queued >= self.chunk_samples:
+            self._schedule(available)
+            if self.partial_samples and available - self._last_partial >= self.partial_samples:
+                self._last_partial = available
+                self._commands.put(("partial",))
+
+    def pause(self):
+        if self._recorder is None:
+            return
+        available = len(self._recorder)
+        self._speech_end = available
+        self._schedule(available)
+        self._last_partial = available
+        self._commands.put(("partial",))
+
+    def resume(self):
+        self._speech_end = None
+
+    def end(self):
+        """남은 오디오를 보내고 최종 transcript Future 를 반환합니다."""
+        if self._recorder is None:
+            return None
+        self._schedule(len(self._recorder))
+        self._commands.put(("finish", self._speech_end))
+        self._recorder = None
+        return self.result
+
+    def cancel(self):
+        if self._recorder is not None:
+            self._commands.put(("cancel",))
+            self._recorder = None
+
+    def _schedule(self, end):
+        if end > self._queued:
+            # 녹음 워커 스레드에서 복사 - 전송이 밀린 채 다음 녹음이 시작되면 ring buffer 가 새 발화로 덮어써짐
+            self._commands.put(("chunk", self._recorder.utterance()[self._queued:end].copy()))
+            self._queued = end
+
+    # -------------------------
+    # 전송 스레드
+    # -------------------------
+    def _run(self):
+        session, future, failed = None, None, False
+        while True:
+            command = self._commands.get()
+            kind = command[0]
+            try:
+                if kind == "begin":
+                    future, failed = command[1], False
+                    session = self.transport.start(self.sample_rate)
+                    continue
+                if failed or future is None:
+                    continue
+                if kind == "chunk":
+                    self.transport.send(session, to_pcm16(command[1]))
+                elif kind == "partial":
+                    self.transport.partial(session)
+                elif kind == "finish":
+                    future.set_result(self.transport.finish(session, command[1]))
+                    future = None
+                elif kind == "cancel":
+                    future.cancel()
+                    future = None
+            except Exception as e:
+                log.error(f"❌ Streaming STT error: {e}")
+                failed = True
+                if future is not None and not future.done():
+                    future.set_exception(e)
+
+
+def _compare(path):
+    """로컬 stand-in 서버로 one-shot 업로드와 streaming 의 endpoint 후 지연을 비교"""
+    import requests
+    import soundfile as sf
+    from audio_buffer import RingBufferRecorder
+    from stub_servers import StandInServer
+
+    audio, sample_rate = sf.read(path, dtype="float32", always_2d=True)
+    blocksize = 256
+    with StandInServer(latency=0.3, sample_rate=sample_rate) as server:
+        # one-shot: 발화가 끝난 뒤 WAV 전체 업로드
+        start = time.perf_counter()
+        wav_buffer = io.BytesIO()
+        sf.write(wav_buffer, audio, sample_rate, format="WAV", subtype="PCM_16")
+        requests.post(f"{server.url}/v1/audio/transcriptions", data=wav_buffer.getvalue(), timeout=20)
+        one_shot = time.perf_counter() - start
+
+        # streaming: 실시간 속도로 녹음하면서 청크 업로드
+        recorder = RingBufferRecorder(sample_rate, audio.shape[1], max_seconds=len(audio) / sample_rate + 1)
+        transcriber = StreamingTranscriber(HTTPChunkTransport(server.url), sample_rate)
+        recorder.start()
+        transcriber.begin(recorder)
+        for i in range(0, len(audio), blocksize):
+            recorder.write(audio[i:i + blocksize])
+            transcriber.update()
+            time.sleep(blocksize / sample_rate)
+        start = time.perf_counter()
+        text = transcriber.end().result(timeout=20)
+        streaming = time.perf_counter() - start
+
+    log.info(f"📊 {path}: {len(audio) / sample_rate:.1f}s audio")
+    log.info(f"  one-shot upload after endpoint : {one_shot * 1000:7.0f}ms")
+    log.info(f"  streaming finish after endpoint: {streaming * 1000:7.0f}ms  → \"{text}\"")
+
+
+if __name__ == "__main__":
+    setup_logging()
+    import sys
+
+    for wav_path in sys.argv[1:] or ["test.wav"]:
+        _compare(wav_path)
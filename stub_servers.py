@@ -0,0 +1,505 @@
+"""
+Local stand-in servers
+======================
+실제 OpenAI / ElevenLabs / VLM 엔드포인트 없이 파이프라인을 테스트하기 위한 로컬 HTTP 서버.
+응답 내용은 고정(또는 설정값)이고, 지연 시간만 흉내 냅니다.
+
+Endpoints:
+    GET  /v1/models, HEAD /                - 연결 warm-up / keep-alive probe
+    POST /v1/audio/transcriptions          - one-shot STT (OpenAI Whisper 형식, multipart, text 응답)
+                                             업로드를 디코딩해서 길이가 맞는 reference transcript 를 돌려줌
+    POST /stt/sessions                     - streaming STT 세션 시작 → {"session": id}
+    POST /stt/sessions/<id>/chunk          - PCM16 청크 업로드 → {"received": 초}
+    POST /stt/sessions/<id>/finish         - 최종 transcript → {"text": ...}
+    POST /v1/text-to-speech/<voice>        - TTS (ElevenLabs 형식) - 합성 시간만큼 기다린 뒤 전체 응답
+    POST /v1/text-to-speech/<voice>/stream - TTS streaming - 청크를 지연을 두고 chunked 로 전송
+                                             (tts_failing_models 에 있는 model_id 는 503)
+    POST /v1/chat/completions              - chat completion (OpenAI 형식) - system prompt 에 "cmd" 가 있으면
+                                             (LLM_function) 명령 JSON, 아니면 (LLM_conversation) 대화 응답
+    POST /VLM_*                            - scene description (colab_vlm 형식) → {"response": ...}
+
+route 별 지연/오류 분포 (LatencyModel) 는 routes={"stt"|"chat"|"tts"|"vlm": LatencyModel} 로,
+route 별 처리 용량 (동시에 처리하는 요청 수, 넘으면 서버 쪽에서 대기 - 예: GPU 1장인 VLM 서버) 은
+capacity={"vlm": 1} 로 지정합니다. route 별 요청 수 / 오류 수 / 최대 동시 요청 수 / 최대 대기 시간은
+route_stats() 로 확인합니다 (simulator.py).
+
+Usage:
+    python stub_servers.py --port 8765 --latency 0.2
+    python stub_servers.py --route chat=lognormal:0.8:0.4 --route tts=fixed:0.3@0.05 --capacity vlm=1
+"""
+
+import argparse
+import email.parser
+import email.policy
+import io
+import json
+import math
+import os
+import random
+import struct
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_TRANSCRIPT = "Virus, what do you see?"
+DEFAULT_TTS_CLIP = os.path.join(os.path.dirname(os.path.abspath(__file__)), "response.mp3")
+DEFAULT_COMMAND = '[[{"cmd": "rotate_x", "val": 90}], [{"cmd": "move", "val": 100}]]'
+DEFAULT_REPLIES = [
+    "Scanning the area. No hostiles detected.",
+    "Copy that. Moving forward. The hallway is clear.",
+    "Target acquired. Awaiting your order to engage.",
+]
+DEFAULT_SCENE = "A hallway with a closed door on the right. One person is standing near the wall."
+ROUTES = ("stt", "chat", "tts", "vlm")  # 지연/오류 분포와 용량을 지정할 수 있는 route
+
+
+class LatencyModel:
+    """route 하나의 응답 지연 분포(초)와 오류 비율
+
+    "lognormal:0.8:0.4@0.02" → 중앙값 0.8초, log 표준편차 0.4, 요청의 2% 는 error_status 로 실패
+    "uniform:0.2:0.6" → 0.2~0.6초, "fixed:0.3" → 항상 0.3초
+    """
+
+    def __init__(self, dist="fixed", a=0.0, b=0.0, error_rate=0.0, error_status=503):
+        if dist not in ("fixed", "uniform", "lognormal"):
+            raise ValueError(f"Unknown latency distribution: {dist}")
+        self.dist = dist
+        self.a = a
+        self.b = b
+        self.error_rate = error_rate
+        self.error_status = error_status
+
+    @classmethod
+    def parse(cls, spec):
+        spec, _, error_rate = spec.partition("@")
+        dist, *params = spec.split(":")
+        params = [float(p) for p in params] + [0.0, 0.0]
+        return cls(dist, params[0], params[1], float(error_rate or 0.0))
+
+    def sample(self):
+        if self.dist == "uniform":
+            return random.uniform(self.a, self.b)
+        if self.dist == "lognormal":
+            return self.a * math.exp(random.gauss(0.0, self.b))
+        return self.a
+
+    def fails(self):
+        return self.error_rate > 0 and random.random() < self.error_rate
+
+    def __repr__(self):
+        error = f"@{self.error_rate}" if self.error_rate else ""
+        return f"{self.dist}:{self.a}:{self.b}{error}"
+
+
+def synth_pcm(seconds, sample_rate):
+    """pcm_* 출력 포맷용 테스트 톤 (16bit mono)"""
+    n = int(seconds * sample_rate)
+    return b"".join(struct.pack("<h", int(8000 * math.sin(2 * math.pi * 220 * i / sample_rate))) for i in range(n))
+
+
+class StandInState:
+    """서버 설정과 세션 상태 (모든 요청 핸들러 스레드가 공유)"""
+
+    def __init__(self, latency=0.0, jitter=0.0, transcript=DEFAULT_TRANSCRIPT, sample_rate=8000,
+                 stt_seconds_per_audio_second=0.1, tts_first_chunk_delay=0.3, tts_chunk_delay=0.05,
+                 tts_chunk_size=4096, tts_clip=DEFAULT_TTS_CLIP, tts_seconds_per_char=0.0,
+                 tts_failing_models=(), tts_audio_seconds_per_char=None, routes=None, capacity=None,
+                 command=DEFAULT_COMMAND,
+                 replies=DEFAULT_REPLIES, scene=DEFAULT_SCENE):
+        self.latency = latency
+        self.jitter = jitter
+        # STT 처리 시간 모델: 오디오 1초당 처리 시간(초). streaming 은 청크가 올라올 때마다 나눠서 처리
+        self.stt_seconds_per_audio_second = stt_seconds_per_audio_second
+        self.transcript = transcript
+        self.sample_rate = sample_rate
+        # TTS 합성 모델: 첫 청크까지 tts_first_chunk_delay, 이후 청크마다 tts_chunk_delay
+        self.tts_first_chunk_delay = tts_first_chunk_delay
+        self.tts_chunk_delay = tts_chunk_delay
+        self.tts_chunk_size = tts_chunk_size
+        # 텍스트 길이에 비례하는 추가 합성 시간 (전체 응답 엔드포인트, 문장 분할 벤치마크용)
+        self.tts_seconds_per_char = tts_seconds_per_char
+        # 설정하면 pcm 응답 길이를 텍스트 길이에 맞춤 (None: 항상 클립 전체 - 문장마다 같은 길이)
+        self.tts_audio_seconds_per_char = tts_audio_seconds_per_char
+        # 이 model_id 요청은 tts_first_chunk_delay 뒤에 503 (장애 흉내, 실행 중에 바꿔도 됨)
+        self.tts_failing_models = set(tts_failing_models)
+        self.tts_clip = tts_clip
+        # route 별 추가 지연/오류 분포 ("stt", "chat", "tts", "vlm" → LatencyModel)
+        self.routes = dict(routes or {})
+        self.capacity = dict(capacity or {})
+        self._slots = {route: threading.BoundedSemaphore(n) for route, n in self.capacity.items()}
+        self._route_stats = {}  # route → {"requests", "errors", "in_flight", "max_in_flight", "max_queue_ms"}
+        self.command = command
+        self.replies = list(replies)
+        self.scene = scene
+        self.chat_requests = 0
+        self.tts_requests = 0
+        self._pcm_clips = {}  # sample rate → tts_clip 을 디코딩한 PCM16
+        self.sessions = {}
+        self.references = []  # (오디오 길이(초), transcript) - 코덱 sweep 용
+        self.requests = 0
+        self.lock = threading.Lock()
+
+    def delay(self, extra=0.0):
+        seconds = self.latency + random.uniform(0, self.jitter) if self.jitter else self.latency
+        seconds += extra
+        if seconds > 0:
+            time.sleep(seconds)
+
+    def route_begin(self, route):
+        """route 요청 시작 - 분포에서 뽑은 지연 만큼 기다리고, 실패시킬 요청이면 HTTP status 반환"""
+        model = self.routes.get(route)
+        with self.lock:
+            stats = self._route_stats.setdefault(route, {"requests": 0, "errors": 0, "in_flight": 0,
+                                                         "max_in_flight": 0, "max_queue_ms": 0.0})
+            stats["requests"] += 1
+            stats["in_flight"] += 1
+            stats["max_in_flight"] = max(stats["max_in_flight"], stats["in_flight"])
+        if route in self._slots:
+            # 용량을 넘는 요청은 앞 요청이 끝날 때까지 서버 쪽에서 대기
+            start = time.perf_counter()
+            self._slots[route].acquire()
+            with self.lock:
+                stats["max_queue_ms"] = max(stats["max_queue_ms"], (time.perf_counter() - start) * 1000)
+        if model is None:
+            return None
+        seconds = model.sample()
+        if seconds > 0:
+            time.sleep(seconds)
+        if model.fails():
+            with self.lock:
+                stats["errors"] += 1
+            return model.error_status
+        return None
+
+    def route_end(self, route):
+        if route in self._slots:
+            self._slots[route].release()
+        with self.lock:
+            self._route_stats[route]["in_flight"] -= 1
+
+    def route_stats(self, reset=False):
+        """route 별 {"requests", "errors", "max_in_flight", "max_queue_ms"} (reset=True 면 카운터 초기화)"""
+        with self.lock:
+            stats = {route: {k: v for k, v in s.items() if k != "in_flight"}
+                     for route, s in self._route_stats.items()}
+            if reset:
+                for s in self._route_stats.values():
+                    s.update(requests=0, errors=0, max_in_flight=s["in_flight"], max_queue_ms=0.0)
+        return stats
+
+    def chat_reply(self, messages):
+        """LLM_function (system prompt 에 명령 형식 "cmd") 이면 명령 JSON, 아니면 대화 응답"""
+        with self.lock:
+            self.chat_requests += 1
+            count = self.chat_requests
+        if any('"cmd"' in str(m.get("content", "")) for m in messages if m.get("role") == "system"):
+            return self.command
+        # 매번 다른 문장이 되도록 번호를 붙임 (TTS 캐시에 걸리지 않게)
+        return f"{self.replies[count % len(self.replies)]} Report number {count}."
+
+    def stt_cost(self, n_bytes, bytes_per_sample=2):
+        """업로드된 오디오 길이에 비례하는 처리 시간(초)"""
+        return n_bytes / bytes_per_sample / self.sample_rate * self.stt_seconds_per_audio_second
+
+    def tts_audio(self, output_format, text):
+        """요청된 output_format 에 맞는 오디오 바이트 (mp3: 고정 클립, pcm_<rate>: 같은 클립을 디코딩한 PCM16)"""
+        if output_format and output_format.startswith("pcm_"):
+            rate = int(output_format.split("_")[1])
+            pcm = self._clip_pcm(rate) or synth_pcm(max(len(text) * 0.06, 0.5), rate)
+            if self.tts_audio_seconds_per_char:
+                # 클립을 반복/잘라서 텍스트 길이에 맞는 재생 시간으로
+                n_bytes = max(int(len(text) * self.tts_audio_seconds_per_char * rate), 1) * 2
+                pcm = (pcm * (n_bytes // len(pcm) + 1))[:n_bytes]
+            return pcm
+        with open(self.tts_clip, "rb") as f:
+            return f.read()
+
+    def _clip_pcm(self, rate):
+        # MP3/PCM 비교가 같은 오디오로 이뤄지도록 클립을 디코딩해서 사용 (libsndfile >= 1.1 필요)
+        if rate not in self._pcm_clips:
+            try:
+                import soundfile as sf
+                from audio_codec import resample
+                from streaming_stt import to_pcm16
+
+                audio, clip_rate = sf.read(self.tts_clip, dtype="float32")
+                self._pcm_clips[rate] = to_pcm16(resample(audio, clip_rate, rate))
+            except Exception:
+                self._pcm_clips[rate] = None
+        return self._pcm_clips[rate]
+
+    def add_reference(self, duration, transcript):
+        """이 길이(초)의 오디오가 올라오면 transcript 를 돌려줌"""
+        self.references.append((duration, transcript))
+
+    def transcribe(self, audio_bytes):
+        """업로드를 디코딩해서 (transcript, 오디오 길이) 반환. 디코딩 실패 시 빈 문자열"""
+        try:
+            import soundfile as sf
+
+            info = sf.info(io.BytesIO(audio_bytes))
+            duration = info.frames / info.samplerate
+        except Exception:
+            return "", 0.0
+        if self.references:
+            closest = min(self.references, key=lambda ref: abs(ref[0] - duration))
+            return (closest[1] if abs(closest[0] - duration) < 0.1 else ""), duration
+        return self.transcript, duration
+
+
+class StandInHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive 지원
+    # 헤더와 본문을 따로 쓰므로 Nagle 을 끄지 않으면 keep-alive 연결에서 delayed ACK 만큼(~40ms) 지연됨
+    disable_nagle_algorithm = True
+
+    def log_message(self, format, *args):
+        pass  # 요청마다 콘솔 출력하지 않음
+
+    @property
+    def state(self):
+        return self.server.state
+
+    def _body(self):
+        length = int(self.headers.get("Content-Length", 0))
+        return self.rfile.read(length) if length else b""
+
+    def _upload(self, body):
+        """multipart/form-data 면 file 파트만 꺼냄 (OpenAI SDK 업로드 형식)"""
+        content_type = self.headers.get("Content-Type", "")
+        if not content_type.startswith("multipart/"):
+            return body
+        message = email.parser.BytesParser(policy=email.policy.HTTP).parsebytes(
+            f"Content-Type: {content_type}\r\n\r\n".encode("latin-1") + body
+        )
+        for part in message.iter_parts():
+            if part.get_param("name", header="content-disposition") == "file":
+                return part.get_payload(decode=True)
+        return b""
+
+    def _send(self, status, payload, content_type="application/json"):
+        data = payload if isinstance(payload, bytes) else (
+            json.dumps(payload).encode("utf-8") if content_type == "application/json" else payload.encode("utf-8")
+        )
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def do_GET(self):
+        # 연결 warm-up / keep-alive probe 용
+        if self.path.split("?")[0].rstrip("/") in ("", "/v1/models", "/health"):
+            self.state.delay()
+            return self._send(200, {"ok": True})
+        self._send(404, {"error": f"no route for {self.path}"})
+
+    def do_HEAD(self):
+        self.send_response(200)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def do_POST(self):
+        with self.state.lock:
+            self.state.requests += 1
+        body = self._body()
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        route = self._route(parts)
+        if route is None:
+            return self._post(parts, body)
+        try:
+            status = self.state.route_begin(route)
+            if status:
+                return self._send(status, {"error": {"message": f"stand-in {route} error", "code": status}})
+            return self._post(parts, body)
+        finally:
+            self.state.route_end(route)
+
+    @staticmethod
+    def _route(parts):
+        """지연/오류 분포를 적용할 route 이름 (streaming STT 세션 시작/청크는 제외)"""
+        if parts == ["v1", "audio", "transcriptions"] or parts[-1:] == ["finish"]:
+            return "stt"
+        if parts == ["v1", "chat", "completions"]:
+            return "chat"
+        if parts[:2] == ["v1", "text-to-speech"]:
+            return "tts"
+        if parts and parts[0].startswith("VLM"):
+            return "vlm"
+        return None
+
+    def _post(self, parts, body):
+        if parts == ["v1", "chat", "completions"]:
+            return self._chat_completion(body)
+
+        if parts and parts[0].startswith("VLM"):
+            self.state.delay()
+            return self._send(200, {"response": self.state.scene})
+
+        if parts == ["v1", "audio", "transcriptions"]:
+            text, duration = self.state.transcribe(self._upload(body))
+            self.state.delay(duration * self.state.stt_seconds_per_audio_second)
+            return self._send(200, text, "text/plain")
+
+        if parts == ["stt", "sessions"]:
+            session = uuid.uuid4().hex
+            with self.state.lock:
+                self.state.sessions[session] = 0
+            return self._send(200, {"session": session})
+
+        if len(parts) == 4 and parts[:2] == ["stt", "sessions"]:
+            session, action = parts[2], parts[3]
+            with self.state.lock:
+                if session not in self.state.sessions:
+                    return self._send(404, {"error": "unknown session"})
+                if action == "chunk":
+                    self.state.sessions[session] += len(body) // 2  # PCM16 mono
+                    received = self.state.sessions[session] / self.state.sample_rate
+                if action == "finish":
+                    self.state.sessions.pop(session)
+            if action == "chunk":
+                time.sleep(self.state.stt_cost(len(body)))
+                return self._send(200, {"received": received})
+            if action == "finish":
+                # 오디오는 이미 올라와 있으므로 짧은 지연만 흉내냄
+                self.state.delay()
+                return self._send(200, {"text": self.state.transcript})
+
+        if len(parts) >= 3 and parts[:2] == ["v1", "text-to-speech"]:
+            return self._text_to_speech(body, stream=parts[-1] == "stream")
+
+        self._send(404, {"error": f"no route for {self.path}"})
+
+    def _chat_completion(self, body):
+        request = json.loads(body or b"{}")
+        self.state.delay()
+        content = self.state.chat_reply(request.get("messages", []))
+        self._send(200, {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": request.get("model", "stand-in"),
+            "choices": [{"index": 0, "message": {"role": "assistant", "content": content},
+                         "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+        })
+
+    def _text_to_speech(self, body, stream):
+        from urllib.parse import parse_qs, urlparse
+
+        query = parse_qs(urlparse(self.path).query)
+        output_format = query.get("output_format", ["mp3_44100_128"])[0]
+        request = json.loads(body or b"{}")
+        with self.state.lock:
+            self.state.tts_requests += 1
+        text = request.get("text", "")
+        if request.get("model_id") in self.state.tts_failing_models:
+            time.sleep(self.state.tts_first_chunk_delay)
+            return self._send(503, {"detail": f"{request.get('model_id')} unavailable"})
+        audio = self.state.tts_audio(output_format, text)
+        size = self.state.tts_chunk_size
+        chunks = [audio[i:i + size] for i in range(0, len(audio), size)]
+        content_type = "audio/mpeg" if output_format.startswith("mp3") else "application/octet-stream"
+
+        if not stream:
+            # 전체 합성이 끝날 때까지 기다린 뒤 한 번에 응답
+            time.sleep(self.state.tts_first_chunk_delay + self.state.tts_chunk_delay * (len(chunks) - 1)
+                       + self.state.tts_seconds_per_char * len(text))
+            return self._send(200, audio, content_type)
+
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        time.sleep(self.state.tts_first_chunk_delay)
+        for i, chunk in enumerate(chunks):
+            if i:
+                time.sleep(self.state.tts_chunk_delay)
+            self.wfile.write(f"{len(chunk):X}\r\n".encode("ascii") + chunk + b"\r\n")
+            self.wfile.flush()
+        self.wfile.write(b"0\r\n\r\n")
+
+
+class StandInServer:
+    """백그라운드 스레드에서 실행되는 stand-in 서버"""
+
+    def __init__(self, host="127.0.0.1", port=0, **state_kwargs):
+        self.httpd = ThreadingHTTPServer((host, port), StandInHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.state = StandInState(**state_kwargs)
+        self.thread = None
+
+    @property
+    def state(self):
+        return self.httpd.state
+
+    @property
+    def url(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def parse_routes(specs):
+    """["chat=lognormal:0.8:0.4@0.02", ...] → {"chat": LatencyModel}"""
+    routes = {}
+    for spec in specs:
+        route, _, model = spec.partition("=")
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route {route!r} ({', '.join(ROUTES)})")
+        routes[route] = LatencyModel.parse(model)
+    return routes
+
+
+def parse_capacity(specs):
+    """["vlm=1", ...] → {"vlm": 1}"""
+    capacity = {}
+    for spec in specs:
+        route, _, n = spec.partition("=")
+        if route not in ROUTES:
+            raise ValueError(f"Unknown route {route!r} ({', '.join(ROUTES)})")
+        capacity[route] = int(n)
+    return capacity
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local stand-in for STT/LLM/TTS/VLM endpoints")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0, help="응답 지연(초)")
+    parser.add_argument("--jitter", type=float, default=0.0, help="추가 랜덤 지연 최대값(초)")
+    parser.add_argument("--transcript", default=DEFAULT_TRANSCRIPT, help="STT 가 돌려줄 텍스트")
+    parser.add_argument("--route", action="append", default=[], metavar="ROUTE=SPEC",
+                        help="route 별 지연/오류 분포 (예: chat=lognormal:0.8:0.4@0.02, 여러 번 가능)")
+    parser.add_argument("--capacity", action="append", default=[], metavar="ROUTE=N",
+                        help="route 별 동시 처리 요청 수 (예: vlm=1, 여러 번 가능)")
+    args = parser.parse_args()
+
+    server = StandInServer(args.host, args.port, latency=args.latency, jitter=args.jitter,
+                           transcript=args.transcript, routes=parse_routes(args.route),
+                           capacity=parse_capacity(args.capacity))
+    print(f"🧪 Stand-in server listening on {server.url}")
+    for route, model in server.state.routes.items():
+        print(f"   {route:<5} {model}")
+    try:
+        server.httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n👋 Stand-in server stopped.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,105 +1,554 @@
 import os
-from dotenv import load_dotenv
-from elevenlabs.client import ElevenLabs
-from elevenlabs import play, save
+import shutil
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from api_clients import get_elevenlabs_client
+from playback import get_playback_engine, ChunkStream
+from tts_cache import get_tts_cache, cache_key, read_cached
+from rate_limit import limited, get_limiter
+from tracing import span, event
+from robot_log import get_logger, setup_logging
 
-def text_to_speech(text, voice_id="ErXwobaYiN019PkySvjV", output_filename="response.mp3", auto_play=False):
+log = get_logger(__name__)
+
+PRIMARY_MODEL = "eleven_flash_v2_5"
+FALLBACK_MODEL = "eleven_multilingual_v2"
+OUTPUT_FORMAT = "mp3_22050_32"  # 최소 용량 포맷
+PCM_FORMAT = "pcm_16000"  # pcm 모드 - raw PCM16 mono, 라즈베리파이에서 MP3 디코딩 생략
+PCM_SAMPLE_RATE = 16000
+PCM_CHUNK_BYTES = 3200  # 100ms 단위로 읽음 (SDK 기본 1024 바이트는 청크당 파이썬 오버헤드가 큼)
+VOICE_SETTINGS = {
+    "stability": 1,
+    "similarity_boost": 1,
+    "style": 0,
+    "use_speaker_boost": True,
+    "speed": 0.7
+}
+
+
+class ModelBreaker:
+    """한 모델의 최근 실패/지연 기록 (circuit breaker)
+
+    closed - 정상, 요청을 그대로 보냄
+    open   - 최근 failure_threshold 번 연속 실패, cooldown 동안 이 모델을 건너뜀
+    probing - cooldown 이 지나 백그라운드에서 짧은 문장으로 다시 시도하는 중 (요청은 여전히 건너뜀)
+    """
+
+    def __init__(self, model_id, failure_threshold=2, cooldown=30.0, history=20):
+        self.model_id = model_id
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = "closed"
+        self.consecutive_failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self.successes = 0
+        self.failures = 0
+        self.latencies = deque(maxlen=history)  # 최근 성공 요청 지연(초)
+
+    def record_success(self, latency):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self.latencies.append(latency)
+        if self.state != "closed":
+            log.info(f"🟢 TTS breaker closed: {self.model_id}")
+        self.state = "closed"
+
+    def record_failure(self, error):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self.last_error = str(error)
+        if self.state == "probing" or self.consecutive_failures >= self.failure_threshold:
+            if self.state == "closed":
+                log.warning(f"🔴 TTS breaker open: {self.model_id} ({self.consecutive_failures} failures) - "
+                      f"{self.cooldown:.0f}s 동안 대체 모델 사용")
+            self.state = "open"
+            self.opened_at = time.monotonic()
+
+    def available(self):
+        return self.state == "closed"
+
+    def probe_due(self):
+        return self.state == "open" and time.monotonic() - self.opened_at >= self.cooldown
+
+    def status(self):
+        latencies = sorted(self.latencies)
+        return {
+            "state": self.state,
+            "successes": self.successes,
+            "failures": self.failures,
+            "p50_ms": latencies[len(latencies) // 2] * 1000 if latencies else None,
+            "last_error": self.last_error,
+        }
+
+
+class ModelHealth:
+    """모델별 breaker - 기본 모델이 열려 있으면 실패를 기다리지 않고 바로 대체 모델로 보냄"""
+
+    PROBE_TEXT = "Ready."
+
+    def __init__(self, models, failure_threshold=2, cooldown=30.0):
+        self.models = list(models)
+        self.breakers = {m: ModelBreaker(m, failure_threshold, cooldown) for m in self.models}
+        self.lock = threading.Lock()
+
+    def order(self):
+        """이번 요청에서 시도할 모델 순서 (열린 모델은 맨 뒤 - 전부 열려 있어도 시도는 함)"""
+        with self.lock:
+            for model_id, breaker in self.breakers.items():
+                if breaker.probe_due():
+                    breaker.state = "probing"
+                    threading.Thread(target=self._probe, args=(model_id,), daemon=True).start()
+            healthy = [m for m in self.models if self.breakers[m].available()]
+        return healthy + [m for m in self.models if m not in healthy]
+
+    @contextmanager
+    def track(self, model_id):
+        """네트워크 호출 구간의 성공/실패와 지연을 기록"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            with self.lock:
+                self.breakers[model_id].record_failure(e)
+            raise
+        with self.lock:
+            self.breakers[model_id].record_success(time.perf_counter() - start)
+
+    def _probe(self, model_id):
+        try:
+            with limited("elevenlabs", "probe"), self.track(model_id):
+                audio = _create_client().text_to_speech.convert(
+                    text=self.PROBE_TEXT,
+                    voice_id="ErXwobaYiN019PkySvjV",
+                    model_id=model_id,
+                    output_format=OUTPUT_FORMAT
+                )
+                b"".join(audio)
+        except Exception as e:
+            log.warning(f"🔴 TTS probe failed: {model_id} ({e})")
+
+    def status(self):
+        with self.lock:
+            return {m: b.status() for m, b in self.breakers.items()}
+
+    def print_status(self):
+        for model_id, s in self.status().items():
+            p50 = f"{s['p50_ms']:.0f}ms" if s["p50_ms"] is not None else "-"
+            log.info(f"🩺 {model_id:<24} {s['state']:<8} ok {s['successes']:<3} fail {s['failures']:<3} p50 {p50}")
+
+
+# 프로세스 전체에서 공유 (text_to_speech / synthesize_clip / tts_pipeline 워커)
+tts_health = ModelHealth((PRIMARY_MODEL, FALLBACK_MODEL))
+
+
+def _create_client():
+    # 공유 클라이언트 - ELEVENLABS_BASE_URL 이 있으면 그 서버용 (stub_servers.py 로컬 stand-in 테스트)
+    return get_elevenlabs_client()
+
+
+def _copy_atomic(source, destination):
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(destination), suffix=".part")
+    os.close(fd)
+    shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, destination)
+
+
+def _play_cached(cached_path, output_path, auto_play, stream, save_file, on_playback_start):
+    """캐시 hit - 네트워크 없이 캐시 파일을 출력 경로로 복사하고 (필요하면) 재생
+
+    재생은 방금 쓴 output_path 또는 메모리로 읽은 바이트로 (그 사이 LRU 가 캐시 파일을 지워도 재생됨).
+    캐시 파일이 이미 없으면 OSError - 호출한 쪽에서 miss 로 처리
+    """
+    save = not stream or save_file
+    if save:
+        _copy_atomic(cached_path, output_path)
+        source = {"path": output_path}
+    else:
+        data = read_cached(cached_path) if stream or auto_play else b""
+        if data is None:
+            raise FileNotFoundError(cached_path)
+        source = {"data": data}
+    log.info("🗄️ TTS cache hit - API 호출 생략")
+    if stream or auto_play:
+        get_playback_engine().play(on_start=on_playback_start, **source).result()
+    return output_path if save else None
+
+
+def synthesize_to_cache(text, voice_id="ErXwobaYiN019PkySvjV", output_format=OUTPUT_FORMAT):
+    """재생/저장 없이 캐시만 채웁니다 (tts_cache.prewarm 용). 새로 합성했으면 True
+
+    런타임 조회와 같은 키가 되도록 tts_health.order() 의 모델 순서와 output_format 을 사용합니다
+    (pcm 모드로 재생할 문장은 PCM_FORMAT 으로 미리 합성해야 hit).
+    """
+    cache = get_tts_cache()
+    for model_id in tts_health.order():
+        key = cache_key(text, voice_id, model_id, output_format, VOICE_SETTINGS)
+        if key in cache:
+            return False
+        try:
+            with limited("elevenlabs", "prewarm"), tts_health.track(model_id):
+                audio = b"".join(_create_client().text_to_speech.convert(
+                    text=text,
+                    voice_id=voice_id,
+                    model_id=model_id,
+                    output_format=output_format,
+                    voice_settings=VOICE_SETTINGS
+                ))
+            cache.put(key, audio, output_format, text)
+            return True
+        except Exception as e:
+            log.error(f"❌ Pre-warm 실패 ({model_id}) '{text[:30]}': {e}")
+    return False
+
+
+def synthesize_clip(text, voice_id="ErXwobaYiN019PkySvjV", elevenlabs=None, use_cache=True,
+                    output_format=OUTPUT_FORMAT):
+    """한 문장을 합성해서 오디오 바이트를 반환합니다 (tts_pipeline 용, 재생/출력 파일 없음).
+
+    캐시를 먼저 확인하고, 기본 모델이 실패하면 대체 모델로 재시도합니다.
+    output_format 이 PCM_FORMAT 이면 raw PCM16 바이트를 돌려줍니다.
+    """
+    cache = get_tts_cache() if use_cache else None
+    last_error = None
+    for model_id in tts_health.order():
+        key = cache_key(text, voice_id, model_id, output_format, VOICE_SETTINGS)
+        cached = cache.get(key) if cache else None
+        audio = read_cached(cached) if cached else None
+        if audio:
+            event("tts.cache_hit", chars=len(text))
+            return audio
+        try:
+            elevenlabs = elevenlabs or _create_client()
+            # 동시 요청 한도 대기 시간은 모델 지연에 넣지 않음
+            with limited("elevenlabs", "tts-chunk"), span("tts.synthesize", model=model_id, chars=len(text)), \
+                    tts_health.track(model_id):
+                audio = b"".join(elevenlabs.text_to_speech.convert(
+                    text=text,
+                    voice_id=voice_id,
+                    model_id=model_id,
+                    output_format=output_format,
+                    voice_settings=VOICE_SETTINGS
+                ))
+            if cache:
+                cache.put(key, audio, output_format, text)
+            return audio
+        except Exception as e:
+            log.error(f"❌ 문장 합성 실패 ({model_id}): {e}")
+            last_error = e
+    raise last_error
+
+
+def _synthesize(elevenlabs, text, voice_id, model_id, output_path, auto_play, on_playback_start=None):
+    """전체 합성 → 파일 저장 → (선택) 재생"""
+    from elevenlabs import save  # SDK 는 첫 합성 때 import (controller 시작 시간 단축)
+
+    with limited("elevenlabs", "tts"), span("tts.synthesize", model=model_id, chars=len(text)), \
+            tts_health.track(model_id):
+        audio = elevenlabs.text_to_speech.convert(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=OUTPUT_FORMAT,
+            voice_settings=VOICE_SETTINGS
+        )
+        save(audio, output_path)
+    # auto_play가 True일 때만 재생 (공유 재생 엔진 사용, 완료까지 대기)
+    if auto_play:
+        get_playback_engine().play(output_path, on_start=on_playback_start).result()
+    return output_path
+
+
+@contextmanager
+def _stream_slot(label):
+    """ElevenLabs 동시 요청 슬롯을 스트림이 끝날 때까지 잡고 있음 (with 블록은 첫 청크에서 끝나므로)
+
+    yield 한 함수에 ChunkStream 을 넘기면 stream.saved 완료 시 슬롯 반환, 넘기기 전에 실패하면 바로 반환.
+    """
+    limiter = get_limiter("elevenlabs")
+    limiter.acquire(label)
+    streams = []
+
+    def attach(stream):
+        streams.append(stream)
+        stream.saved.add_done_callback(lambda _: limiter.release())
+        return stream
+
+    try:
+        yield attach
+    finally:
+        if not streams:
+            limiter.release()
+
+
+def _synthesize_streaming(elevenlabs, text, voice_id, model_id, output_path, save_file, on_playback_start):
+    """청크가 도착하는 대로 재생 시작, 재생이 끝날 때까지 대기"""
+    # 첫 청크까지의 지연을 모델 지연으로 기록
+    with _stream_slot("tts-stream") as slot, span("tts.first_chunk", model=model_id, chars=len(text)), \
+            tts_health.track(model_id):
+        chunks = elevenlabs.text_to_speech.stream(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=OUTPUT_FORMAT,
+            voice_settings=VOICE_SETTINGS
+        )
+        stream = slot(ChunkStream(chunks, save_path=output_path if save_file else None))
+        stream.first_chunk.wait()
+        if stream.error:
+            # 첫 청크 전에 실패하면 대체 모델로 재시도할 수 있도록 예외 전달
+            raise stream.error
+    log.info(f"⚡ 첫 오디오 청크 수신: {stream.first_chunk_time * 1000:.0f}ms")
+    get_playback_engine().play_stream(stream, on_start=on_playback_start).result()
+    if save_file:
+        stream.saved.result()
+        return output_path
+    return None
+
+
+def _synthesize_pcm(elevenlabs, text, voice_id, model_id, on_playback_start):
+    """raw PCM 을 스트림으로 받아 sounddevice 로 바로 재생 (파일 저장/MP3 디코딩 없음). 재생한 PCM 반환"""
+    with _stream_slot("tts-pcm") as slot, span("tts.first_chunk", model=model_id, chars=len(text), pcm=True), \
+            tts_health.track(model_id):
+        chunks = elevenlabs.text_to_speech.stream(
+            text=text,
+            voice_id=voice_id,
+            model_id=model_id,
+            output_format=PCM_FORMAT,
+            voice_settings=VOICE_SETTINGS,
+            request_options={"chunk_size": PCM_CHUNK_BYTES}
+        )
+        stream = slot(ChunkStream(chunks))
+        stream.first_chunk.wait()
+        if stream.error:
+            raise stream.error
+    log.info(f"⚡ 첫 PCM 청크 수신: {stream.first_chunk_time * 1000:.0f}ms")
+    return get_playback_engine().play_pcm(stream, PCM_SAMPLE_RATE, on_start=on_playback_start).result()
+
+
+def text_to_speech(text, voice_id="ErXwobaYiN019PkySvjV", output_filename="response.mp3", auto_play=False,
+                   stream=False, save_file=True, on_playback_start=None, use_cache=True, pcm=False):
     """
     텍스트를 ElevenLabs API를 사용하여 음성으로 변환하고 파일로 저장
-    
+
     Args:
         text (str): 음성으로 변환할 텍스트
         voice_id (str): 사용할 음성 ID (기본값: "ErXwobaYiN019PkySvjV" - antoni)
         output_filename (str): 저장할 오디오 파일 이름
         auto_play (bool): 생성 후 자동 재생 여부 (기본값: False)
-    
+        stream (bool): True 면 오디오 스트림을 받는 대로 첫 청크부터 재생 (재생 완료까지 대기)
+        save_file (bool): stream 모드에서 파일로도 저장할지 여부 (기본값: True)
+        on_playback_start (callable): stream 모드에서 실제 재생이 시작될 때 호출
+        use_cache (bool): tts_cache 에 같은 문장/설정이 있으면 API 호출 없이 사용 (기본값: True)
+        pcm (bool): True 면 raw PCM 을 받아 sounddevice 로 바로 재생 (파일 저장/디코딩 없음, 재생 완료까지 대기)
+
     Returns:
-        str: 생성된 오디오 파일 경로 또는 None (오류 발생 시)
+        str: 생성된 오디오 파일 경로 또는 None (오류 발생 시 / 저장하지 않은 경우)
+            pcm 모드에서는 재생한 PCM 바이트 (오류 발생 시 None)
     """
-    # .env 파일에서 환경 변수 로드
-    load_dotenv()
-    
-    # ElevenLabs 클라이언트 초기화
-    elevenlabs = ElevenLabs(
-        api_key=os.getenv("ELEVENLABS_API_KEY")
-    )
-    
-    try:
-        print(f"🔊 텍스트를 음성으로 변환 중: '{text[:50]}...'")
-        print(f"🎤 음성: antoni (저지연, 저용량 최적화)")
-        
-        # 텍스트를 음성으로 변환 (최소 용량 설정 + 속도 조절)
-        audio = elevenlabs.text_to_speech.convert(
-            text=text,
-            voice_id=voice_id,
-            model_id="eleven_flash_v2_5",
-            output_format="mp3_22050_32",  # 최소 용량 포맷
-            voice_settings={
-                "stability": 1,
-                "similarity_boost": 1,
-                "style": 0,
-                "use_speaker_boost": True,
-                "speed": 0.7
-            }
-        )
-        
-        # 파일 경로 설정 (절대 경로)
-        current_dir = os.path.dirname(os.path.abspath(__file__))
-        output_path = os.path.join(current_dir, output_filename)
-        
-        # 오디오 파일로 저장
-        save(audio, output_path)
-        
-        print(f"✅ 음성 파일이 생성되었습니다: {output_path}")
-        
-        # auto_play가 True일 때만 재생
-        if auto_play:
-            play(audio)
-        
-        return output_path
-        
-    except Exception as e:
-        print(f"❌ 음성 생성 중 오류 발생: {str(e)}")
-        # 오류 발생 시 multilingual_v2 모델로 재시도
-        print("🔄 multilingual_v2 모델로 재시도...")
+    # 공유 ElevenLabs 클라이언트 (.env 로드와 연결 풀은 api_clients 에서 한 번만)
+    elevenlabs = _create_client()
+    cache = get_tts_cache() if use_cache else None
+
+    # 파일 경로 설정 (절대 경로)
+    current_dir = os.path.dirname(os.path.abspath(__file__))
+    output_path = os.path.join(current_dir, output_filename)
+
+    # 재생이 시작된 뒤의 오류 (스트림 끊김, 출력 장치) 는 모델 실패가 아님 - 대체 모델로 처음부터 다시 말하지 않음
+    playback_started = threading.Event()
+
+    def started():
+        playback_started.set()
+        if on_playback_start:
+            on_playback_start()
+
+    def synthesize_pcm(model_id):
+        key = cache_key(text, voice_id, model_id, PCM_FORMAT, VOICE_SETTINGS)
+        cached = cache.get(key) if cache else None
+        data = read_cached(cached) if cached else None
+        if data:
+            log.info("🗄️ TTS cache hit - API 호출 생략")
+            return get_playback_engine().play_pcm([data], PCM_SAMPLE_RATE, on_start=started).result()
+        played = _synthesize_pcm(elevenlabs, text, voice_id, model_id, started)
+        if cache and played:
+            # 재생이 끝난 뒤에 캐시에 기록 (재생 경로에는 파일 쓰기 없음)
+            cache.put(key, played, PCM_FORMAT, text)
+        return played
+
+    def synthesize(model_id):
+        if pcm:
+            return synthesize_pcm(model_id)
+        key = cache_key(text, voice_id, model_id, OUTPUT_FORMAT, VOICE_SETTINGS)
+        cached = cache.get(key) if cache else None
+        if cached:
+            try:
+                return _play_cached(cached, output_path, auto_play, stream, save_file, started)
+            except OSError:
+                pass  # 복사 전에 evict 됨 - miss 로 처리하고 합성
+        if stream:
+            result = _synthesize_streaming(elevenlabs, text, voice_id, model_id, output_path, save_file,
+                                           started)
+        else:
+            result = _synthesize(elevenlabs, text, voice_id, model_id, output_path, auto_play, started)
+        if cache and result:
+            cache.put_file(key, result, OUTPUT_FORMAT, text)
+        return result
+
+    log.info(f"🔊 텍스트를 음성으로 변환 중: '{text[:50]}...'")
+    mode = " - PCM 직접 재생" if pcm else (" - 스트리밍 재생" if stream else "")
+    log.info(f"🎤 음성: antoni (저지연, 저용량 최적화){mode}")
+
+    # breaker 가 열린 모델은 뒤로 - 장애 중에는 실패를 기다리지 않고 바로 대체 모델 사용
+    models = tts_health.order()
+    if models[0] != PRIMARY_MODEL:
+        log.info(f"⚡ {PRIMARY_MODEL} breaker open - {models[0]} 바로 사용")
+    for attempt, model_id in enumerate(models):
         try:
-            audio = elevenlabs.text_to_speech.convert(
-                text=text,
-                voice_id=voice_id,
-                model_id="eleven_multilingual_v2",
-                output_format="mp3_22050_32",  # 최소 용량 포맷 유지
-                voice_settings={
-                    "stability": 1,
-                    "similarity_boost": 1,
-                    "style": 0,
-                    "use_speaker_boost": True,
-                    "speed": 0.7
-                }
-            )
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            output_path = os.path.join(current_dir, output_filename)
-            save(audio, output_path)
-            print(f"✅ 대체 모델로 음성 파일 생성: {output_path}")
-            
-            if auto_play:
-                play(audio)
-                
-            return output_path
-        except Exception as e2:
-            print(f"❌ 대체 모델도 실패: {str(e2)}")
-        return None
+            result = synthesize(model_id)
+            if pcm and result:
+                log.info("✅ PCM 음성 재생 완료")
+            elif result:
+                log.info(f"✅ 음성 파일이 생성되었습니다: {result}" if model_id == PRIMARY_MODEL
+                      else f"✅ 대체 모델로 음성 파일 생성: {result}")
+            return result
+        except Exception as e:
+            if playback_started.is_set():
+                log.error(f"❌ 재생 중 오류 발생 ({model_id}): {str(e)} - 이미 재생을 시작해서 다시 합성하지 않음")
+                return None
+            log.error(f"❌ 음성 생성 중 오류 발생 ({model_id}): {str(e)}")
+            if attempt + 1 < len(models):
+                log.info(f"🔄 {models[attempt + 1]} 모델로 재시도...")
+    return None
+
+
+def compare_streaming(text="The first move is what sets everything in motion."):
+    """로컬 stand-in TTS 서버로 전체 합성 후 재생 vs 스트리밍 재생의 첫 오디오까지 시간 비교"""
+    from stub_servers import StandInServer
+
+    with StandInServer(tts_first_chunk_delay=0.3, tts_chunk_delay=0.1) as server:
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        results = {}
+        for label, streaming in (("convert + save + play", False), ("streaming", True)):
+            start = time.perf_counter()
+            first_audio = []
+            if streaming:
+                text_to_speech(text, output_filename="stream_test.mp3", stream=True, use_cache=False,
+                               on_playback_start=lambda: first_audio.append(time.perf_counter()))
+            else:
+                path = text_to_speech(text, output_filename="stream_test.mp3", use_cache=False)
+                get_playback_engine().play(path, on_start=lambda: first_audio.append(time.perf_counter())).result()
+            results[label] = (first_audio[0] - start) if first_audio else None
+        os.environ.pop("ELEVENLABS_BASE_URL")
+    test_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "stream_test.mp3")
+    if os.path.exists(test_file):
+        os.remove(test_file)
+
+    log.info("\n📊 Time to first audio")
+    for label, seconds in results.items():
+        log.info(f"  {label:<22}: " + (f"{seconds * 1000:.0f}ms" if seconds is not None else "playback unavailable"))
+
+
+def compare_pcm(text="The first move is what sets everything in motion.", runs=5):
+    """로컬 stand-in TTS 로 MP3 경로와 PCM 경로의 첫 샘플까지 시간과 CPU 시간 비교
+
+    MP3: 전체 수신 → 파일 저장 → pygame 디코딩이 끝나야 첫 샘플을 출력할 수 있음
+    PCM: 스트림의 첫 청크를 int16 배열로 보면 바로 출력 가능
+    CPU 는 이 스레드의 thread_time (HTTP 수신 + 파일 + 디코딩) 으로 잽니다.
+    """
+    import numpy as np
+    import pygame
+    from elevenlabs import save
+    from stub_servers import StandInServer
+
+    pygame.mixer.init(frequency=22050, channels=1)
+    mp3_path = os.path.join(tempfile.gettempdir(), "compare_pcm.mp3")
+    results = {"mp3": [], "pcm": []}
+    with StandInServer(tts_first_chunk_delay=0.3, tts_chunk_delay=0.02) as server:
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        elevenlabs = _create_client()
+        request = dict(text=text, voice_id="ErXwobaYiN019PkySvjV", model_id=PRIMARY_MODEL,
+                       voice_settings=VOICE_SETTINGS)
+        for _ in range(runs):
+            wall, cpu = time.perf_counter(), time.thread_time()
+            save(elevenlabs.text_to_speech.convert(output_format=OUTPUT_FORMAT, **request), mp3_path)
+            sound = pygame.mixer.Sound(mp3_path)
+            results["mp3"].append((time.perf_counter() - wall, time.thread_time() - cpu, sound.get_length(),
+                                   os.path.getsize(mp3_path)))
+
+            wall, cpu = time.perf_counter(), time.thread_time()
+            first_sample, n_samples, carry = None, 0, b""
+            for chunk in elevenlabs.text_to_speech.stream(output_format=PCM_FORMAT, **request,
+                                                          request_options={"chunk_size": PCM_CHUNK_BYTES}):
+                data = carry + chunk
+                usable = len(data) - len(data) % 2
+                carry = data[usable:]
+                samples = np.frombuffer(data[:usable], dtype="<i2")
+                n_samples += len(samples)
+                if first_sample is None:
+                    first_sample = time.perf_counter() - wall
+            results["pcm"].append((first_sample, time.thread_time() - cpu, n_samples / PCM_SAMPLE_RATE,
+                                   n_samples * 2))
+        os.environ.pop("ELEVENLABS_BASE_URL")
+    os.remove(mp3_path)
+
+    log.info(f"\n📊 MP3 ({OUTPUT_FORMAT}) vs PCM ({PCM_FORMAT}), {runs} runs (median)")
+    log.info(f"{'path':<5} {'first sample':>13} {'CPU':>9} {'audio':>7} {'KB':>7}")
+    for path, rows in results.items():
+        first, cpu, length, n_bytes = (np.median([r[i] for r in rows]) for i in range(4))
+        log.info(f"{path:<5} {first * 1000:11.0f}ms {cpu * 1000:7.1f}ms {length:6.1f}s {n_bytes / 1024:7.1f}")
+    return results
+
+
+def breaker_demo(requests=6, cooldown=2.0):
+    """로컬 stand-in 에서 기본 모델 장애를 흉내 내고 요청별 지연과 breaker 상태를 출력"""
+    from stub_servers import StandInServer
+
+    for breaker in tts_health.breakers.values():
+        breaker.cooldown = cooldown
+    with StandInServer(tts_first_chunk_delay=0.3, tts_failing_models=[PRIMARY_MODEL]) as server:
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        for i in range(requests):
+            if i == requests - 2:
+                # 장애 복구 - cooldown 뒤 백그라운드 probe 가 기본 모델을 다시 닫음
+                server.state.tts_failing_models.clear()
+                time.sleep(cooldown)
+                tts_health.order()
+                time.sleep(1.0)
+            start = time.perf_counter()
+            synthesize_clip(f"Request number {i}.", use_cache=False)
+            log.info(f"  request {i}: {(time.perf_counter() - start) * 1000:.0f}ms")
+        os.environ.pop("ELEVENLABS_BASE_URL")
+    tts_health.print_status()
+
 
 # 직접 실행할 경우 테스트
 if __name__ == "__main__":
+    setup_logging()
+    import sys
+    from elevenlabs import play
+
+    if "--compare-streaming" in sys.argv:
+        compare_streaming()
+        sys.exit(0)
+    if "--compare-pcm" in sys.argv:
+        compare_pcm()
+        sys.exit(0)
+    if "--breaker-demo" in sys.argv:
+        breaker_demo()
+        sys.exit(0)
+
     test_text = "The first move is what sets everything in motion."
     output_path = text_to_speech(test_text)
-    
+
     # 오디오 파일이 생성되었으면 재생
     if output_path and os.path.exists(output_path):
-        print("🔈 오디오 재생 중...")
+        log.info("🔈 오디오 재생 중...")
         try:
             with open(output_path, 'rb') as f:
                 audio_data = f.read()
             play(audio_data)
         except Exception as e:
-            print(f"❌ 오디오 재생 중 오류 발생: {str(e)}")
+            log.error(f"❌ 오디오 재생 중 오류 발생: {str(e)}")
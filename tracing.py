@@ -0,0 +1,262 @@
+"""
+Per-interaction latency tracing
+===============================
+지연 시간은 지금까지 emoji print 로만 확인했습니다. 여기서는 상호작용 한 번(녹음 시작 → 응답 재생 끝)을
+trace 하나로 묶고, 그 안의 구간(span)을 기록합니다.
+
+    trace = begin_trace("interaction")          # controller: 녹음 시작 시
+    with span("stt.upload", codec="wav"):       # 어느 스레드에서나 - 진행 중인 trace 에 기록
+        ...
+    @traced("llm.conversation")                 # 함수 전체를 span 으로
+    def process_voice_text(...): ...
+    end_trace()                                 # 세션 로그(JSONL)에 한 줄로 기록
+
+진행 중인 trace 가 없으면 span 은 아무것도 기록하지 않습니다 (pre-warm, CLI 도구 등은 비용 없음).
+trace 는 TRACE_DIR/session-<시각>.jsonl 에 한 줄씩 추가됩니다.
+
+Usage:
+    python tracing.py summary traces/session-20250601-120000.jsonl      # span 별 p50/p95/p99
+    python tracing.py export traces/session-20250601-120000.jsonl -o trace.json
+        # chrome://tracing 또는 https://ui.perfetto.dev 에서 열기
+"""
+
+import argparse
+import functools
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+TRACE_DIR = os.getenv("TRACE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "traces"))
+
+
+class Trace:
+    """상호작용 한 번의 span / event 기록 (시각은 begin 기준 ms)"""
+
+    def __init__(self, trace_id, name, **attrs):
+        self.trace_id = trace_id
+        self.name = name
+        self.attrs = attrs
+        self.wall_start = time.time()
+        self.t0 = time.perf_counter()
+        self.spans = []
+        self.events = []
+        self.lock = threading.Lock()
+
+    def _ms(self, t):
+        return round((t - self.t0) * 1000, 3)
+
+    def add_span(self, name, start, end, error=None, **attrs):
+        """이미 측정된 구간 추가 (start/end 는 time.perf_counter() 값)"""
+        record = {"name": name, "start_ms": self._ms(start), "dur_ms": round((end - start) * 1000, 3),
+                  "thread": threading.current_thread().name}
+        if attrs:
+            record["attrs"] = attrs
+        if error:
+            record["error"] = error
+        with self.lock:
+            self.spans.append(record)
+
+    def add_event(self, name, **attrs):
+        """시점 하나 (예: endpoint, 첫 청크 도착)"""
+        record = {"name": name, "t_ms": self._ms(time.perf_counter()), "thread": threading.current_thread().name}
+        if attrs:
+            record["attrs"] = attrs
+        with self.lock:
+            self.events.append(record)
+
+    def to_dict(self):
+        with self.lock:
+            return {"trace_id": self.trace_id, "name": self.name, "start_time": self.wall_start,
+                    "duration_ms": self._ms(time.perf_counter()), "attrs": self.attrs,
+                    "spans": sorted(self.spans, key=lambda s: s["start_ms"]), "events": list(self.events)}
+
+
+class Tracer:
+    """진행 중인 trace 하나와 세션 로그 파일 (controller 는 상호작용을 한 번에 하나씩 처리)"""
+
+    def __init__(self, directory=TRACE_DIR):
+        self.directory = directory
+        self.path = None
+        self.current = None
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def begin(self, name="interaction", **attrs):
+        with self.lock:
+            self.count += 1
+            self.current = Trace(self.count, name, **attrs)
+            return self.current
+
+    def end(self):
+        """진행 중인 trace 를 세션 로그에 한 줄로 쓰고 반환"""
+        with self.lock:
+            trace, self.current = self.current, None
+            if trace is None:
+                return None
+            if self.path is None:
+                os.makedirs(self.directory, exist_ok=True)
+                self.path = os.path.join(self.directory, f"session-{time.strftime('%Y%m%d-%H%M%S')}.jsonl")
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(json.dumps(trace.to_dict(), ensure_ascii=False) + "\n")
+        return trace
+
+
+_tracer = Tracer()
+
+
+def get_tracer():
+    return _tracer
+
+
+def begin_trace(name="interaction", **attrs):
+    return _tracer.begin(name, **attrs)
+
+
+def end_trace():
+    return _tracer.end()
+
+
+def current_trace():
+    return _tracer.current
+
+
+@contextmanager
+def span(name, **attrs):
+    """with 블록 구간을 진행 중인 trace 에 기록 (예외가 나면 error 와 함께 기록하고 다시 전달)"""
+    trace = _tracer.current
+    if trace is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    except BaseException as e:
+        trace.add_span(name, start, time.perf_counter(), error=f"{type(e).__name__}: {e}", **attrs)
+        raise
+    trace.add_span(name, start, time.perf_counter(), **attrs)
+
+
+def event(name, **attrs):
+    trace = _tracer.current
+    if trace is not None:
+        trace.add_event(name, **attrs)
+
+
+def traced(name=None):
+    """함수 호출 전체를 span 으로 기록하는 decorator"""
+    def decorator(fn):
+        span_name = name or fn.__qualname__
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with span(span_name):
+                return fn(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# =========================
+# Session log → Chrome trace / summary
+# =========================
+def load_traces(path):
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def to_chrome_trace(traces):
+    """Chrome trace event format (상호작용마다 process 하나, 스레드마다 track 하나)"""
+    events = []
+    for trace in traces:
+        pid = trace["trace_id"]
+        base_us = trace["start_time"] * 1e6
+        threads = {}
+
+        def tid(thread):
+            if thread not in threads:
+                threads[thread] = len(threads) + 1
+                events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": threads[thread],
+                               "args": {"name": thread}})
+            return threads[thread]
+
+        events.append({"ph": "M", "name": "process_name", "pid": pid,
+                       "args": {"name": f"{trace['name']} #{pid}"}})
+        events.append({"ph": "X", "name": trace["name"], "cat": "interaction", "pid": pid, "tid": 0,
+                       "ts": base_us, "dur": trace["duration_ms"] * 1000, "args": trace.get("attrs", {})})
+        for s in trace["spans"]:
+            args = dict(s.get("attrs", {}))
+            if "error" in s:
+                args["error"] = s["error"]
+            events.append({"ph": "X", "name": s["name"], "cat": s["name"].split(".")[0], "pid": pid,
+                           "tid": tid(s["thread"]), "ts": base_us + s["start_ms"] * 1000,
+                           "dur": s["dur_ms"] * 1000, "args": args})
+        for e in trace["events"]:
+            events.append({"ph": "i", "s": "p", "name": e["name"], "pid": pid, "tid": tid(e["thread"]),
+                           "ts": base_us + e["t_ms"] * 1000, "args": e.get("attrs", {})})
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def _percentile(values, p):
+    """선형 보간 percentile (values 는 정렬된 목록)"""
+    if len(values) == 1:
+        return values[0]
+    k = (len(values) - 1) * p
+    low = int(k)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (k - low)
+
+
+def summarize(traces):
+    """span 이름별 {count, errors, p50, p95, p99, max} (ms). interaction 전체 길이 포함"""
+    durations, errors = {}, {}
+    for trace in traces:
+        durations.setdefault(trace["name"], []).append(trace["duration_ms"])
+        for s in trace["spans"]:
+            durations.setdefault(s["name"], []).append(s["dur_ms"])
+            if "error" in s:
+                errors[s["name"]] = errors.get(s["name"], 0) + 1
+    summary = {}
+    for name, values in durations.items():
+        values.sort()
+        summary[name] = {"count": len(values), "errors": errors.get(name, 0),
+                         "p50": _percentile(values, 0.50), "p95": _percentile(values, 0.95),
+                         "p99": _percentile(values, 0.99), "max": values[-1]}
+    return summary
+
+
+def print_summary(traces):
+    summary = summarize(traces)
+    print(f"📊 {len(traces)} interactions")
+    print(f"{'span':<24} {'count':>6} {'err':>4} {'p50':>9} {'p95':>9} {'p99':>9} {'max':>9}")
+    for name, s in sorted(summary.items(), key=lambda item: -item[1]["p50"]):
+        print(f"{name:<24} {s['count']:6d} {s['errors']:4d} {s['p50']:7.0f}ms {s['p95']:7.0f}ms "
+              f"{s['p99']:7.0f}ms {s['max']:7.0f}ms")
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Interaction trace tools")
+    sub = parser.add_subparsers(dest="command", required=True)
+    p_summary = sub.add_parser("summary", help="span 별 p50/p95/p99")
+    p_summary.add_argument("log", help="session-*.jsonl")
+    p_export = sub.add_parser("export", help="Chrome trace JSON 으로 변환")
+    p_export.add_argument("log", help="session-*.jsonl")
+    p_export.add_argument("-o", "--output", help="출력 파일 (기본값: <log>.trace.json)")
+    p_export.add_argument("--interaction", type=int, action="append", help="이 trace_id 만 (여러 번 가능)")
+    args = parser.parse_args()
+
+    traces = load_traces(args.log)
+    if args.command == "summary":
+        print_summary(traces)
+        return
+    if args.interaction:
+        traces = [t for t in traces if t["trace_id"] in args.interaction]
+    output = args.output or os.path.splitext(args.log)[0] + ".trace.json"
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(to_chrome_trace(traces), f)
+    print(f"💾 {len(traces)} interactions → {output} (open in chrome://tracing or ui.perfetto.dev)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+"""
+Content-addressed TTS cache
+===========================
+로봇은 같은 문장("System malfunction..." 등)을 자주 반복하는데, text_to_audio.text_to_speech 와
+ElevenLabsTTS.text_to_speech 는 매번 API 로 다시 합성했습니다.
+
+TTSCache 는 (text, voice_id, model_id, output_format, voice_settings) 의 SHA-256 을 키로
+오디오 파일을 디스크에 저장합니다.
+    - index.json 에 파일 크기 / 마지막 사용 시간을 기록하고, 전체 크기가 max_bytes 를 넘으면
+      가장 오래 사용하지 않은 항목부터 삭제 (LRU)
+    - 파일과 인덱스 모두 임시 파일에 쓴 뒤 os.replace 로 교체 (동시 스레드에서도 깨지지 않음)
+    - 캐시 hit 이면 네트워크 요청 없이 파일을 돌려줌, hit/miss 횟수 집계
+
+Usage:
+    python tts_cache.py --prewarm                 # STOCK_PHRASES 미리 합성
+    python tts_cache.py --prewarm phrases.txt     # 한 줄에 한 문장
+    python tts_cache.py --prewarm --pcm           # pcm 모드 (PCM_TTS) 용
+    python tts_cache.py --stats
+    python tts_cache.py --clear
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import threading
+import time
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+DEFAULT_CACHE_DIR = os.getenv(
+    "TTS_CACHE_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "tts_cache")
+)
+DEFAULT_MAX_BYTES = int(float(os.getenv("TTS_CACHE_MAX_MB", "50")) * 1024 * 1024)
+
+# 시작 시 미리 합성해 둘 고정 문장 (LLM_conversation.py 의 오류 응답 등)
+STOCK_PHRASES = [
+    "Processing your request, please wait...",
+    "System malfunction. Communication module offline.",
+    "System malfunction. Audio processing module offline.",
+]
+
+
+def cache_key(text, voice_id, model_id, output_format, voice_settings=None):
+    """합성 결과를 결정하는 모든 파라미터의 SHA-256"""
+    payload = json.dumps(
+        {"text": text, "voice_id": voice_id, "model_id": model_id,
+         "output_format": output_format, "voice_settings": voice_settings or {}},
+        sort_keys=True, ensure_ascii=False
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _extension(output_format):
+    return "mp3" if output_format.startswith("mp3") else "pcm"
+
+
+class TTSCache:
+    """On-disk audio cache with an LRU byte budget."""
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(directory, "index.json")
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+        self._index = self._load_index()
+
+    # -------------------------
+    # Index
+    # -------------------------
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # 파일이 지워진 항목은 버림
+        return {key: entry for key, entry in index.items()
+                if os.path.exists(os.path.join(self.directory, entry["file"]))}
+
+    def _save_index(self):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".json.part")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(self._index, f, ensure_ascii=False, indent=1)
+        os.replace(tmp_path, self.index_path)
+
+    def _path(self, entry):
+        return os.path.join(self.directory, entry["file"])
+
+    def __contains__(self, key):
+        # hit/miss 집계 없이 존재 여부만 확인 (pre-warm 용)
+        with self._lock:
+            entry = self._index.get(key)
+            return entry is not None and os.path.exists(self._path(entry))
+
+    @property
+    def total_bytes(self):
+        with self._lock:
+            return sum(entry["bytes"] for entry in self._index.values())
+
+    # -------------------------
+    # Lookup / store
+    # -------------------------
+    def get(self, key):
+        """캐시된 파일 경로 (없으면 None). hit 이면 마지막 사용 시간 갱신"""
+        with self._lock:
+            entry = self._index.get(key)
+            if entry is not None and not os.path.exists(self._path(entry)):
+                self._index.pop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            entry["last_used"] = time.time()
+            return self._path(entry)
+
+    def put(self, key, data, output_format="mp3", text=None):
+        """오디오 바이트를 원자적으로 저장하고 경로를 반환합니다."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        return self._commit(key, tmp_path, len(data), output_format, text)
+
+    def put_file(self, key, source_path, output_format="mp3", text=None):
+        """이미 저장된 파일(스트리밍 결과 등)을 복사해서 캐시에 넣습니다."""
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix=".part")
+        os.close(fd)
+        shutil.copyfile(source_path, tmp_path)
+        return self._commit(key, tmp_path, os.path.getsize(tmp_path), output_format, text)
+
+    def _commit(self, key, tmp_path, n_bytes, output_format, text):
+        filename = f"{key}.{_extension(output_format)}"
+        path = os.path.join(self.directory, filename)
+        with self._lock:
+            os.replace(tmp_path, path)
+            self._index[key] = {"file": filename, "bytes": n_bytes, "last_used": time.time(),
+                                "text": (text or "")[:80]}
+            self._evict(keep=key)
+            self._save_index()
+        return path
+
+    def _evict(self, keep=None):
+        total = sum(entry["bytes"] for entry in self._index.values())
+        for key, entry in sorted(self._index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(self._path(entry))
+            except OSError:
+                pass
+            self._index.pop(key)
+            total -= entry["bytes"]
+            self.evictions += 1
+
+    def flush(self):
+        """hit 으로 갱신된 마지막 사용 시간을 인덱스 파일에 기록"""
+        with self._lock:
+            self._save_index()
+
+    def clear(self):
+        with self._lock:
+            for entry in self._index.values():
+                try:
+                    os.remove(self._path(entry))
+                except OSError:
+                    pass
+            self._index = {}
+            self._save_index()
+
+    def stats(self):
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._index),
+            "bytes": self.total_bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "evictions": self.evictions,
+        }
+
+    def print_stats(self):
+        s = self.stats()
+        log.info(f"🗄️ TTS cache: {s['entries']} entries, {s['bytes'] / 1024:.0f}/{s['max_bytes'] / 1024:.0f} KB, "
+              f"hits {s['hits']} / misses {s['misses']} ({s['hit_rate'] * 100:.0f}%), evictions {s['evictions']}")
+
+
+def read_cached(path):
+    """get() 이 돌려준 캐시 파일 읽기 - 그 사이 다른 스레드의 put() 이 LRU 로 지웠으면 None (miss 로 처리)"""
+    try:
+        with open(path, "rb") as f:
+            return f.read()
+    except OSError:
+        return None
+
+
+_cache = None
+_cache_lock = threading.Lock()
+
+
+def get_tts_cache():
+    """프로세스 전체에서 공유하는 TTSCache (처음 호출 시 생성)"""
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache()
+        return _cache
+
+
+def prewarm(phrases=STOCK_PHRASES, voice_id="ErXwobaYiN019PkySvjV", output_format=None):
+    """고정 문장을 미리 합성해서 캐시에 넣습니다 (이미 있으면 건너뜀).
+
+    output_format 은 재생할 때와 같아야 hit (None 이면 text_to_audio.OUTPUT_FORMAT, pcm 모드는 PCM_FORMAT)
+    """
+    from text_to_audio import synthesize_to_cache, OUTPUT_FORMAT
+
+    output_format = output_format or OUTPUT_FORMAT
+
+    start = time.perf_counter()
+    created = 0
+    for phrase in phrases:
+        if synthesize_to_cache(phrase, voice_id=voice_id, output_format=output_format):
+            created += 1
+    log.info(f"🔥 TTS pre-warm: {created}/{len(phrases)} phrases synthesized "
+          f"({time.perf_counter() - start:.1f}s)")
+    get_tts_cache().flush()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Content-addressed TTS cache")
+    parser.add_argument("--prewarm", nargs="?", const="", metavar="FILE",
+                        help="고정 문장 미리 합성 (FILE 이 있으면 한 줄에 한 문장)")
+    parser.add_argument("--voice", default="ErXwobaYiN019PkySvjV", help="voice_id")
+    parser.add_argument("--pcm", action="store_true", help="pcm 모드(PCM_FORMAT) 로 미리 합성")
+    parser.add_argument("--stats", action="store_true", help="캐시 크기 / 항목 수 출력")
+    parser.add_argument("--clear", action="store_true", help="캐시 비우기")
+    args = parser.parse_args()
+    setup_logging()
+
+    cache = get_tts_cache()
+    if args.clear:
+        cache.clear()
+        log.info(f"🧹 Cleared {cache.directory}")
+    if args.prewarm is not None:
+        phrases = STOCK_PHRASES
+        if args.prewarm:
+            with open(args.prewarm, "r", encoding="utf-8") as f:
+                phrases = [line.strip() for line in f if line.strip()]
+        from text_to_audio import PCM_FORMAT
+        prewarm(phrases, voice_id=args.voice, output_format=PCM_FORMAT if args.pcm else None)
+    if args.stats or args.prewarm is None and not args.clear:
+        cache.print_stats()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""
+Sentence-chunked TTS pipeline
+=============================
+LLM_conversation.process_voice_text 의 응답은 여러 문장인 경우가 많은데, text_to_speech 는
+문단 전체를 한 번의 요청으로 합성하기 때문에 마지막 문장까지 합성이 끝나야 재생이 시작됐습니다.
+
+speak_chunked() 는
+    - 응답을 문장 (길면 쉼표/세미콜론 단위 절) 으로 나누고, 첫 조각은 짧게 유지
+    - 제한된 워커 풀에서 동시에 합성 (ElevenLabs 동시 요청 제한 고려, 기본 3)
+    - 준비되는 대로 PlaybackEngine 에 순서대로 넣음 (뒤 문장이 먼저 끝나도 순서 보장)
+그래서 첫 오디오는 문단 전체가 아니라 첫 짧은 조각의 합성 시간 뒤에 시작됩니다.
+
+Usage:
+    python tts_pipeline.py "First sentence. Second one, which is longer; and a third!"
+    python tts_pipeline.py --benchmark      # 로컬 stand-in TTS 로 one-shot 과 비교
+"""
+
+import argparse
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from robot_log import get_logger, setup_logging
+
+log = get_logger(__name__)
+
+SENTENCE_END = re.compile(r"(?<=[.!?])\s+")
+CLAUSE_BREAK = re.compile(r"(?<=[,;:])\s+")
+
+MAX_WORKERS = 3         # 동시 합성 요청 수
+FIRST_MAX_CHARS = 60    # 첫 조각 최대 길이 - 짧을수록 첫 오디오가 빨라짐
+MAX_CHARS = 160         # 이후 조각 최대 길이
+MIN_CHARS = 12          # 이보다 짧은 조각은 다음 조각과 합침 (억양이 끊기지 않도록)
+
+
+def _pack(parts, limit):
+    """조각들을 limit 이하로 이어 붙임"""
+    packed = []
+    for part in parts:
+        if packed and len(packed[-1]) + 1 + len(part) <= limit:
+            packed[-1] = f"{packed[-1]} {part}"
+        else:
+            packed.append(part)
+    return packed
+
+
+def split_sentences(text, first_max_chars=FIRST_MAX_CHARS, max_chars=MAX_CHARS, min_chars=MIN_CHARS):
+    """응답을 합성 단위로 나눕니다.
+
+    문장 단위로 나누고, limit 보다 긴 문장은 절 단위로 다시 나눕니다.
+    첫 조각의 limit 은 first_max_chars, 나머지는 max_chars 입니다.
+    """
+    chunks, carry = [], ""
+    for sentence in SENTENCE_END.split(text.strip()):
+        sentence = f"{carry} {sentence.strip()}".strip()
+        if len(sentence) < min_chars:
+            # "Hi." 같은 짧은 문장은 다음 문장 앞에 붙임
+            carry = sentence
+            continue
+        carry = ""
+        limit = first_max_chars if not chunks else max_chars
+        if len(sentence) <= limit:
+            chunks.append(sentence)
+            continue
+        clauses = [c.strip() for c in CLAUSE_BREAK.split(sentence) if c.strip()]
+        chunks.extend(_pack(clauses, limit))
+    if carry:
+        if chunks:
+            chunks[-1] = f"{chunks[-1]} {carry}"
+        else:
+            chunks.append(carry)
+
+    # 너무 짧은 절은 다음 조각과 합침
+    merged = []
+    for chunk in chunks:
+        if merged and len(merged[-1]) < min_chars:
+            merged[-1] = f"{merged[-1]} {chunk}"
+        else:
+            merged.append(chunk)
+    return merged
+
+
+def speak_chunked(text, voice_id="ErXwobaYiN019PkySvjV", max_workers=MAX_WORKERS, on_playback_start=None,
+                  play=True, use_cache=True, pcm=False):
+    """문장 단위로 병렬 합성하고 순서대로 재생합니다 (재생 완료까지 대기).
+
+    Args:
+        text (str): 합성할 응답
+        voice_id (str): ElevenLabs voice ID
+        max_workers (int): 동시 합성 요청 수
+        on_playback_start (callable): 첫 조각의 재생이 시작될 때 호출
+        play (bool): False 면 재생하지 않고 합성만 (벤치마크용)
+        use_cache (bool): tts_cache 사용 여부
+        pcm (bool): True 면 raw PCM 으로 합성해서 sounddevice 로 재생 (MP3 디코딩 없음)
+
+    Returns:
+        dict: chunks, first_audio (첫 조각 준비 시간, 초), synthesized (전체 합성 시간, 초)
+    """
+    from text_to_audio import synthesize_clip, _create_client, OUTPUT_FORMAT, PCM_FORMAT, PCM_SAMPLE_RATE
+    from playback import get_playback_engine
+
+    chunks = split_sentences(text)
+    if not chunks:
+        return {"chunks": 0, "first_audio": None, "synthesized": 0.0}
+    log.info(f"🧩 TTS: {len(chunks)} chunks, {min(max_workers, len(chunks))} workers")
+
+    start = time.perf_counter()
+    elevenlabs = _create_client()  # httpx 연결 풀 공유
+    engine = get_playback_engine() if play else None
+    first_audio, playbacks = None, []
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="tts") as pool:
+        output_format = PCM_FORMAT if pcm else OUTPUT_FORMAT
+        futures = [pool.submit(synthesize_clip, chunk, voice_id, elevenlabs, use_cache, output_format)
+                   for chunk in chunks]
+        # 순서대로 기다림 - 뒤 조각이 먼저 끝나도 앞 조각 재생 큐에 넣은 뒤에 넣음
+        for i, future in enumerate(futures):
+            try:
+                audio = future.result()
+            except Exception as e:
+                log.warning(f"⚠️ Chunk {i + 1} skipped: {e}")
+                continue
+            if first_audio is None:
+                first_audio = time.perf_counter() - start
+            on_start = on_playback_start if i == 0 else None
+            if engine and pcm:
+                playbacks.append(engine.play_pcm([audio], PCM_SAMPLE_RATE, on_start=on_start))
+            elif engine:
+                playbacks.append(engine.play(data=audio, on_start=on_start))
+    synthesized = time.perf_counter() - start
+
+    for playback in playbacks:
+        try:
+            playback.result()
+        except Exception as e:
+            log.error(f"Error playing audio: {e}")
+    return {"chunks": len(chunks), "first_audio": first_audio, "synthesized": synthesized}
+
+
+# =========================
+# Benchmark
+# =========================
+BENCHMARK_TEXT = (
+    "Target acquired. I see a person standing near the door, holding what looks like a coffee mug. "
+    "No weapons detected, so I am holding position for now; tell me if you want me to move closer. "
+    "My battery is at seventy percent, which is enough for another twenty minutes of patrol."
+)
+
+
+def benchmark(text=BENCHMARK_TEXT, runs=3, seconds_per_char=0.004):
+    """로컬 stand-in TTS (텍스트 길이에 비례한 합성 지연) 로 one-shot 과 문장 분할의 지연 비교"""
+    import os
+    import numpy as np
+    from stub_servers import StandInServer
+    from text_to_audio import synthesize_clip
+
+    results = {"one-shot": [], "chunked": []}
+    with StandInServer(tts_first_chunk_delay=0.25, tts_chunk_delay=0.0,
+                       tts_seconds_per_char=seconds_per_char) as server:
+        os.environ["ELEVENLABS_BASE_URL"] = server.url
+        for _ in range(runs):
+            start = time.perf_counter()
+            synthesize_clip(text, use_cache=False)
+            one_shot = time.perf_counter() - start
+            results["one-shot"].append((one_shot, one_shot))
+
+            report = speak_chunked(text, play=False, use_cache=False)
+            results["chunked"].append((report["first_audio"], report["synthesized"]))
+        os.environ.pop("ELEVENLABS_BASE_URL")
+
+    log.info(f"\n📊 {len(text)} chars, {len(split_sentences(text))} chunks, {runs} runs (median)")
+    log.info(f"{'mode':<10} {'first audio':>12} {'all audio':>10}")
+    for mode, rows in results.items():
+        first, total = np.median([r[0] for r in rows]), np.median([r[1] for r in rows])
+        log.info(f"{mode:<10} {first * 1000:10.0f}ms {total * 1000:8.0f}ms")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sentence-chunked parallel TTS")
+    parser.add_argument("text", nargs="?", help="합성할 텍스트")
+    parser.add_argument("--workers", type=int, default=MAX_WORKERS, help="동시 합성 요청 수")
+    parser.add_argument("--benchmark", action="store_true", help="로컬 stand-in 으로 one-shot 과 비교")
+    parser.add_argument("--runs", type=int, default=3)
+    args = parser.parse_args()
+    setup_logging()
+
+    if args.benchmark:
+        benchmark(runs=args.runs)
+        return
+    text = args.text or BENCHMARK_TEXT
+    for i, chunk in enumerate(split_sentences(text), 1):
+        log.info(f"  {i}. {chunk}")
+    report = speak_chunked(text, max_workers=args.workers)
+    if report["first_audio"] is None:
+        log.error(f"❌ No audio produced - all {report['chunks']} chunks failed")
+        return
+    log.info(f"⏱️ first audio {report['first_audio'] * 1000:.0f}ms, all synthesized {report['synthesized'] * 1000:.0f}ms")
+
+
+if __name__ == "__main__":
+    main()
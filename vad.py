@@ -0,0 +1,270 @@
+"""
+Voice Activity Detector
+=======================
+main_robot_controller.py 와 decibel_tester.py 에서 같이 쓰는 음성 구간 검출 엔진.
+블록 전체를 프레임으로 나눠 에너지(dB), zero-crossing rate, spectral flux 를 한 번에
+(벡터화) 계산하고, 시작/종료 임계값 히스테리시스와 hangover(침묵 유지 시간)로
+start / pause / resume / end 이벤트를 만듭니다.
+
+녹음 파일도 같은 엔진으로 실시간보다 훨씬 빠르게 돌릴 수 있어서 임계값 튜닝에 사용합니다.
+
+Usage:
+    python vad.py recording.wav [--start-db -35] [--stop-db -35] [--hangover 1.0]
+"""
+
+import argparse
+import time
+from collections import namedtuple
+import numpy as np
+
+# kind: "start" | "pause" | "resume" | "end"
+# sample: 이벤트가 발생한 프레임의 끝 샘플 위치 (스트림 시작 기준)
+# time: sample / sample_rate (초)
+VADEvent = namedtuple("VADEvent", ["kind", "sample", "time", "db"])
+
+
+def calculate_db(audio_data):
+    """오디오 데이터의 데시벨 레벨 계산"""
+    if len(audio_data) == 0:
+        return -np.inf
+    # RMS 값 계산
+    rms = np.sqrt(np.mean(np.square(audio_data)))
+    # RMS를 dB로 변환 (0 dB 기준은 최대 가능 진폭 1.0)
+    if rms > 0:
+        db = 20 * np.log10(rms)
+    else:
+        db = -np.inf
+    return db
+
+
+class VoiceActivityDetector:
+    """Stateful frame-based VAD with hysteresis and hangover."""
+
+    def __init__(
+        self,
+        sample_rate,
+        frame_size=256,
+        start_db=-35.0,
+        stop_db=-35.0,
+        hangover=1.0,
+        start_frames=1,
+        max_zcr=None,
+        min_flux=None,
+        endpointer=None
+    ):
+        """
+        Args:
+            sample_rate (int): 샘플링 레이트
+            frame_size (int): 분석 프레임 크기(샘플)
+            start_db (float): 음성 시작 임계값 (THRESHOLD_DB)
+            stop_db (float): 침묵 판정 임계값 (SILENCE_THRESHOLD_DB)
+            hangover (float): 침묵이 이만큼(초) 지속되면 발화 종료 (SILENCE_DURATION)
+            start_frames (int): 시작으로 판정하기 위해 연속으로 start_db 를 넘어야 하는 프레임 수
+            max_zcr (float): 지정하면 ZCR 이 이보다 높은 프레임(치찰 잡음 등)은 시작으로 보지 않음
+            min_flux (float): 지정하면 spectral flux 가 이보다 낮은 프레임(정상 잡음)은 시작으로 보지 않음
+            endpointer: 지정하면 침묵마다 hangover 길이를 대신 결정 (endpointing.AdaptiveEndpointer)
+        """
+        self.sample_rate = sample_rate
+        self.frame_size = frame_size
+        self.start_db = start_db
+        self.stop_db = stop_db
+        self.hangover = hangover
+        self.start_frames = start_frames
+        self.max_zcr = max_zcr
+        self.min_flux = min_flux
+        self.endpointer = endpointer
+
+        self._window = np.hanning(frame_size).astype(np.float32)
+        self._pending = np.zeros(frame_size, dtype=np.float32)  # 프레임에 못 채운 나머지 샘플
+        self.reset()
+
+    def reset(self):
+        """상태 초기화 (튜닝한 설정은 유지)"""
+        self._pending_len = 0
+        self._prev_spectrum = None
+        self._samples_seen = 0
+        self._onset_run = 0
+        self.in_speech = False
+        self.speech_start_sample = None
+        self.silence_start_sample = None
+        self.last_db = -np.inf
+        self.last_features = None
+        self._hangover_cache = None  # (silence_start_sample, hangover_samples)
+        self.last_hangover = self.hangover  # 마지막 end 이벤트에 적용된 hangover(초)
+        if self.endpointer is not None:
+            self.endpointer.reset()
+
+    # -------------------------
+    # Features (vectorized)
+    # -------------------------
+    def _frame(self, samples):
+        """pending 샘플과 합쳐 (n_frames, frame_size) 행렬로 만들고 나머지는 보관"""
+        samples = np.asarray(samples, dtype=np.float32)
+        if samples.ndim > 1:
+            samples = samples[:, 0]
+        if self._pending_len:
+            samples = np.concatenate((self._pending[:self._pending_len], samples))
+        n_frames = len(samples) // self.frame_size
+        used = n_frames * self.frame_size
+        rest = len(samples) - used
+        self._pending[:rest] = samples[used:]
+        self._pending_len = rest
+        return samples[:used].reshape(n_frames, self.frame_size)
+
+    def features(self, frames):
+        """프레임별 (dB, ZCR, spectral flux) 를 한 번에 계산"""
+        energy = np.mean(np.square(frames), axis=1)
+        with np.errstate(divide="ignore"):
+            db = 10.0 * np.log10(energy)
+        signs = np.signbit(frames)
+        zcr = np.count_nonzero(signs[:, 1:] != signs[:, :-1], axis=1) / (self.frame_size - 1)
+
+        spectrum = np.abs(np.fft.rfft(frames * self._window, axis=1))
+        norm = spectrum / (np.sum(spectrum, axis=1, keepdims=True) + 1e-12)
+        previous = norm[:-1]
+        if self._prev_spectrum is not None:
+            previous = np.vstack((self._prev_spectrum, previous))
+        else:
+            previous = np.vstack((norm[:1], previous))
+        flux = np.sum(np.maximum(norm - previous, 0.0), axis=1)
+        if len(norm):
+            self._prev_spectrum = norm[-1:]
+        return db, zcr, flux
+
+    # -------------------------
+    # State machine
+    # -------------------------
+    def hangover_samples(self, sample):
+        """현재 발화를 끝내기 위해 필요한 침묵 길이(샘플). 엔드포인터가 있으면 침묵마다 한 번 결정합니다."""
+        if self.endpointer is None:
+            return int(self.hangover * self.sample_rate)
+        key = self.silence_start_sample
+        if self._hangover_cache is None or self._hangover_cache[0] != key:
+            seconds = self.endpointer.hangover(self.hangover)
+            self._hangover_cache = (key, int(seconds * self.sample_rate))
+        return self._hangover_cache[1]
+
+    def current_hangover(self):
+        """현재 침묵에 적용 중인 hangover(초)"""
+        if self.silence_start_sample is None:
+            return self.hangover
+        return self.hangover_samples(self._samples_seen) / self.sample_rate
+
+    def _is_onset(self, db, zcr, flux):
+        if db <= self.start_db:
+            return False
+        if self.max_zcr is not None and zcr > self.max_zcr:
+            return False
+        if self.min_flux is not None and flux < self.min_flux:
+            return False
+        return True
+
+    def _onset_run_seconds(self):
+        return max(self.start_frames, 1) * self.frame_size / self.sample_rate
+
+    def _event(self, kind, sample, db):
+        return VADEvent(kind, sample, sample / self.sample_rate, float(db))
+
+    def process(self, block):
+        """블록을 처리하고 이번 블록에서 발생한 이벤트 리스트를 반환합니다."""
+        frames = self._frame(block)
+        events = []
+        if len(frames) == 0:
+            return events
+        db, zcr, flux = self.features(frames)
+        self.last_features = (db, zcr, flux)
+        self.last_db = float(db[-1])
+
+        base = self._samples_seen
+        for i in range(len(frames)):
+            sample = base + (i + 1) * self.frame_size
+            frame_db = db[i]
+            if not self.in_speech:
+                if self._is_onset(frame_db, zcr[i], flux[i]):
+                    self._onset_run += 1
+                    if self._onset_run >= self.start_frames:
+                        self.in_speech = True
+                        self.speech_start_sample = sample - self._onset_run * self.frame_size
+                        self.silence_start_sample = None
+                        self._onset_run = 0
+                        if self.endpointer is not None:
+                            self.endpointer.reset()
+                            self.endpointer.observe(frame_db, self._onset_run_seconds())
+                        events.append(self._event("start", sample, frame_db))
+                else:
+                    self._onset_run = 0
+                continue
+
+            if frame_db < self.stop_db:
+                if self.silence_start_sample is None:
+                    self.silence_start_sample = sample - self.frame_size
+                    events.append(self._event("pause", sample, frame_db))
+                hangover = self.hangover_samples(sample)
+                if sample - self.silence_start_sample >= hangover:
+                    self.in_speech = False
+                    self.last_hangover = hangover / self.sample_rate
+                    events.append(self._event("end", sample, frame_db))
+                    self.speech_start_sample = None
+                    self.silence_start_sample = None
+            else:
+                if self.endpointer is not None:
+                    self.endpointer.observe(frame_db, self.frame_size / self.sample_rate)
+                if self.silence_start_sample is not None:
+                    self.silence_start_sample = None
+                    events.append(self._event("resume", sample, frame_db))
+
+        self._samples_seen = base + len(frames) * self.frame_size
+        return events
+
+    def silence_elapsed(self):
+        """현재 침묵이 지속된 시간(초). 침묵 중이 아니면 0"""
+        if self.silence_start_sample is None:
+            return 0.0
+        return (self._samples_seen - self.silence_start_sample) / self.sample_rate
+
+    def process_file(self, path, chunk_seconds=1.0):
+        """오디오 파일 전체를 처리해서 (events, 처리 시간, 오디오 길이) 를 반환합니다."""
+        import soundfile as sf
+
+        self.reset()
+        events = []
+        start = time.perf_counter()
+        info = sf.info(path)
+        if info.samplerate != self.sample_rate:
+            raise ValueError(f"{path}: sample rate {info.samplerate} != detector {self.sample_rate}")
+        for chunk in sf.blocks(path, blocksize=int(chunk_seconds * self.sample_rate), dtype="float32", always_2d=True):
+            events.extend(self.process(chunk))
+        elapsed = time.perf_counter() - start
+        return events, elapsed, info.frames / info.samplerate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline voice activity detection for threshold tuning")
+    parser.add_argument("files", nargs="+", help="WAV/FLAC 녹음 파일")
+    parser.add_argument("--start-db", type=float, default=-35.0, help="녹음 시작 임계값 (기본값: -35)")
+    parser.add_argument("--stop-db", type=float, default=-35.0, help="침묵 임계값 (기본값: -35)")
+    parser.add_argument("--hangover", type=float, default=1.0, help="침묵 유지 시간(초) (기본값: 1.0)")
+    parser.add_argument("--frame-size", type=int, default=256, help="분석 프레임 크기 (기본값: 256)")
+    parser.add_argument("--start-frames", type=int, default=1, help="시작 판정 연속 프레임 수 (기본값: 1)")
+    args = parser.parse_args()
+
+    import soundfile as sf
+
+    for path in args.files:
+        vad = VoiceActivityDetector(
+            sf.info(path).samplerate,
+            frame_size=args.frame_size,
+            start_db=args.start_db,
+            stop_db=args.stop_db,
+            hangover=args.hangover,
+            start_frames=args.start_frames
+        )
+        events, elapsed, duration = vad.process_file(path)
+        print(f"\n📁 {path} ({duration:.1f}s, processed {duration / max(elapsed, 1e-9):.0f}x real-time)")
+        for event in events:
+            if event.kind in ("start", "end"):
+                print(f"  {event.time:7.2f}s  {event.kind:<5} ({event.db:.1f} dB)")
+
+
+if __name__ == "__main__":
+    main()